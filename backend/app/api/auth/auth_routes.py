@@ -6,25 +6,38 @@ from app.schemas.response_models import RegisterResponseModel, LoginResponseMode
 from app.db.session import get_db
 from app.crud.users_crud import register_api_user, login_api_user, logout_api_user, validate_api_token
 from app.utils.token_utils import extract_bearer_token
+from app.utils.password_utils import PasswordHasherBusy
+from app.utils.server_timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 def check_error(res):
     if res.error:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=res.error)
     return res
 
+def server_busy(exc: PasswordHasherBusy) -> HTTPException:
+    """503 telling the client when to retry once the password hashing queue is full"""
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Server busy, please retry",
+                         headers={"Retry-After": str(exc.retry_after)})
+
 @router.post("/auth/register", response_model=RegisterResponseModel)
 async def register(request: Request, register_data: RegisterRequest, db: Session = Depends(get_db)):
     """Endpoint to register a new user"""
-    res = register_api_user(register_data.first_name, register_data.last_name, 
-                          register_data.email, register_data.password, db)
+    try:
+        res = await register_api_user(register_data.first_name, register_data.last_name,
+                                      register_data.email, register_data.password, db)
+    except PasswordHasherBusy as e:
+        raise server_busy(e)
     return check_error(res)
 
 @router.post("/auth/login", response_model=LoginResponseModel)
 async def login(request: Request, login_data: LoginRequest, db: Session = Depends(get_db)):
     """Endpoint for user login""" 
-    res = login_api_user(login_data.email, login_data.password, db)
+    try:
+        res = await login_api_user(login_data.email, login_data.password, db)
+    except PasswordHasherBusy as e:
+        raise server_busy(e)
     return check_error(res)
 
 @router.post("/auth/logout", response_model=LogoutResponseModel)
@@ -0,0 +1,50 @@
+
+from fastapi import APIRouter, Depends, HTTPException, Header, status, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.response_models import RegisterResponseModel, LoginResponseModel, LogoutResponseModel, ValidateResponseModel, RegisterRequest, LoginRequest
+from app.db.async_session import get_async_db
+from app.crud.users_crud_async import register_api_user, login_api_user, logout_api_user, validate_api_token
+from app.api.auth.auth_routes import check_error, server_busy
+from app.utils.token_utils import extract_bearer_token
+from app.utils.password_utils import PasswordHasherBusy
+from app.utils.server_timing import TimedRoute
+
+# Same endpoints as auth_routes.py, backed by AsyncSession (mounted when DB_MODE=async)
+router = APIRouter(route_class=TimedRoute)
+
+@router.post("/auth/register", response_model=RegisterResponseModel)
+async def register(request: Request, register_data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
+    """Endpoint to register a new user"""
+    try:
+        res = await register_api_user(register_data.first_name, register_data.last_name,
+                                      register_data.email, register_data.password, db)
+    except PasswordHasherBusy as e:
+        raise server_busy(e)
+    return check_error(res)
+
+@router.post("/auth/login", response_model=LoginResponseModel)
+async def login(request: Request, login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    """Endpoint for user login"""
+    try:
+        res = await login_api_user(login_data.email, login_data.password, db)
+    except PasswordHasherBusy as e:
+        raise server_busy(e)
+    return check_error(res)
+
+@router.post("/auth/logout", response_model=LogoutResponseModel)
+async def logout(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)):
+    """Endpoint for user logout — accepts token via Authorization: Bearer <token> header"""
+    token = extract_bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
+    res = await logout_api_user(token, db)
+    return check_error(res)
+
+@router.post("/auth/validate", response_model=ValidateResponseModel)
+async def validate(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)):
+    """Endpoint to validate an API token — accepts token via Authorization: Bearer <token> header"""
+    token = extract_bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
+    res = await validate_api_token(token, db)
+    return check_error(res)
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+import os
+from app.schemas.response_models import ProfileResponseModel
+from app.utils.profiler import DEBUG_PROFILE_PATH, StackSampler, profiler
+from app.utils.server_timing import TimedRoute
+
+
+def require_profiler_token(x_profile_token: str = Header(None)):
+    # without PROFILER_TOKEN the profiler is not there at all
+    if not profiler.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not profiler.authorized(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing or invalid X-Profile-Token header")
+
+
+# Mounted at the root, outside /api; every endpoint needs the X-Profile-Token header
+router = APIRouter(prefix=DEBUG_PROFILE_PATH, route_class=TimedRoute, dependencies=[Depends(require_profiler_token)])
+
+# profiles are made once and never change, but they are not for shared caches
+PROFILE_CACHE_CONTROL = "private, no-store"
+
+
+def collapsed_response(text: str) -> PlainTextResponse:
+    return PlainTextResponse(text, headers={"Cache-Control": PROFILE_CACHE_CONTROL})
+
+
+def worker_status(worker: StackSampler | None) -> dict | None:
+    if worker is None:
+        return None
+    return {"name": worker.path.name, "running": worker.running, "started": worker.started,
+            "stopped": worker.stopped, "seconds": worker.seconds, "samples": worker.samples}
+
+
+@router.get("", response_model=ProfileResponseModel)
+def profile_status():
+    """Profiler settings, this worker's worker-wide profile and the profiles saved by all workers"""
+    return ProfileResponseModel(message="Profiler status",
+                                data={"pid": os.getpid(), "sample_rate": profiler.sample_rate,
+                                      "interval": profiler.interval, "worker": worker_status(profiler.worker),
+                                      "profiles": profiler.profiles()})
+
+
+@router.post("/start", response_model=ProfileResponseModel)
+def start_worker_profile(seconds: float = Query(30, gt=0)):
+    """Sample every thread of the worker answering this request for `seconds` (at most
+    PROFILE_MAX_SECONDS); the profile is saved when the time is up or on /stop
+    """
+    worker = profiler.start_worker(seconds)
+    if worker is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"A worker profile is already running in worker {os.getpid()}")
+    return ProfileResponseModel(message="Worker profile started", data=worker_status(worker))
+
+
+@router.post("/stop", response_class=PlainTextResponse)
+def stop_worker_profile():
+    """Stop this worker's profile early (or take the one that already ran out) and return its
+    collapsed stacks. With several workers, /stop may land on another worker than /start: the
+    profile is saved in PROFILE_DIR either way and listed by GET /debug/profile.
+    """
+    worker = profiler.stop_worker()
+    if worker is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"No worker profile was started in worker {os.getpid()}")
+    return collapsed_response(worker.collapsed())
+
+
+@router.get("/requests", response_class=PlainTextResponse)
+def merged_request_profiles(route: str | None = Query(None, description='e.g. "GET /api/events/{event_id}"')):
+    """The saved request profiles added up, optionally only those of one route"""
+    return collapsed_response(profiler.merged_requests(route))
+
+
+@router.get("/{name}", response_class=PlainTextResponse)
+def saved_profile(name: str):
+    """One saved profile (a name from GET /debug/profile or a response's X-Profile-Id header)"""
+    text = profiler.read(name)
+    if text is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return collapsed_response(text)
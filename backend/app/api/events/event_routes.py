@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, status, Request
+from fastapi import APIRouter, Depends, File, HTTPException, Header, Query, UploadFile, status, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from datetime import datetime
+from typing import Literal, Optional
+from anyio import from_thread
 from sqlalchemy.orm import Session
 from app.schemas.response_models import EventResponseModel, EventListResponseModel, EventRequest, EventUpdateRequest
+from app.schemas.response_models import EventBatchRequest, EventBatchResponseModel, EventImportResponseModel
+from app.schemas.response_models import EventChangesResponseModel
 from app.db.session import get_db
-from app.crud.events_crud import create_event, get_user_events, get_event_by_id, update_event, delete_event
-from app.utils.token_utils import extract_bearer_token
+from app.crud.events_crud import create_event, get_user_events, get_event_by_id, update_event, delete_event, EVENTS_MAX_PAGE_SIZE
+from app.crud.events_crud import get_events_version, get_event_changes, EVENTS_CHANGES_PAGE_SIZE
+from app.crud.events_crud import stream_user_events, apply_event_batch, import_ical_events, get_import_progress, EXPORT_MEDIA_TYPES
+from app.crud.weather_crud import add_event_weather
+from app.utils.http_cache import make_etag, not_modified, not_modified_response, validator_headers
+from app.utils.token_utils import extract_bearer_token, validate_user_from_token
+from app.utils.server_timing import TimedRoute, span
 
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 def check_error(res):
@@ -15,6 +26,18 @@ def check_error(res):
     return res
 
 
+# Per-user data: browsers may keep it but must revalidate (a cheap 304) before every reuse
+EVENTS_CACHE_CONTROL = "private, no-cache"
+
+
+def events_list_headers(version: dict, *params) -> dict:
+    """ETag / Last-Modified / Cache-Control of an events page, from the user's events version
+    (read before the rows, so a concurrent write can only make the ETag older than the data).
+    """
+    etag = make_etag("events", version["user_email"], version["version"], *params)
+    return validator_headers(etag, version["modified_at"], EVENTS_CACHE_CONTROL)
+
+
 @router.post("/events", response_model=EventResponseModel)
 async def create_user_event(
     request: Request,
@@ -27,23 +50,143 @@ async def create_user_event(
     if token is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
     
-    res = create_event(event_data.title, event_data.description, event_data.date_time, token, db)
+    res = create_event(event_data.title, event_data.description, event_data.date_time, token, db,
+                       event_data.latitude, event_data.longitude)
+    return check_error(res)
+
+
+@router.post("/events/batch", response_model=EventBatchResponseModel)
+def batch_events(
+    batch: EventBatchRequest,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Create, update and delete many events in one request and one transaction"""
+    # Extract token
+    token = extract_bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
+
+    res = apply_event_batch(batch.operations, token, db)
+    return check_error(res)
+
+
+@router.post("/events/import", response_model=EventImportResponseModel)
+def import_events(
+    file: UploadFile = File(..., description="iCalendar (.ics) file"),
+    import_id: Optional[str] = Query(None, max_length=64, description="Client-chosen id to poll progress with"),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Import the events of an iCalendar file, skipping UIDs that were already imported"""
+    # Extract token
+    token = extract_bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
+
+    # the upload is spooled to disk by Starlette and parsed line by line from there
+    res = import_ical_events(file.file, token, db, import_id)
+    return check_error(res)
+
+
+@router.get("/events/import/{import_id}", response_model=EventImportResponseModel)
+def get_import_status(
+    import_id: str,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Progress of a running or recent import started with ?import_id="""
+    # Extract token
+    token = extract_bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
+
+    res = get_import_progress(import_id, token, db)
     return check_error(res)
 
 
 @router.get("/events", response_model=EventListResponseModel)
 def get_events(
+    request: Request,
+    date_from: Optional[datetime] = Query(None, alias="from", description="Only events at or after this time"),
+    date_to: Optional[datetime] = Query(None, alias="to", description="Only events before this time"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=EVENTS_MAX_PAGE_SIZE, description="Page size"),
+    weather: bool = Query(False, description="Attach the forecast hour nearest each event"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Location for events without one (with weather)"),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    temperature_unit: Literal["celsius", "fahrenheit"] = Query("celsius"),
+    wind_speed_unit: Literal["kmh", "ms", "mph", "kn"] = Query("kmh"),
     authorization: str = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Get all events for the authenticated user"""
+    """Get a page of events for the authenticated user, optionally within a date range and with their weather.
+    Without weather the page has an ETag, and If-None-Match / If-Modified-Since are answered 304 before any event is loaded.
+    """
     # Extract token
     token = extract_bearer_token(authorization)
     if token is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
-    
-    res = get_user_events(token, db)
-    return check_error(res)
+
+    # with weather the page also depends on the forecasts, so it is not validated
+    headers = {"Cache-Control": EVENTS_CACHE_CONTROL}
+    if not weather:
+        version = check_error(get_events_version(token, db)).data
+        headers = events_list_headers(version, date_from, date_to, cursor, limit)
+        if not_modified(request.headers, headers["ETag"], version["modified_at"]):
+            return not_modified_response(headers)
+
+    res = check_error(get_user_events(token, db, date_from, date_to, cursor, limit))
+    if weather:
+        # forecasts come from the async cache on the event loop; this route runs in a worker thread
+        from_thread.run(add_event_weather, res.data["events"], lat, lon, temperature_unit, wind_speed_unit)
+    # Returning a Response skips response_model re-validation; orjson encodes the rows directly
+    with span("serialize"):
+        return ORJSONResponse({"message": res.message, "data": res.data, "error": res.error}, headers=headers)
+
+
+@router.get("/events/changes", response_model=EventChangesResponseModel)
+def get_changes(
+    since: Optional[str] = Query(None, description="cursor from the previous sync; omit for a full sync"),
+    limit: Optional[int] = Query(None, ge=1, le=EVENTS_CHANGES_PAGE_SIZE, description="Changes per page"),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Events created, updated or deleted since the last sync, for clients that keep a local copy"""
+    # Extract token
+    token = extract_bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
+
+    res = check_error(get_event_changes(token, db, since, limit))
+    with span("serialize"):
+        return ORJSONResponse({"message": res.message, "data": res.data, "error": res.error},
+                              headers={"Cache-Control": EVENTS_CACHE_CONTROL})
+
+
+@router.get("/events/export", response_class=StreamingResponse)
+def export_events(
+    export_format: Literal["ndjson", "csv", "ics"] = Query("ndjson", alias="format", description="Export format"),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Stream the authenticated user's full event history as NDJSON, CSV or iCalendar"""
+    # Extract token
+    token = extract_bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
+
+    user = validate_user_from_token(token, db)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User not found or token invalid")
+
+    # get_db closes the session before the body is streamed; the generator reopens
+    # it lazily and closes it again once the last batch is sent
+    return StreamingResponse(
+        stream_user_events(user.email, db, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="events.{export_format}"'},
+    )
 
 
 @router.get("/events/{event_id}", response_model=EventResponseModel)
@@ -78,7 +221,8 @@ async def update_user_event(
     if token is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
     
-    res = update_event(event_id, event_data.title, event_data.description, event_data.date_time, token, db)
+    res = update_event(event_id, event_data.title, event_data.description, event_data.date_time, token, db,
+                       event_data.latitude, event_data.longitude)
     return check_error(res)
 
 
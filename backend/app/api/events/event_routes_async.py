@@ -0,0 +1,183 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Header, Query, UploadFile, status, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from datetime import datetime
+from typing import Literal, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.response_models import EventResponseModel, EventListResponseModel, EventRequest, EventUpdateRequest
+from app.schemas.response_models import EventBatchRequest, EventBatchResponseModel, EventImportResponseModel
+from app.schemas.response_models import EventChangesResponseModel
+from app.db.async_session import get_async_db
+from app.crud.events_crud import EVENTS_MAX_PAGE_SIZE, EVENTS_CHANGES_PAGE_SIZE, EXPORT_MEDIA_TYPES
+from app.crud.events_crud_async import create_event, get_user_events, get_event_by_id, update_event, delete_event
+from app.crud.events_crud_async import get_events_version, get_event_changes
+from app.crud.events_crud_async import stream_user_events, apply_event_batch, import_ical_events, get_import_progress
+from app.api.events.event_routes import EVENTS_CACHE_CONTROL, check_error, events_list_headers
+from app.crud.weather_crud import add_event_weather
+from app.utils.http_cache import not_modified, not_modified_response
+from app.utils.token_utils import extract_bearer_token, validate_user_from_token_async
+from app.utils.server_timing import TimedRoute, span
+
+
+# Same endpoints as event_routes.py, backed by AsyncSession (mounted when DB_MODE=async)
+router = APIRouter(route_class=TimedRoute)
+
+
+def require_token(authorization: Optional[str]) -> str:
+    token = extract_bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing or invalid Authorization header")
+    return token
+
+
+@router.post("/events", response_model=EventResponseModel)
+async def create_user_event(
+    event_data: EventRequest,
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new event for the authenticated user"""
+    token = require_token(authorization)
+    res = await create_event(event_data.title, event_data.description, event_data.date_time, token, db,
+                             event_data.latitude, event_data.longitude)
+    return check_error(res)
+
+
+@router.post("/events/batch", response_model=EventBatchResponseModel)
+async def batch_events(
+    batch: EventBatchRequest,
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create, update and delete many events in one request and one transaction"""
+    token = require_token(authorization)
+    res = await apply_event_batch(batch.operations, token, db)
+    return check_error(res)
+
+
+@router.post("/events/import", response_model=EventImportResponseModel)
+async def import_events(
+    file: UploadFile = File(..., description="iCalendar (.ics) file"),
+    import_id: Optional[str] = Query(None, max_length=64, description="Client-chosen id to poll progress with"),
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Import the events of an iCalendar file, skipping UIDs that were already imported"""
+    token = require_token(authorization)
+    res = await import_ical_events(file.file, token, db, import_id)
+    return check_error(res)
+
+
+@router.get("/events/import/{import_id}", response_model=EventImportResponseModel)
+async def get_import_status(
+    import_id: str,
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Progress of a running or recent import started with ?import_id="""
+    token = require_token(authorization)
+    res = await get_import_progress(import_id, token, db)
+    return check_error(res)
+
+
+@router.get("/events", response_model=EventListResponseModel)
+async def get_events(
+    request: Request,
+    date_from: Optional[datetime] = Query(None, alias="from", description="Only events at or after this time"),
+    date_to: Optional[datetime] = Query(None, alias="to", description="Only events before this time"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=EVENTS_MAX_PAGE_SIZE, description="Page size"),
+    weather: bool = Query(False, description="Attach the forecast hour nearest each event"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Location for events without one (with weather)"),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    temperature_unit: Literal["celsius", "fahrenheit"] = Query("celsius"),
+    wind_speed_unit: Literal["kmh", "ms", "mph", "kn"] = Query("kmh"),
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of events for the authenticated user, optionally within a date range and with their weather"""
+    token = require_token(authorization)
+    headers = {"Cache-Control": EVENTS_CACHE_CONTROL}
+    if not weather:
+        version = check_error(await get_events_version(token, db)).data
+        headers = events_list_headers(version, date_from, date_to, cursor, limit)
+        if not_modified(request.headers, headers["ETag"], version["modified_at"]):
+            return not_modified_response(headers)
+
+    res = check_error(await get_user_events(token, db, date_from, date_to, cursor, limit))
+    if weather:
+        await add_event_weather(res.data["events"], lat, lon, temperature_unit, wind_speed_unit)
+    with span("serialize"):
+        return ORJSONResponse({"message": res.message, "data": res.data, "error": res.error}, headers=headers)
+
+
+@router.get("/events/changes", response_model=EventChangesResponseModel)
+async def get_changes(
+    since: Optional[str] = Query(None, description="cursor from the previous sync; omit for a full sync"),
+    limit: Optional[int] = Query(None, ge=1, le=EVENTS_CHANGES_PAGE_SIZE, description="Changes per page"),
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Events created, updated or deleted since the last sync, for clients that keep a local copy"""
+    token = require_token(authorization)
+    res = check_error(await get_event_changes(token, db, since, limit))
+    with span("serialize"):
+        return ORJSONResponse({"message": res.message, "data": res.data, "error": res.error},
+                              headers={"Cache-Control": EVENTS_CACHE_CONTROL})
+
+
+@router.get("/events/export", response_class=StreamingResponse)
+async def export_events(
+    export_format: Literal["ndjson", "csv", "ics"] = Query("ndjson", alias="format", description="Export format"),
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream the authenticated user's full event history as NDJSON, CSV or iCalendar"""
+    token = require_token(authorization)
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User not found or token invalid")
+
+    # as in the sync route, the session is reopened by the generator after get_async_db closes it
+    return StreamingResponse(
+        stream_user_events(user.email, db, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="events.{export_format}"'},
+    )
+
+
+@router.get("/events/{event_id}", response_model=EventResponseModel)
+async def get_event(
+    event_id: int,
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a specific event by ID"""
+    token = require_token(authorization)
+    res = await get_event_by_id(event_id, token, db)
+    return check_error(res)
+
+
+@router.put("/events/{event_id}", response_model=EventResponseModel)
+async def update_user_event(
+    event_id: int,
+    event_data: EventUpdateRequest,
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update an existing event"""
+    token = require_token(authorization)
+    res = await update_event(event_id, event_data.title, event_data.description, event_data.date_time, token, db,
+                             event_data.latitude, event_data.longitude)
+    return check_error(res)
+
+
+@router.delete("/events/{event_id}", response_model=EventResponseModel)
+async def delete_user_event(
+    event_id: int,
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete an event"""
+    token = require_token(authorization)
+    res = await delete_event(event_id, token, db)
+    return check_error(res)
@@ -0,0 +1,52 @@
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import PlainTextResponse
+from app.schemas.response_models import MetricsResponseModel
+from app.db.pool_metrics import pool_metrics
+from app.utils.forecast_cache import forecast_cache
+from app.utils.open_meteo import open_meteo_client
+from app.utils.geocoding_cache import geocoding_cache
+from app.crud.weather_crud import forecast_prefetcher, geocoding_flight
+from app.utils.metrics import CONTENT_TYPE, metrics_access, metrics_exporter, metrics_registry, render
+from app.utils.token_utils import extract_bearer_token
+from app.utils.server_timing import TimedRoute
+
+def require_metrics_token(authorization: str = Header(None)):
+    # without METRICS_TOKEN the metrics are not there at all
+    if not metrics_access.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not metrics_access.authorized(extract_bearer_token(authorization)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing or invalid metrics token")
+
+
+# Every endpoint needs the METRICS_TOKEN as "Authorization: Bearer <token>"
+router = APIRouter(route_class=TimedRoute, dependencies=[Depends(require_metrics_token)])
+# Mounted at the root: Prometheus scrapes /metrics by default
+prometheus_router = APIRouter(route_class=TimedRoute, dependencies=[Depends(require_metrics_token)])
+
+# live counters: never serve them from a cache
+METRICS_CACHE_CONTROL = "no-store"
+
+@router.get("/metrics/db-pool", response_model=MetricsResponseModel)
+def db_pool_metrics(response: Response):
+    """Connection pool telemetry of each engine in this worker: checkout latency, in-use connections, timeouts and churn"""
+    response.headers["Cache-Control"] = METRICS_CACHE_CONTROL
+    return MetricsResponseModel(message="Connection pool metrics",
+                                data={name: metrics.stats() for name, metrics in pool_metrics.items()})
+
+@router.get("/metrics/weather", response_model=MetricsResponseModel)
+def weather_metrics(response: Response):
+    """Forecast cache, prefetcher and place-search counters and upstream calls of this worker"""
+    response.headers["Cache-Control"] = METRICS_CACHE_CONTROL
+    return MetricsResponseModel(message="Weather cache metrics",
+                                data={"cache": forecast_cache.stats(), "prefetch": forecast_prefetcher.stats(),
+                                      "geocoding": {**geocoding_cache.stats(), "upstream_calls": geocoding_flight.calls,
+                                                    "coalesced": geocoding_flight.shared},
+                                      "upstream_requests": open_meteo_client.requests})
+
+@prometheus_router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Request counts, status codes, latency histograms and database use per route, in the Prometheus
+    text format, summed over all worker processes when METRICS_DIR is set"""
+    return PlainTextResponse(render(metrics_registry, metrics_exporter.collect()), media_type=CONTENT_TYPE,
+                             headers={"Cache-Control": METRICS_CACHE_CONTROL})
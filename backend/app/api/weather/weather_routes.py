@@ -0,0 +1,85 @@
+from fastapi import APIRouter, HTTPException, Path, Query, Request, status
+from fastapi.responses import ORJSONResponse
+from decouple import config
+from typing import Literal
+import math
+import time
+from app.schemas.response_models import LocationsResponseModel, WeatherResponseModel
+from app.crud.weather_crud import daily_summary_response, forecast_response, get_forecast_entry, search_locations
+from app.utils.forecast_cache import WEATHER_STALE_SECONDS
+from app.utils.http_cache import make_etag, not_modified, not_modified_response, validator_headers
+from app.utils.server_timing import TimedRoute
+
+
+router = APIRouter(route_class=TimedRoute)
+
+# Seconds browsers may reuse place search results (places hardly ever change)
+GEOCODE_MAX_AGE = int(config("GEOCODE_MAX_AGE", default=86400))
+
+
+def check_error(res):
+    if res.error:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=res.error)
+    return res
+
+
+def forecast_headers(etag: str, cached, expires_at: float) -> dict:
+    # browsers may reuse the response until the cached forecast itself expires, and a while
+    # longer while they revalidate, like the server cache does with the upstream
+    max_age = max(0, math.floor(expires_at - time.time()))
+    return validator_headers(etag, cached.fetched_at,
+                             f"public, max-age={max_age}, stale-while-revalidate={WEATHER_STALE_SECONDS}")
+
+
+async def conditional_forecast(request: Request, forecast_type: str, lat: float, lon: float,
+                               temperature_unit: str, wind_speed_unit: str, etag_prefix: str, build):
+    """Response for a forecast-derived endpoint: 304 when the client's validators match the
+    cached entry, before anything is built or encoded; otherwise build(entry) as JSON.
+    """
+    res, cached, expires_at = await get_forecast_entry(forecast_type, lat, lon, temperature_unit, wind_speed_unit)
+    check_error(res)
+    headers = forecast_headers(make_etag(etag_prefix, cached.digest), cached, expires_at)
+    if not_modified(request.headers, headers["ETag"], cached.fetched_at):
+        return not_modified_response(headers)
+    res = build(cached)
+    return ORJSONResponse({"message": res.message, "data": res.data, "error": res.error}, headers=headers)
+
+
+# before /weather/{forecast_type}, which would otherwise match it
+@router.get("/weather/daily-summary", response_model=WeatherResponseModel)
+async def get_weather_daily_summary(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    temperature_unit: Literal["celsius", "fahrenheit"] = Query("celsius"),
+    wind_speed_unit: Literal["kmh", "ms", "mph", "kn"] = Query("kmh"),
+):
+    """Per-day min/max/mean and precipitation sums aggregated from the hourly forecast"""
+    return await conditional_forecast(request, "hourly", lat, lon, temperature_unit, wind_speed_unit,
+                                      "daily-summary", daily_summary_response)
+
+
+@router.get("/weather/{forecast_type}", response_model=WeatherResponseModel)
+async def get_weather(
+    request: Request,
+    forecast_type: Literal["current", "daily", "hourly"] = Path(..., description="Current conditions, 14-day daily or 14-day hourly forecast"),
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    temperature_unit: Literal["celsius", "fahrenheit"] = Query("celsius"),
+    wind_speed_unit: Literal["kmh", "ms", "mph", "kn"] = Query("kmh"),
+):
+    """Open-Meteo forecast for a location, served from a cache shared by all users nearby"""
+    return await conditional_forecast(request, forecast_type, lat, lon, temperature_unit, wind_speed_unit,
+                                      forecast_type, forecast_response)
+
+
+@router.get("/geocode", response_model=LocationsResponseModel)
+async def geocode(
+    name: str = Query(..., min_length=2, description="City name or postal code"),
+    count: int = Query(10, ge=1, le=100),
+    language: str = Query("en", min_length=2, max_length=8),
+):
+    """Search places by name"""
+    res = check_error(await search_locations(name, count, language))
+    return ORJSONResponse({"message": res.message, "data": res.data, "error": res.error},
+                          headers={"Cache-Control": f"public, max-age={GEOCODE_MAX_AGE}"})
@@ -1,15 +1,136 @@
 # CRUD operations for events
-from sqlalchemy import select
+import base64
+import csv
+import heapq
+import io
+import orjson
+import threading
+from collections import OrderedDict
+from sqlalchemy import select, insert, update, delete, and_, or_
 from sqlalchemy.orm import Session
+from decouple import config
 from app.schemas.response_models import *
-from app.db.models.events_ORM import EventORM
+from app.db.models.events_ORM import EventORM, EventTombstoneORM
 from app.db.models.users_ORM import UserORM
 from app.utils.token_utils import validate_user_from_token
-from datetime import datetime
-from typing import List, Optional
+from app.utils.server_timing import span
+from app.utils import ical_utils
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional
 
 
-def create_event(title: str, description: Optional[str], date_time: datetime, token: str, db: Session) -> EventResponseModel:
+EVENTS_PAGE_SIZE = int(config("EVENTS_PAGE_SIZE", default=500))
+EVENTS_MAX_PAGE_SIZE = int(config("EVENTS_MAX_PAGE_SIZE", default=1000))
+
+EVENTS_EXPORT_BATCH_SIZE = int(config("EVENTS_EXPORT_BATCH_SIZE", default=1000))
+EVENTS_IMPORT_BATCH_SIZE = int(config("EVENTS_IMPORT_BATCH_SIZE", default=1000))
+EVENTS_CHANGES_PAGE_SIZE = int(config("EVENTS_CHANGES_PAGE_SIZE", default=1000))  # changes per page, at most
+
+# Columns read by the list endpoint; user_email is already known from the token
+EVENT_LIST_COLUMNS = (EventORM.id, EventORM.title, EventORM.description, EventORM.date_time)
+EVENT_PAGE_COLUMNS = EVENT_LIST_COLUMNS + (EventORM.latitude, EventORM.longitude)
+EVENT_CHANGE_COLUMNS = EVENT_PAGE_COLUMNS + (EventORM.change_seq, EventORM.updated_at)
+
+# format -> media type of GET /api/events/export
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "ics": "text/calendar",
+}
+
+
+def encode_events_cursor(date_time: datetime, event_id: int) -> str:
+    """Opaque keyset cursor pointing just after the given (date_time, id)."""
+    raw = f"{date_time.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_events_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of encode_events_cursor. Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date_part, id_part = raw.rsplit("|", 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def encode_changes_cursor(change_seq: int, event_id: int) -> str:
+    """Opaque delta-sync cursor pointing just after the change (change_seq, event_id)."""
+    return base64.urlsafe_b64encode(f"{change_seq}|{event_id}".encode()).decode().rstrip("=")
+
+
+def decode_changes_cursor(cursor: str) -> tuple[int, int]:
+    """Inverse of encode_changes_cursor. Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        seq_part, id_part = raw.split("|")
+        return int(seq_part), int(id_part)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    # event times are stored as naive wall-clock values, compare filters the same way
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo is not None else value
+
+
+def _event_data(event: EventORM) -> dict:
+    return {
+        "id": event.id,
+        "title": event.title,
+        "description": event.description,
+        "date_time": event.date_time.isoformat(),
+        "user_email": event.user_email,
+        "latitude": event.latitude,
+        "longitude": event.longitude
+    }
+
+
+def _bump_events_version(user_email: str, now: datetime):
+    """UPDATE marking the user's events as changed, run in the transaction that changes them
+    before anything else; it returns the new version, which is the change_seq of every event
+    and tombstone that transaction writes. The users row stays locked until commit, so one
+    user's sequence numbers become visible in order.
+    A Core-style bulk UPDATE, so it doesn't invalidate the user cache like ORM user changes do.
+    """
+    return (update(UserORM).where(UserORM.email == user_email)
+            .values(events_version=UserORM.events_version + 1, events_modified_at=now)
+            .returning(UserORM.events_version)
+            .execution_options(synchronize_session=False))
+
+
+_TOMBSTONE_INSERT = insert(EventTombstoneORM)
+
+
+def _tombstone_rows(event_ids: Iterable[int], user_email: str, change_seq: int, now: datetime) -> List[dict]:
+    return [{"event_id": event_id, "user_email": user_email, "change_seq": change_seq, "deleted_at": now}
+            for event_id in event_ids]
+
+
+def get_events_version(token: str, db: Session) -> EventResponseModel:
+    """Version and last change time of the authenticated user's events, for conditional GETs:
+    one primary-key lookup instead of loading and serializing the events.
+    """
+    user = validate_user_from_token(token, db)
+    if user is None:
+        return EventResponseModel(message="Invalid token", error="User not found or token invalid")
+    try:
+        with span("version"):
+            row = db.execute(select(UserORM.events_version, UserORM.events_modified_at)
+                             .where(UserORM.email == user.email)).one()
+    except Exception as e:
+        return EventResponseModel(message="Failed to get events version", error=str(e))
+    return EventResponseModel(message="Events version",
+                              data={"user_email": user.email, "version": row[0], "modified_at": row[1]})
+
+
+def create_event(title: str, description: Optional[str], date_time: datetime, token: str, db: Session,
+                 latitude: Optional[float] = None, longitude: Optional[float] = None) -> EventResponseModel:
     """Create a new event for the authenticated user"""
     # Validate user from token
     user = validate_user_from_token(token, db)
@@ -17,12 +138,18 @@ def create_event(title: str, description: Optional[str], date_time: datetime, to
         return EventResponseModel(message="Invalid token", error="User not found or token invalid")
     
     try:
+        now = _utcnow()
+        change_seq = db.scalar(_bump_events_version(user.email, now))
         # Create new event
         new_event = EventORM(
             title=title,
             description=description,
             date_time=date_time,
-            user_email=user.email
+            user_email=user.email,
+            latitude=latitude,
+            longitude=longitude,
+            change_seq=change_seq,
+            updated_at=now
         )
         db.add(new_event)
         db.commit()
@@ -30,47 +157,159 @@ def create_event(title: str, description: Optional[str], date_time: datetime, to
         
         return EventResponseModel(
             message="Event created successfully",
-            data={
-                "id": new_event.id,
-                "title": new_event.title,
-                "description": new_event.description,
-                "date_time": new_event.date_time.isoformat(),
-                "user_email": new_event.user_email
-            }
+            data=_event_data(new_event)
         )
     except Exception as e:
         return EventResponseModel(message="Failed to create event", error=str(e))
 
 
-def get_user_events(token: str, db: Session) -> EventListResponseModel:
-    """Get all events for the authenticated user"""
+def _events_page_query(user_email: str, date_from: Optional[datetime], date_to: Optional[datetime],
+                       after: Optional[tuple[datetime, int]], page_size: int):
+    # plain rows instead of ORM instances: no identity map, no attribute instrumentation
+    query = select(*EVENT_PAGE_COLUMNS).where(EventORM.user_email == user_email)
+    if date_from is not None:
+        query = query.where(EventORM.date_time >= _naive(date_from))
+    if date_to is not None:
+        query = query.where(EventORM.date_time < _naive(date_to))
+    if after is not None:
+        after_time, after_id = after
+        query = query.where(or_(
+            EventORM.date_time > after_time,
+            and_(EventORM.date_time == after_time, EventORM.id > after_id),
+        ))
+    # fetch one extra row to know whether another page follows
+    return query.order_by(EventORM.date_time, EventORM.id).limit(page_size + 1)
+
+
+def _events_page(rows, page_size: int, email: str) -> EventListResponseModel:
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_events_cursor(rows[-1].date_time, rows[-1].id)
+
+    # date_time stays a datetime; the route encodes it with orjson (same ISO format)
+    events_data = [
+        {"id": event_id, "title": title, "description": description, "date_time": date_time, "user_email": email,
+         "latitude": latitude, "longitude": longitude}
+        for event_id, title, description, date_time, latitude, longitude in rows
+    ]
+
+    # rows come straight from the DB, skip re-validating them
+    return EventListResponseModel.model_construct(
+        message=f"Found {len(events_data)} events",
+        data={"events": events_data, "next_cursor": next_cursor},
+        error=None,
+    )
+
+
+def get_user_events(token: str, db: Session, date_from: Optional[datetime] = None,
+                    date_to: Optional[datetime] = None, cursor: Optional[str] = None,
+                    limit: Optional[int] = None) -> EventListResponseModel:
+    """Get one page of events for the authenticated user, ordered by (date_time, id).
+    `date_from` is inclusive and `date_to` exclusive; `next_cursor` in the response
+    fetches the following page and is None on the last one.
+    """
     # Validate user from token
     user = validate_user_from_token(token, db)
     if user is None:
         return EventListResponseModel(message="Invalid token", error="User not found or token invalid")
-    
+
+    page_size = min(limit or EVENTS_PAGE_SIZE, EVENTS_MAX_PAGE_SIZE)
     try:
-        # Get all events for this user
-        events = db.execute(select(EventORM).where(EventORM.user_email == user.email)).scalars().all()
-        
-        events_data = []
-        for event in events:
-            events_data.append({
-                "id": event.id,
-                "title": event.title,
-                "description": event.description,
-                "date_time": event.date_time.isoformat(),
-                "user_email": event.user_email
-            })
-        
-        return EventListResponseModel(
-            message=f"Found {len(events_data)} events",
-            data={"events": events_data}
-        )
+        after = decode_events_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return EventListResponseModel(message="Failed to get events", error=str(e))
+
+    try:
+        with span("query"):
+            rows = db.execute(_events_page_query(user.email, date_from, date_to, after, page_size)).all()
+        with span("rows"):
+            return _events_page(rows, page_size, user.email)
     except Exception as e:
         return EventListResponseModel(message="Failed to get events", error=str(e))
 
 
+def _changes_queries(user_email: str, after: Optional[tuple[int, int]], page_size: int):
+    """Events and tombstones changed after the (change_seq, id) cursor, page_size + 1 of each.
+    Without a cursor the client has nothing to delete, so tombstones are not read.
+    """
+    seq, event_id = after or (0, 0)
+    events = (
+        select(*EVENT_CHANGE_COLUMNS)
+        .where(EventORM.user_email == user_email,
+               or_(EventORM.change_seq > seq, and_(EventORM.change_seq == seq, EventORM.id > event_id)))
+        .order_by(EventORM.change_seq, EventORM.id)
+        .limit(page_size + 1)
+    )
+    if after is None:
+        return events, None
+    # an id SQLite handed out again to a new event of the same user supersedes its tombstone
+    reused = select(EventORM.id).where(EventORM.id == EventTombstoneORM.event_id,
+                                       EventORM.user_email == EventTombstoneORM.user_email).exists()
+    tombstones = (
+        select(EventTombstoneORM.change_seq, EventTombstoneORM.event_id)
+        .where(EventTombstoneORM.user_email == user_email, ~reused,
+               or_(EventTombstoneORM.change_seq > seq,
+                   and_(EventTombstoneORM.change_seq == seq, EventTombstoneORM.event_id > event_id)))
+        .order_by(EventTombstoneORM.change_seq, EventTombstoneORM.event_id)
+        .limit(page_size + 1)
+    )
+    return events, tombstones
+
+
+def _changes_page(event_rows, tombstone_rows, page_size: int, email: str,
+                  since: Optional[str]) -> EventChangesResponseModel:
+    # merge both streams in (change_seq, id) order and keep the first page_size changes
+    changes = heapq.merge(((row.change_seq, row.id, 1, row) for row in event_rows),
+                          ((seq, event_id, 0, None) for seq, event_id in tombstone_rows))
+    page = [change for _, change in zip(range(page_size + 1), changes)]
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    events, deleted = [], []
+    for seq, event_id, _, row in page:
+        if row is None:
+            deleted.append(event_id)
+        else:
+            events.append({"id": row.id, "title": row.title, "description": row.description,
+                           "date_time": row.date_time, "user_email": email, "latitude": row.latitude,
+                           "longitude": row.longitude, "change_seq": seq, "updated_at": row.updated_at})
+    cursor = encode_changes_cursor(page[-1][0], page[-1][1]) if page else since or encode_changes_cursor(0, 0)
+    return EventChangesResponseModel.model_construct(
+        message=f"Found {len(events)} changed and {len(deleted)} deleted events",
+        data={"events": events, "deleted": deleted, "cursor": cursor, "has_more": has_more},
+        error=None,
+    )
+
+
+def get_event_changes(token: str, db: Session, since: Optional[str] = None,
+                      limit: Optional[int] = None) -> EventChangesResponseModel:
+    """Events of the authenticated user created, updated or deleted after the `since` cursor,
+    in the order they changed. `events` holds their current state and `deleted` the ids to drop;
+    `cursor` is passed as `since` next time, and `has_more` says to ask again right away.
+    Without `since` every event is returned (a full sync), so the cost is O(changes), not O(history).
+    """
+    user = validate_user_from_token(token, db)
+    if user is None:
+        return EventChangesResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    page_size = min(limit or EVENTS_CHANGES_PAGE_SIZE, EVENTS_CHANGES_PAGE_SIZE)
+    try:
+        after = decode_changes_cursor(since) if since else None
+    except ValueError as e:
+        return EventChangesResponseModel(message="Failed to get event changes", error=str(e))
+
+    try:
+        events, tombstones = _changes_queries(user.email, after, page_size)
+        with span("query"):
+            event_rows = db.execute(events).all()
+            tombstone_rows = db.execute(tombstones).all() if tombstones is not None else []
+        with span("rows"):
+            return _changes_page(event_rows, tombstone_rows, page_size, user.email, since)
+    except Exception as e:
+        return EventChangesResponseModel(message="Failed to get event changes", error=str(e))
+
+
 def get_event_by_id(event_id: int, token: str, db: Session) -> EventResponseModel:
     """Get a specific event by ID (only if user owns it)"""
     # Validate user from token
@@ -92,20 +331,15 @@ def get_event_by_id(event_id: int, token: str, db: Session) -> EventResponseMode
         
         return EventResponseModel(
             message="Event found",
-            data={
-                "id": event.id,
-                "title": event.title,
-                "description": event.description,
-                "date_time": event.date_time.isoformat(),
-                "user_email": event.user_email
-            }
+            data=_event_data(event)
         )
     except Exception as e:
         return EventResponseModel(message="Failed to get event", error=str(e))
 
 
 def update_event(event_id: int, title: Optional[str], description: Optional[str], 
-                date_time: Optional[datetime], token: str, db: Session) -> EventResponseModel:
+                date_time: Optional[datetime], token: str, db: Session,
+                latitude: Optional[float] = None, longitude: Optional[float] = None) -> EventResponseModel:
     """Update an event (only if user owns it)"""
     # Validate user from token
     user = validate_user_from_token(token, db)
@@ -131,19 +365,20 @@ def update_event(event_id: int, title: Optional[str], description: Optional[str]
             setattr(event, "description", description)
         if date_time is not None:
             setattr(event, "date_time", date_time)
+        if latitude is not None:
+            setattr(event, "latitude", latitude)
+        if longitude is not None:
+            setattr(event, "longitude", longitude)
         
+        now = _utcnow()
+        event.change_seq = db.scalar(_bump_events_version(user.email, now))
+        event.updated_at = now
         db.commit()
         db.refresh(event)
         
         return EventResponseModel(
             message="Event updated successfully",
-            data={
-                "id": event.id,
-                "title": event.title,
-                "description": event.description,
-                "date_time": event.date_time.isoformat(),
-                "user_email": event.user_email
-            }
+            data=_event_data(event)
         )
     except Exception as e:
         return EventResponseModel(message="Failed to update event", error=str(e))
@@ -168,7 +403,10 @@ def delete_event(event_id: int, token: str, db: Session) -> EventResponseModel:
         if event is None:
             return EventResponseModel(message="Event not found", error="Event not found or not accessible")
         
+        now = _utcnow()
+        change_seq = db.scalar(_bump_events_version(user.email, now))
         db.delete(event)
+        db.execute(_TOMBSTONE_INSERT, _tombstone_rows([event_id], user.email, change_seq, now))
         db.commit()
         
         return EventResponseModel(
@@ -177,3 +415,309 @@ def delete_event(event_id: int, token: str, db: Session) -> EventResponseModel:
         )
     except Exception as e:
         return EventResponseModel(message="Failed to delete event", error=str(e))
+
+
+_BATCH_INSERT = insert(EventORM).returning(EventORM.id, sort_by_parameter_order=True)
+
+
+def _plan_event_batch(operations: List[EventBatchOperation]):
+    """Per-item results plus the indexes of valid creates, updates and deletes."""
+    results: List[dict] = [{"index": i, "op": op.op, "id": op.id, "error": None} for i, op in enumerate(operations)]
+    creates, updates, deletes = [], [], []
+    for i, op in enumerate(operations):
+        if op.op == "create":
+            if op.title is None or op.date_time is None:
+                results[i]["error"] = "title and date_time are required"
+            else:
+                creates.append(i)
+        elif op.id is None:
+            results[i]["error"] = "id is required"
+        elif op.op == "update":
+            updates.append(i)
+        else:
+            deletes.append(i)
+    return results, creates, updates, deletes
+
+
+def _owned_events_query(event_ids, user_email: str):
+    return select(EventORM.id).where(EventORM.id.in_(event_ids), EventORM.user_email == user_email)
+
+
+def _drop_unowned(operations, results, updates, deletes, owned):
+    for i in updates + deletes:
+        if operations[i].id not in owned:
+            results[i]["error"] = "Event not found or not accessible"
+    return ([i for i in updates if results[i]["error"] is None],
+            [i for i in deletes if results[i]["error"] is None])
+
+
+def _batch_create_rows(operations, creates, user_email: str) -> List[dict]:
+    return [{"title": operations[i].title, "description": operations[i].description,
+             "date_time": operations[i].date_time, "user_email": user_email,
+             "latitude": operations[i].latitude, "longitude": operations[i].longitude} for i in creates]
+
+
+def _batch_update_rows(operations, updates) -> List[dict]:
+    rows = []
+    for i in updates:
+        op = operations[i]
+        row = {"id": op.id}
+        if op.title is not None:
+            row["title"] = op.title
+        if op.description is not None:
+            row["description"] = op.description
+        if op.date_time is not None:
+            row["date_time"] = op.date_time
+        if op.latitude is not None:
+            row["latitude"] = op.latitude
+        if op.longitude is not None:
+            row["longitude"] = op.longitude
+        if len(row) > 1:
+            rows.append(row)
+    return rows
+
+
+def _stamp_rows(rows: List[dict], change_seq: int, now: datetime) -> List[dict]:
+    for row in rows:
+        row["change_seq"] = change_seq
+        row["updated_at"] = now
+    return rows
+
+
+def _batch_delete(operations, deletes, user_email: str):
+    return delete(EventORM).where(EventORM.id.in_([operations[i].id for i in deletes]),
+                                  EventORM.user_email == user_email)
+
+
+def _batch_response(operations, results, creates, updates, deletes) -> EventBatchResponseModel:
+    counts = {"created": len(creates), "updated": len(updates), "deleted": len(deletes)}
+    failed = sum(1 for r in results if r["error"] is not None)
+    return EventBatchResponseModel(
+        message=f"Applied {len(operations) - failed} of {len(operations)} operations",
+        data={"results": results, **counts, "failed": failed},
+    )
+
+
+def apply_event_batch(operations: List[EventBatchOperation], token: str, db: Session) -> EventBatchResponseModel:
+    """Apply many create/update/delete operations with one token check and one commit.
+    Creates are inserted with a single multi-row INSERT, updates with one executemany
+    and deletes with one DELETE. Operations run in that order (creates, updates,
+    deletes). Invalid items, or items on events the user does not own, are reported
+    in their result and skipped; if the database rejects the batch nothing is applied.
+    Everything the batch changes shares one change_seq.
+    """
+    # Validate user from token (once for the whole batch)
+    user = validate_user_from_token(token, db)
+    if user is None:
+        return EventBatchResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    results, creates, updates, deletes = _plan_event_batch(operations)
+    try:
+        # one query to find which of the referenced events this user owns
+        referenced = {operations[i].id for i in updates + deletes}
+        owned = set()
+        if referenced:
+            owned = set(db.scalars(_owned_events_query(referenced, user.email)))
+        updates, deletes = _drop_unowned(operations, results, updates, deletes, owned)
+
+        rows = _batch_update_rows(operations, updates)
+        if creates or rows or deletes:
+            now = _utcnow()
+            change_seq = db.scalar(_bump_events_version(user.email, now))
+
+        if creates:
+            new_ids = db.scalars(_BATCH_INSERT, _stamp_rows(_batch_create_rows(operations, creates, user.email),
+                                                            change_seq, now)).all()
+            for i, new_id in zip(creates, new_ids):
+                results[i]["id"] = new_id
+
+        if rows:
+            # ORM bulk UPDATE by primary key, executemany per distinct set of columns
+            db.execute(update(EventORM), _stamp_rows(rows, change_seq, now))
+
+        if deletes:
+            db.execute(_batch_delete(operations, deletes, user.email))
+            db.execute(_TOMBSTONE_INSERT, _tombstone_rows({operations[i].id for i in deletes}, user.email,
+                                                          change_seq, now))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        return EventBatchResponseModel(message="Failed to apply batch", error=str(e))
+
+    return _batch_response(operations, results, creates, updates, deletes)
+
+
+def _encode_ndjson(rows, email: str) -> bytes:
+    return b"".join(
+        orjson.dumps({"id": event_id, "title": title, "description": description,
+                      "date_time": date_time, "user_email": email}) + b"\n"
+        for event_id, title, description, date_time in rows
+    )
+
+
+def _encode_csv(rows, email: str) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows((event_id, title, description or "", date_time.isoformat(), email)
+                     for event_id, title, description, date_time in rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_ics(rows, email: str) -> bytes:
+    stamp = datetime.now(timezone.utc)
+    # imported events keep the UID they came with
+    return "".join(
+        ical_utils.format_vevent(ical_uid or f"event-{event_id}@weatherstation", title, description, date_time, stamp)
+        for event_id, title, description, date_time, ical_uid in rows
+    ).encode()
+
+
+_EXPORT_ENCODERS = {"ndjson": _encode_ndjson, "csv": _encode_csv, "ics": _encode_ics}
+_EXPORT_HEADERS = {
+    "ndjson": b"",
+    "csv": b"id,title,description,date_time,user_email\r\n",
+    "ics": ical_utils.calendar_header().encode(),
+}
+_EXPORT_FOOTERS = {"ndjson": b"", "csv": b"", "ics": ical_utils.calendar_footer().encode()}
+
+
+def _export_query(user_email: str, export_format: str, batch_size: int):
+    columns = EVENT_LIST_COLUMNS + (EventORM.ical_uid,) if export_format == "ics" else EVENT_LIST_COLUMNS
+    return (
+        select(*columns)
+        .where(EventORM.user_email == user_email)
+        .order_by(EventORM.date_time, EventORM.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+
+def stream_user_events(user_email: str, db: Session, export_format: str = "ndjson",
+                       batch_size: int = EVENTS_EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Yield a user's full event history encoded as `export_format`, one chunk per batch.
+    Rows are pulled through a server-side cursor `batch_size` at a time, so memory
+    stays constant however long the history is. Closes `db` when exhausted.
+    """
+    encode = _EXPORT_ENCODERS[export_format]
+    try:
+        if _EXPORT_HEADERS[export_format]:
+            yield _EXPORT_HEADERS[export_format]
+        for rows in db.execute(_export_query(user_email, export_format, batch_size)).partitions():
+            yield encode(rows, user_email)
+        if _EXPORT_FOOTERS[export_format]:
+            yield _EXPORT_FOOTERS[export_format]
+    finally:
+        db.close()
+
+
+# Progress of recent imports in this process, keyed by (user_email, import_id)
+_import_progress: "OrderedDict[tuple[str, str], dict]" = OrderedDict()
+_import_progress_lock = threading.Lock()
+_IMPORT_PROGRESS_KEEP = 256
+
+
+def _set_import_progress(user_email: str, import_id: Optional[str], progress: dict) -> None:
+    if import_id is None:
+        return
+    with _import_progress_lock:
+        _import_progress[(user_email, import_id)] = dict(progress)
+        _import_progress.move_to_end((user_email, import_id))
+        while len(_import_progress) > _IMPORT_PROGRESS_KEEP:
+            _import_progress.popitem(last=False)
+
+
+def _insert_ignoring_duplicate_uids(db: Session):
+    """INSERT that silently skips rows whose (user_email, ical_uid) already exists."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return (dialect_insert(EventORM)
+            .on_conflict_do_nothing(index_elements=["user_email", "ical_uid"])
+            .returning(EventORM.id))
+
+
+def _import_batches(lines: Iterable[bytes], progress: dict, user_email: str, batch_size: int) -> Iterator[List[dict]]:
+    """Rows to insert from an iCalendar stream, `batch_size` at a time; counts processed/skipped events."""
+    batch: List[dict] = []
+    for vevent in ical_utils.iter_vevents(lines):
+        progress["processed"] += 1
+        if vevent["date_time"] is None:
+            progress["skipped"] += 1
+            continue
+        batch.append({"title": vevent["title"] or "Untitled event", "description": vevent["description"],
+                      "date_time": vevent["date_time"], "user_email": user_email, "ical_uid": vevent["uid"]})
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _import_result(progress: dict) -> EventImportResponseModel:
+    return EventImportResponseModel(
+        message=f"Imported {progress['inserted']} of {progress['processed']} events",
+        data=progress,
+    )
+
+
+def import_ical_events(lines: Iterable[bytes], token: str, db: Session, import_id: Optional[str] = None,
+                       batch_size: int = EVENTS_IMPORT_BATCH_SIZE) -> EventImportResponseModel:
+    """Import the VEVENTs of an iCalendar stream for the authenticated user.
+    The stream is parsed line by line and inserted `batch_size` events at a time, each
+    batch in its own transaction, so memory is bounded by one batch. Events whose UID
+    the user already has (or that repeat within the file) are counted as duplicates;
+    events without DTSTART are skipped. When `import_id` is given, progress can be read
+    with get_import_progress while the import runs.
+    """
+    # Validate user from token
+    user = validate_user_from_token(token, db)
+    if user is None:
+        return EventImportResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    progress = {"import_id": import_id, "status": "running", "processed": 0,
+                "inserted": 0, "duplicates": 0, "skipped": 0}
+    _set_import_progress(user.email, import_id, progress)
+    statement = _insert_ignoring_duplicate_uids(db)
+
+    def flush(batch: List[dict]) -> None:
+        now = _utcnow()
+        change_seq = db.scalar(_bump_events_version(user.email, now))
+        inserted = len(db.execute(statement, _stamp_rows(batch, change_seq, now)).all())
+        if inserted:
+            db.commit()
+        else:
+            # all duplicates: leave the version (and so the list's ETag) alone
+            db.rollback()
+        progress["inserted"] += inserted
+        progress["duplicates"] += len(batch) - inserted
+        _set_import_progress(user.email, import_id, progress)
+
+    try:
+        for batch in _import_batches(lines, progress, user.email, batch_size):
+            flush(batch)
+    except Exception as e:
+        db.rollback()
+        progress["status"] = "failed"
+        _set_import_progress(user.email, import_id, progress)
+        # batches committed so far stay imported; re-running the import skips them by UID
+        return EventImportResponseModel(message="Import failed", data=progress, error=str(e))
+
+    progress["status"] = "done"
+    _set_import_progress(user.email, import_id, progress)
+    return _import_result(progress)
+
+
+def get_import_progress(import_id: str, token: str, db: Session) -> EventImportResponseModel:
+    """Progress of an import started by the authenticated user in this worker process"""
+    user = validate_user_from_token(token, db)
+    if user is None:
+        return EventImportResponseModel(message="Invalid token", error="User not found or token invalid")
+    return _import_progress_response(user.email, import_id)
+
+
+def _import_progress_response(user_email: str, import_id: str) -> EventImportResponseModel:
+    with _import_progress_lock:
+        progress = _import_progress.get((user_email, import_id))
+    if progress is None:
+        return EventImportResponseModel(message="Import not found", error="Unknown import id")
+    return EventImportResponseModel(message=f"Import {progress['status']}", data=progress)
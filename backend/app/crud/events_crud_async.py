@@ -0,0 +1,315 @@
+# AsyncSession versions of the event CRUD operations in events_crud.py (used when DB_MODE=async).
+# Queries, validation and response building are shared with the sync module; only the I/O differs.
+import asyncio
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.response_models import *
+from app.db.models.events_ORM import EventORM
+from app.db.models.users_ORM import UserORM
+from app.db.async_session import serialized_writes
+from app.utils.token_utils import validate_user_from_token_async
+from app.utils.server_timing import span
+from app.crud.events_crud import (
+    EVENTS_PAGE_SIZE, EVENTS_MAX_PAGE_SIZE, EVENTS_EXPORT_BATCH_SIZE, EVENTS_IMPORT_BATCH_SIZE,
+    EVENTS_CHANGES_PAGE_SIZE,
+    decode_events_cursor, _event_data, _events_page_query, _events_page, _bump_events_version, _utcnow,
+    decode_changes_cursor, _changes_queries, _changes_page, _TOMBSTONE_INSERT, _tombstone_rows, _stamp_rows,
+    _BATCH_INSERT, _plan_event_batch, _owned_events_query, _drop_unowned, _batch_create_rows,
+    _batch_update_rows, _batch_delete, _batch_response,
+    _EXPORT_ENCODERS, _EXPORT_HEADERS, _EXPORT_FOOTERS, _export_query,
+    _set_import_progress, _insert_ignoring_duplicate_uids, _import_batches, _import_result,
+    _import_progress_response,
+)
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Optional
+
+
+async def create_event(title: str, description: Optional[str], date_time: datetime, token: str, db: AsyncSession,
+                       latitude: Optional[float] = None, longitude: Optional[float] = None) -> EventResponseModel:
+    """Create a new event for the authenticated user"""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    try:
+        # INSERT ... RETURNING instead of add/commit/refresh: one round trip to the driver fewer
+        async with serialized_writes(db):
+            now = _utcnow()
+            change_seq = await db.scalar(_bump_events_version(user.email, now))
+            new_event = (await db.scalars(
+                insert(EventORM).returning(EventORM),
+                [{"title": title, "description": description, "date_time": date_time, "user_email": user.email,
+                  "latitude": latitude, "longitude": longitude, "change_seq": change_seq, "updated_at": now}],
+            )).one()
+            await db.commit()
+
+        return EventResponseModel(message="Event created successfully", data=_event_data(new_event))
+    except Exception as e:
+        return EventResponseModel(message="Failed to create event", error=str(e))
+
+
+async def get_events_version(token: str, db: AsyncSession) -> EventResponseModel:
+    """Version and last change time of the authenticated user's events (see events_crud.get_events_version)."""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventResponseModel(message="Invalid token", error="User not found or token invalid")
+    try:
+        with span("version"):
+            row = (await db.execute(select(UserORM.events_version, UserORM.events_modified_at)
+                                    .where(UserORM.email == user.email))).one()
+    except Exception as e:
+        return EventResponseModel(message="Failed to get events version", error=str(e))
+    return EventResponseModel(message="Events version",
+                              data={"user_email": user.email, "version": row[0], "modified_at": row[1]})
+
+
+async def get_user_events(token: str, db: AsyncSession, date_from: Optional[datetime] = None,
+                          date_to: Optional[datetime] = None, cursor: Optional[str] = None,
+                          limit: Optional[int] = None) -> EventListResponseModel:
+    """Get one page of events for the authenticated user, ordered by (date_time, id)."""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventListResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    page_size = min(limit or EVENTS_PAGE_SIZE, EVENTS_MAX_PAGE_SIZE)
+    try:
+        after = decode_events_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return EventListResponseModel(message="Failed to get events", error=str(e))
+
+    try:
+        with span("query"):
+            rows = (await db.execute(_events_page_query(user.email, date_from, date_to, after, page_size))).all()
+        with span("rows"):
+            return _events_page(rows, page_size, user.email)
+    except Exception as e:
+        return EventListResponseModel(message="Failed to get events", error=str(e))
+
+
+async def get_event_changes(token: str, db: AsyncSession, since: Optional[str] = None,
+                            limit: Optional[int] = None) -> EventChangesResponseModel:
+    """Events changed or deleted after the `since` cursor (see events_crud.get_event_changes)."""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventChangesResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    page_size = min(limit or EVENTS_CHANGES_PAGE_SIZE, EVENTS_CHANGES_PAGE_SIZE)
+    try:
+        after = decode_changes_cursor(since) if since else None
+    except ValueError as e:
+        return EventChangesResponseModel(message="Failed to get event changes", error=str(e))
+
+    try:
+        events, tombstones = _changes_queries(user.email, after, page_size)
+        with span("query"):
+            event_rows = (await db.execute(events)).all()
+            tombstone_rows = (await db.execute(tombstones)).all() if tombstones is not None else []
+        with span("rows"):
+            return _changes_page(event_rows, tombstone_rows, page_size, user.email, since)
+    except Exception as e:
+        return EventChangesResponseModel(message="Failed to get event changes", error=str(e))
+
+
+async def _get_owned_event(event_id: int, user_email: str, db: AsyncSession) -> EventORM | None:
+    return (await db.execute(
+        select(EventORM).where(EventORM.id == event_id, EventORM.user_email == user_email)
+    )).scalar_one_or_none()
+
+
+async def get_event_by_id(event_id: int, token: str, db: AsyncSession) -> EventResponseModel:
+    """Get a specific event by ID (only if user owns it)"""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    try:
+        event = await _get_owned_event(event_id, user.email, db)
+        if event is None:
+            return EventResponseModel(message="Event not found", error="Event not found or not accessible")
+        return EventResponseModel(message="Event found", data=_event_data(event))
+    except Exception as e:
+        return EventResponseModel(message="Failed to get event", error=str(e))
+
+
+async def update_event(event_id: int, title: Optional[str], description: Optional[str],
+                       date_time: Optional[datetime], token: str, db: AsyncSession,
+                       latitude: Optional[float] = None, longitude: Optional[float] = None) -> EventResponseModel:
+    """Update an event (only if user owns it)"""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    try:
+        # Update fields if provided
+        values = {}
+        if title is not None:
+            values["title"] = title
+        if description is not None:
+            values["description"] = description
+        if date_time is not None:
+            values["date_time"] = date_time
+        if latitude is not None:
+            values["latitude"] = latitude
+        if longitude is not None:
+            values["longitude"] = longitude
+
+        if values:
+            # UPDATE ... RETURNING checks ownership, writes and reads back in one statement
+            async with serialized_writes(db):
+                now = _utcnow()
+                change_seq = await db.scalar(_bump_events_version(user.email, now))
+                event = (await db.scalars(
+                    update(EventORM)
+                    .where(EventORM.id == event_id, EventORM.user_email == user.email)
+                    .values(**values, change_seq=change_seq, updated_at=now)
+                    .returning(EventORM)
+                )).one_or_none()
+                if event is not None:
+                    await db.commit()
+                else:
+                    await db.rollback()
+        else:
+            event = await _get_owned_event(event_id, user.email, db)
+        if event is None:
+            return EventResponseModel(message="Event not found", error="Event not found or not accessible")
+
+        return EventResponseModel(message="Event updated successfully", data=_event_data(event))
+    except Exception as e:
+        return EventResponseModel(message="Failed to update event", error=str(e))
+
+
+async def delete_event(event_id: int, token: str, db: AsyncSession) -> EventResponseModel:
+    """Delete an event (only if user owns it)"""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    try:
+        async with serialized_writes(db):
+            now = _utcnow()
+            change_seq = await db.scalar(_bump_events_version(user.email, now))
+            deleted = (await db.scalars(
+                delete(EventORM)
+                .where(EventORM.id == event_id, EventORM.user_email == user.email)
+                .returning(EventORM.id)
+            )).one_or_none()
+            if deleted is not None:
+                await db.execute(_TOMBSTONE_INSERT, _tombstone_rows([deleted], user.email, change_seq, now))
+                await db.commit()
+            else:
+                await db.rollback()
+        if deleted is None:
+            return EventResponseModel(message="Event not found", error="Event not found or not accessible")
+
+        return EventResponseModel(message="Event deleted successfully", data={"deleted_event_id": event_id})
+    except Exception as e:
+        return EventResponseModel(message="Failed to delete event", error=str(e))
+
+
+async def apply_event_batch(operations: List[EventBatchOperation], token: str, db: AsyncSession) -> EventBatchResponseModel:
+    """Apply many create/update/delete operations with one token check and one commit
+    (see events_crud.apply_event_batch for the semantics).
+    """
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventBatchResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    results, creates, updates, deletes = _plan_event_batch(operations)
+    try:
+        referenced = {operations[i].id for i in updates + deletes}
+        owned = set()
+        if referenced:
+            owned = set(await db.scalars(_owned_events_query(referenced, user.email)))
+        updates, deletes = _drop_unowned(operations, results, updates, deletes, owned)
+
+        rows = _batch_update_rows(operations, updates)
+        async with serialized_writes(db):
+            if creates or rows or deletes:
+                now = _utcnow()
+                change_seq = await db.scalar(_bump_events_version(user.email, now))
+
+            if creates:
+                new_ids = (await db.scalars(_BATCH_INSERT, _stamp_rows(
+                    _batch_create_rows(operations, creates, user.email), change_seq, now))).all()
+                for i, new_id in zip(creates, new_ids):
+                    results[i]["id"] = new_id
+
+            if rows:
+                await db.execute(update(EventORM), _stamp_rows(rows, change_seq, now))
+
+            if deletes:
+                await db.execute(_batch_delete(operations, deletes, user.email))
+                await db.execute(_TOMBSTONE_INSERT, _tombstone_rows({operations[i].id for i in deletes},
+                                                                    user.email, change_seq, now))
+            await db.commit()
+    except Exception as e:
+        await db.rollback()
+        return EventBatchResponseModel(message="Failed to apply batch", error=str(e))
+
+    return _batch_response(operations, results, creates, updates, deletes)
+
+
+async def stream_user_events(user_email: str, db: AsyncSession, export_format: str = "ndjson",
+                             batch_size: int = EVENTS_EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """Async counterpart of events_crud.stream_user_events: streams rows `batch_size` at a
+    time and closes `db` when exhausted.
+    """
+    encode = _EXPORT_ENCODERS[export_format]
+    try:
+        if _EXPORT_HEADERS[export_format]:
+            yield _EXPORT_HEADERS[export_format]
+        result = await db.stream(_export_query(user_email, export_format, batch_size))
+        async for rows in result.partitions():
+            yield encode(rows, user_email)
+        if _EXPORT_FOOTERS[export_format]:
+            yield _EXPORT_FOOTERS[export_format]
+    finally:
+        await db.close()
+
+
+async def import_ical_events(lines: Iterable[bytes], token: str, db: AsyncSession, import_id: Optional[str] = None,
+                             batch_size: int = EVENTS_IMPORT_BATCH_SIZE) -> EventImportResponseModel:
+    """Import the VEVENTs of an iCalendar stream (see events_crud.import_ical_events).
+    Reading and parsing the stream is blocking, so each batch is parsed on a worker thread;
+    the loop only runs the writes.
+    """
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventImportResponseModel(message="Invalid token", error="User not found or token invalid")
+
+    progress = {"import_id": import_id, "status": "running", "processed": 0,
+                "inserted": 0, "duplicates": 0, "skipped": 0}
+    _set_import_progress(user.email, import_id, progress)
+    statement = _insert_ignoring_duplicate_uids(db)
+
+    try:
+        batches = _import_batches(lines, progress, user.email, batch_size)
+        while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+            async with serialized_writes(db):
+                now = _utcnow()
+                change_seq = await db.scalar(_bump_events_version(user.email, now))
+                inserted = len((await db.execute(statement, _stamp_rows(batch, change_seq, now))).all())
+                if inserted:
+                    await db.commit()
+                else:
+                    await db.rollback()
+            progress["inserted"] += inserted
+            progress["duplicates"] += len(batch) - inserted
+            _set_import_progress(user.email, import_id, progress)
+    except Exception as e:
+        await db.rollback()
+        progress["status"] = "failed"
+        _set_import_progress(user.email, import_id, progress)
+        return EventImportResponseModel(message="Import failed", data=progress, error=str(e))
+
+    progress["status"] = "done"
+    _set_import_progress(user.email, import_id, progress)
+    return _import_result(progress)
+
+
+async def get_import_progress(import_id: str, token: str, db: AsyncSession) -> EventImportResponseModel:
+    """Progress of an import started by the authenticated user in this worker process"""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return EventImportResponseModel(message="Invalid token", error="User not found or token invalid")
+    return _import_progress_response(user.email, import_id)
@@ -1,26 +1,42 @@
 # implement the various CRUD actions we need for managing users
-from sqlalchemy import select
+import asyncio
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from app.schemas.response_models import *
 from app.db.models.users_ORM import UserORM
 from app.utils.token_utils import create_access_token, validate_user_from_token
-from app.utils.password_utils import hash_password, verify_password
+from app.utils.password_utils import password_hasher
+from app.utils.server_timing import span
+from app.utils.user_cache import user_cache
 
 
-def login_api_user(email: str, password: str, db: Session) -> LoginResponseModel:
+def _login_credentials(email: str, db: Session) -> tuple[str, int] | None:
+    """(password hash, token_version) of the user with this email, or None.
+    Ends the transaction so no pooled connection is held while the hash is checked."""
+    user = db.execute(select(UserORM).where(UserORM.email == email)).scalar_one_or_none()
+    credentials = None if user is None else (user.password, getattr(user, 'token_version', 0))
+    db.rollback()
+    return credentials
+
+
+async def login_api_user(email: str, password: str, db: Session) -> LoginResponseModel:
     """Endpoint to login and return a JWT accesss token in the response"""
     assert(password is not None and email is not None)
     
-    user = db.execute(select(UserORM).where(UserORM.email == email)).scalar_one_or_none()
-    if user is None:
+    # the session is synchronous: its queries (and pool checkout) run on a worker thread, not the event loop
+    credentials = await asyncio.to_thread(_login_credentials, email, db)
+    if credentials is None:
         return LoginResponseModel(message="Invalid email or password", data=None, error="Invalid credentials")
-    
+    hashed_password, token_version = credentials
+
     # Use secure password verification instead of direct comparison
-    if not verify_password(password, getattr(user, "password")):
+    with span("password"):
+        verified = await password_hasher.verify_password(password, hashed_password)
+    if not verified:
         return LoginResponseModel(message="Invalid email or password", data=None, error="Invalid credentials")
     
     # include token_version to support token revocation/versioning
-    access_token = create_access_token(data={'email': user.email, 'token_version': getattr(user, 'token_version', 0)})
+    access_token = create_access_token(data={'email': email, 'token_version': token_version})
     return LoginResponseModel(message="Login successful", data={"access_token": access_token, "token_type": "bearer"}, error=None)
 
 
@@ -31,26 +47,26 @@ def logout_api_user(token: str, db: Session) -> LogoutResponseModel:
         return LogoutResponseModel(message="Invalid token.", error="User not found or inactive")
     # We increment token_version to invalidate previously issued tokens
     try:
-        current = getattr(user, "token_version", 0) or 0
-        setattr(user, "token_version", current + 1)
-        db.add(user)
+        db.execute(
+            update(UserORM)
+            .where(UserORM.email == user.email)
+            .values(token_version=UserORM.token_version + 1)
+        )
         db.commit()
     except Exception:
         return LogoutResponseModel(message="Logout failed", error="Could not update token version")
+    # bulk UPDATE bypasses the ORM events, so drop the cached snapshot explicitly
+    user_cache.invalidate(user.email)
     return LogoutResponseModel(message="Logout successful")
     
 
-def register_api_user(first_name: str, last_name: str, email: str, password: str, db: Session):
-    """Endpoint to register a new user"""
-    # Check if user exists
-    user = db.execute(select(UserORM).where(UserORM.email == email)).scalar_one_or_none()
-    if user:
-        return RegisterResponseModel(message="User already exists", error="Email already registered")
-    
-    # Hash the password before storing it in the database
-    hashed_password = hash_password(password)
-    
-    # Create new user with hashed password
+def _email_registered(email: str, db: Session) -> bool:
+    registered = db.execute(select(UserORM.email).where(UserORM.email == email)).first() is not None
+    db.rollback()  # as in _login_credentials, don't hold a connection while the password is hashed
+    return registered
+
+
+def _insert_user(first_name: str, last_name: str, email: str, hashed_password: str, db: Session) -> UserORM:
     new_user = UserORM(
         email=email,
         first_name=first_name,
@@ -60,6 +76,21 @@ def register_api_user(first_name: str, last_name: str, email: str, password: str
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    return new_user
+
+
+async def register_api_user(first_name: str, last_name: str, email: str, password: str, db: Session):
+    """Endpoint to register a new user"""
+    # Check if user exists (the sync session's queries run on a worker thread, not the event loop)
+    if await asyncio.to_thread(_email_registered, email, db):
+        return RegisterResponseModel(message="User already exists", error="Email already registered")
+    
+    # Hash the password before storing it in the database (off the event loop)
+    with span("password"):
+        hashed_password = await password_hasher.hash_password(password)
+    
+    # Create new user with hashed password
+    new_user = await asyncio.to_thread(_insert_user, first_name, last_name, email, hashed_password, db)
     # Create bearer token
     # include token_version on creation (defaults to 0)
     token = create_access_token({"email": email, "token_version": getattr(new_user, 'token_version', 0)})
@@ -0,0 +1,95 @@
+# AsyncSession versions of the user CRUD actions in users_crud.py (used when DB_MODE=async)
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.response_models import *
+from app.db.models.users_ORM import UserORM
+from app.db.async_session import serialized_writes
+from app.utils.token_utils import create_access_token, validate_user_from_token_async
+from app.utils.password_utils import password_hasher
+from app.utils.server_timing import span
+from app.utils.user_cache import user_cache
+
+
+async def login_api_user(email: str, password: str, db: AsyncSession) -> LoginResponseModel:
+    """Endpoint to login and return a JWT accesss token in the response"""
+    assert(password is not None and email is not None)
+
+    credentials = (await db.execute(select(UserORM.password, UserORM.token_version)
+                                    .where(UserORM.email == email))).first()
+    # End the read transaction before bcrypt, which may queue behind other hashes:
+    # no pooled connection (or SQLite read snapshot) is held while it waits
+    await db.rollback()
+    if credentials is None:
+        return LoginResponseModel(message="Invalid email or password", data=None, error="Invalid credentials")
+    hashed_password, token_version = credentials
+
+    with span("password"):
+        verified = await password_hasher.verify_password(password, hashed_password)
+    if not verified:
+        return LoginResponseModel(message="Invalid email or password", data=None, error="Invalid credentials")
+
+    # include token_version to support token revocation/versioning
+    access_token = create_access_token(data={'email': email, 'token_version': token_version or 0})
+    return LoginResponseModel(message="Login successful", data={"access_token": access_token, "token_type": "bearer"}, error=None)
+
+
+async def logout_api_user(token: str, db: AsyncSession) -> LogoutResponseModel:
+    """Endpoint to logout the user this token belongs to"""
+    user = await validate_user_from_token_async(token, db)
+    if user is None:
+        return LogoutResponseModel(message="Invalid token.", error="User not found or inactive")
+    # We increment token_version to invalidate previously issued tokens
+    try:
+        async with serialized_writes(db):
+            await db.execute(
+                update(UserORM)
+                .where(UserORM.email == user.email)
+                .values(token_version=UserORM.token_version + 1)
+            )
+            await db.commit()
+    except Exception:
+        return LogoutResponseModel(message="Logout failed", error="Could not update token version")
+    # bulk UPDATE bypasses the ORM events, so drop the cached snapshot explicitly
+    user_cache.invalidate(user.email)
+    return LogoutResponseModel(message="Logout successful")
+
+
+async def register_api_user(first_name: str, last_name: str, email: str, password: str, db: AsyncSession):
+    """Endpoint to register a new user"""
+    # Check if user exists
+    registered = (await db.execute(select(UserORM.email).where(UserORM.email == email))).first() is not None
+    # as in login_api_user, don't hold a connection while the password is hashed
+    await db.rollback()
+    if registered:
+        return RegisterResponseModel(message="User already exists", error="Email already registered")
+
+    # Hash the password before storing it in the database (off the event loop)
+    with span("password"):
+        hashed_password = await password_hasher.hash_password(password)
+
+    # a new transaction for the insert
+    new_user = UserORM(
+        email=email,
+        first_name=first_name,
+        last_name=last_name,
+        password=hashed_password
+    )
+    db.add(new_user)
+    async with serialized_writes(db):
+        await db.commit()
+    await db.refresh(new_user)
+    # include token_version on creation (defaults to 0)
+    token = create_access_token({"email": email, "token_version": getattr(new_user, 'token_version', 0)})
+    return RegisterResponseModel(message="User registered successfully",
+                                 data={"access_token": token, "token_type": "bearer"})
+
+
+async def validate_api_token(token: str, db: AsyncSession) -> ValidateResponseModel:
+    """Endopint that validates the provided API token."""
+    try:
+        user = await validate_user_from_token_async(token, db)
+        if user is None:
+            return ValidateResponseModel(message="Invalid token", error="token failed validation")
+        return ValidateResponseModel(message="Valid token", data={"email": user.email, "first_name": user.first_name, "last_name": user.last_name})
+    except Exception:
+        return ValidateResponseModel(message="Invalid token", error="Token validation failed")
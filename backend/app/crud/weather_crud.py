@@ -0,0 +1,220 @@
+# Weather forecasts and place search served through the shared cache / single-flight layer
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import orjson
+
+from app.db.session import SessionLocal
+from app.schemas.response_models import LocationsResponseModel, WeatherResponseModel
+from app.utils.forecast_cache import WEATHER_WAIT_TIMEOUT, ForecastKey, forecast_cache, grid_cell
+from app.utils.forecast_prefetcher import ForecastPrefetcher
+from app.utils.forecast_store import HourlyForecast
+from app.utils.geocoding_cache import geocoding_cache, normalize
+from app.utils.open_meteo import UpstreamError, open_meteo_client
+from app.utils.server_timing import span
+from app.utils.single_flight import SingleFlight
+
+# identical place searches in flight at the same time share one upstream call
+geocoding_flight = SingleFlight()
+
+# An event gets the forecast hour nearest to it if that is at most this far away
+EVENT_WEATHER_MAX_GAP = timedelta(hours=2)
+# Events outside this window around now cannot be in the 14-day hourly forecast, don't fetch one for them
+EVENT_WEATHER_PAST = timedelta(days=2)
+EVENT_WEATHER_FUTURE = timedelta(days=16)
+# weather block key -> hourly forecast variable
+EVENT_WEATHER_FIELDS = {
+    "temperature": "temperature_2m",
+    "feels_like": "apparent_temperature",
+    "humidity": "relative_humidity_2m",
+    "precipitation_probability": "precipitation_probability",
+    "weather_code": "weather_code",
+    "wind_speed": "wind_speed_10m",
+    "uv_index": "uv_index",
+    "is_day": "is_day",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CachedForecast:
+    """A forecast cache value: the forecast plus the validators of its responses."""
+    forecast: dict | HourlyForecast
+    digest: str  # of the upstream payload, equal across workers that fetched the same data
+    fetched_at: datetime  # naive UTC
+
+
+def _forecast_request(forecast_type: str, lat: float, lon: float, temperature_unit: str, wind_speed_unit: str):
+    """Cache key and upstream fetch for the grid cell containing (lat, lon).
+    Hourly forecasts are kept as an HourlyForecast, the other types as the upstream JSON.
+    """
+    cell_lat, cell_lon = grid_cell(lat, lon)
+    key = ForecastKey(forecast_type, cell_lat, cell_lon, temperature_unit, wind_speed_unit)
+
+    async def fetch():
+        payload = await open_meteo_client.forecast(forecast_type, cell_lat, cell_lon, temperature_unit, wind_speed_unit)
+        # differs on every upstream call without the data changing; would defeat the digest
+        payload.pop("generationtime_ms", None)
+        digest = hashlib.blake2b(orjson.dumps(payload), digest_size=16).hexdigest()
+        forecast = HourlyForecast.from_payload(payload) if forecast_type == "hourly" else payload
+        return CachedForecast(forecast, digest, datetime.now(timezone.utc).replace(tzinfo=None))
+
+    return key, fetch
+
+
+async def _cached_forecast(forecast_type: str, lat: float, lon: float, temperature_unit: str,
+                           wind_speed_unit: str) -> tuple[CachedForecast, float]:
+    """(entry, expires_at) for the grid cell containing (lat, lon), through the shared cache."""
+    return await forecast_cache.get_or_fetch(*_forecast_request(forecast_type, lat, lon, temperature_unit,
+                                                                wind_speed_unit))
+
+
+async def prefetch_forecast(forecast_type: str, lat: float, lon: float, throttle=None,
+                            temperature_unit: str = "celsius", wind_speed_unit: str = "kmh") -> bool:
+    """Warm the cache for (lat, lon) ahead of demand; True if this fetched from the upstream.
+    `throttle` is awaited right before the upstream call, if there is one.
+    """
+    key, fetch = _forecast_request(forecast_type, lat, lon, temperature_unit, wind_speed_unit)
+    if throttle is not None:
+        upstream_fetch = fetch
+
+        async def fetch():
+            await throttle()
+            return await upstream_fetch()
+
+    return await forecast_cache.prefetch(key, fetch)
+
+
+# started and stopped by the app lifespan (app/main.py)
+forecast_prefetcher = ForecastPrefetcher(prefetch_forecast, SessionLocal)
+
+
+async def get_forecast_entry(forecast_type: str, lat: float, lon: float, temperature_unit: str = "celsius",
+                             wind_speed_unit: str = "kmh") -> tuple[WeatherResponseModel, CachedForecast | None, float | None]:
+    """The cached forecast for the grid cell containing (lat, lon) and the time it expires,
+    without building a response from it yet (a conditional GET may not need one).
+    Every caller in the same cell, unit and forecast type shares one upstream response.
+    The response model carries the error if the forecast could not be fetched.
+    """
+    try:
+        with span("forecast"):
+            cached, expires_at = await _cached_forecast(forecast_type, lat, lon, temperature_unit, wind_speed_unit)
+    except UpstreamError as e:
+        return WeatherResponseModel(message="Failed to fetch weather", error=str(e)), None, None
+    except asyncio.TimeoutError:
+        return WeatherResponseModel(message="Failed to fetch weather", error="Weather upstream timed out"), None, None
+    return WeatherResponseModel.model_construct(message="Weather forecast", data=None, error=None), cached, expires_at
+
+
+def forecast_response(cached: CachedForecast) -> WeatherResponseModel:
+    forecast = cached.forecast
+    if isinstance(forecast, HourlyForecast):
+        forecast = forecast.to_payload()
+    # the payload is the upstream JSON already, skip copying it through validation
+    return WeatherResponseModel.model_construct(message="Weather forecast", data=forecast, error=None)
+
+
+def daily_summary_response(cached: CachedForecast) -> WeatherResponseModel:
+    """Per-day min/max/mean/sums aggregated from a cached hourly forecast."""
+    forecast = cached.forecast
+    data = {**forecast.meta, "daily": forecast.daily_summary()}
+    return WeatherResponseModel.model_construct(message="Daily summary", data=data, error=None)
+
+
+async def get_forecast(forecast_type: str, lat: float, lon: float, temperature_unit: str = "celsius",
+                       wind_speed_unit: str = "kmh") -> tuple[WeatherResponseModel, float | None]:
+    """Forecast for the grid cell containing (lat, lon), plus the time it expires from the cache."""
+    res, cached, expires_at = await get_forecast_entry(forecast_type, lat, lon, temperature_unit, wind_speed_unit)
+    return (res if cached is None else forecast_response(cached)), expires_at
+
+
+async def search_locations(name: str, count: int = 10, language: str = "en") -> LocationsResponseModel:
+    """Places matching `name`, best match first: from the geocoding cache when it can
+    answer, otherwise from the upstream (and then cached).
+    """
+    name = name.strip()
+    places = geocoding_cache.lookup(name, count, language)
+    if places is None:
+        # the SQLite tier (warm start, other workers' results) is blocking I/O
+        places = await asyncio.to_thread(geocoding_cache.load, name, count, language)
+    if places is not None:
+        return LocationsResponseModel(message="Locations found", data={"results": places})
+
+    async def fetch():
+        places = await open_meteo_client.search(name, count, language)
+        await asyncio.to_thread(geocoding_cache.put, name, count, language, places)
+        return places
+
+    try:
+        places = await geocoding_flight.do((normalize(name), count, language), fetch, WEATHER_WAIT_TIMEOUT)
+    except UpstreamError as e:
+        return LocationsResponseModel(message="Failed to search locations", error=str(e))
+    except asyncio.TimeoutError:
+        return LocationsResponseModel(message="Failed to search locations", error="Weather upstream timed out")
+    return LocationsResponseModel(message="Locations found", data={"results": places})
+
+
+def _unavailable(reason: str) -> dict:
+    return {"unavailable": True, "reason": reason}
+
+
+def _event_time(event: dict) -> datetime:
+    # event times are naive wall-clock values at the event's location, like the forecast times
+    value = event["date_time"]
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=None)
+
+
+def _hour_weather(forecast: HourlyForecast, event_time: datetime) -> dict:
+    """The forecast hour nearest to event_time (a binary search over the time index)."""
+    found = forecast.nearest(event_time)
+    if found is None:
+        return _unavailable("no_data")
+    index, gap = found
+    if gap > EVENT_WEATHER_MAX_GAP:
+        if index == 0:
+            return _unavailable("past")
+        return _unavailable("future" if index == len(forecast.times) - 1 else "no_close_match")
+    hour = forecast.hour(index, EVENT_WEATHER_FIELDS.values())
+    return {"time": hour["time"], **{key: hour[variable] for key, variable in EVENT_WEATHER_FIELDS.items()}}
+
+
+async def add_event_weather(events: list[dict], lat: Optional[float] = None, lon: Optional[float] = None,
+                            temperature_unit: str = "celsius", wind_speed_unit: str = "kmh") -> None:
+    """Set events[i]["weather"] to the forecast hour nearest each event.
+
+    Events are grouped by the grid cell of their own location (or lat/lon for events
+    without one), and each cell's hourly forecast is fetched once, through the
+    forecast cache, concurrently with the other cells. Events that are clearly
+    outside the forecast range get a reason instead and cost no fetch.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    cells: dict[tuple[float, float], list[dict]] = {}
+    for event in events:
+        event_lat = event.get("latitude") if event.get("latitude") is not None else lat
+        event_lon = event.get("longitude") if event.get("longitude") is not None else lon
+        event_time = _event_time(event)
+        if event_lat is None or event_lon is None:
+            event["weather"] = _unavailable("no_location")
+        elif event_time < now - EVENT_WEATHER_PAST:
+            event["weather"] = _unavailable("past")
+        elif event_time > now + EVENT_WEATHER_FUTURE:
+            event["weather"] = _unavailable("future")
+        else:
+            cells.setdefault(grid_cell(event_lat, event_lon), []).append(event)
+
+    async def cell_forecast(cell_lat, cell_lon):
+        try:
+            cached, _ = await _cached_forecast("hourly", cell_lat, cell_lon, temperature_unit, wind_speed_unit)
+            return cached.forecast
+        except (UpstreamError, asyncio.TimeoutError):
+            return None
+
+    with span("forecast"):
+        forecasts = await asyncio.gather(*(cell_forecast(cell_lat, cell_lon) for cell_lat, cell_lon in cells))
+    for cell_events, forecast in zip(cells.values(), forecasts):
+        for event in cell_events:
+            event["weather"] = _unavailable("error") if forecast is None else _hour_weather(forecast, _event_time(event))
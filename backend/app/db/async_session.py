@@ -0,0 +1,61 @@
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.db.session import SQLALCHEMY_DATABASE_URL, apply_sqlite_pragmas, sqlite_pragmas, engine_options
+from app.db.pool_metrics import InstrumentedAsyncAdaptedQueuePool, instrument_pool
+from app.db.query_metrics import instrument_queries
+
+# sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync SQLAlchemy URL to use the matching asyncio driver."""
+    scheme, sep, rest = url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {scheme!r} URLs")
+    return ASYNC_DRIVERS[backend] + sep + rest
+
+
+ASYNC_DATABASE_URL = async_database_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL,
+                                   **engine_options(ASYNC_DATABASE_URL, InstrumentedAsyncAdaptedQueuePool))
+# the same PRAGMA profile as the sync engine, run on each new aiosqlite connection
+apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas())
+instrument_pool(async_engine.sync_engine, "async")
+instrument_queries(async_engine.sync_engine, "async")
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# one writer lock per event loop (asyncio.Lock is bound to the loop it first waits on)
+_write_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+@asynccontextmanager
+async def serialized_writes(db: AsyncSession):
+    """Hold the process-wide writer lock for a write transaction on SQLite.
+    SQLite has a single writer, and an async transaction keeps the lock while its task
+    waits for the event loop; queueing writers here instead of in SQLite's busy handler
+    avoids its sleep/poll backoff and "database is locked" after busy_timeout.
+    A no-op for other databases.
+    """
+    if db.bind.dialect.name != "sqlite":
+        yield
+        return
+    loop = asyncio.get_running_loop()
+    lock = _write_locks.get(loop)
+    if lock is None:
+        lock = _write_locks[loop] = asyncio.Lock()
+    async with lock:
+        yield
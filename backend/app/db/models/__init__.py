@@ -1,5 +1,5 @@
 # Import all models so they are registered with SQLAlchemy
 from .users_ORM import UserORM
-from .events_ORM import EventORM
+from .events_ORM import EventORM, EventTombstoneORM
 
-__all__ = ["UserORM", "EventORM"]
\ No newline at end of file
+__all__ = ["UserORM", "EventORM", "EventTombstoneORM"]
\ No newline at end of file
@@ -1,16 +1,49 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class EventORM(Base):
     """A class to represent the events table as a SQLAlchemy model"""
     __tablename__ = "events"
+    # Serves "events of this user" lookups and lets date ranges use the same index
+    # (see migration 2 in scripts/sqlite_migrate.py for existing databases)
+    __table_args__ = (
+        Index("ix_events_user_email_date_time", "user_email", "date_time"),
+        # iCalendar import deduplicates on this (migration 3); NULL uids never conflict
+        Index("ux_events_user_email_ical_uid", "user_email", "ical_uid", unique=True),
+        # GET /api/events/changes reads a user's changes in change_seq order (migration 6)
+        Index("ix_events_user_email_change_seq", "user_email", "change_seq"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     date_time = Column(DateTime, nullable=False)
     user_email = Column(String, ForeignKey("users.email"), nullable=False)
+    # UID of the VEVENT this event was imported from, if any
+    ical_uid = Column(String, nullable=True)
+    # Where the event takes place, for its forecast (migration 4); NULL uses the viewer's location
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # users.events_version of the transaction that last created or changed the event,
+    # and when (naive UTC); 0 / NULL for events older than migration 6
+    change_seq = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, nullable=True)
 
     # Relationship to user
     user = relationship("UserORM", back_populates="events")
+
+
+class EventTombstoneORM(Base):
+    """A deleted event, kept so GET /api/events/changes can tell clients to drop it"""
+    __tablename__ = "event_tombstones"
+    __table_args__ = (
+        Index("ix_event_tombstones_user_email_change_seq", "user_email", "change_seq"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(Integer, nullable=False)
+    user_email = Column(String, ForeignKey("users.email"), nullable=False)
+    # users.events_version of the deleting transaction
+    change_seq = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, DateTime
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -14,5 +14,11 @@ class UserORM(Base):
     # Increment this to invalidate previously issued tokens for the user
     token_version = Column(Integer, default=0, nullable=False)
 
+    # Bumped (with the time, naive UTC) in every transaction that changes the user's events;
+    # GET /api/events derives its ETag and Last-Modified from them (migration 5), and the
+    # new value is the change_seq of the events / tombstones that transaction writes
+    events_version = Column(Integer, default=0, nullable=False)
+    events_modified_at = Column(DateTime, nullable=True)
+
     # Relationship to events
     events = relationship("EventORM", back_populates="user")
@@ -0,0 +1,144 @@
+# Connection pool telemetry: checkout latency, in-use connections, timeouts and churn
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# how many recent checkout waits are kept for the latency percentiles
+CHECKOUT_SAMPLES = 1024
+
+
+class PoolMetrics:
+    """Counters for one engine's pool. Connection events come from pool event hooks;
+    checkout waits and timeouts from the Instrumented* pool classes below.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Pool | None = None
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=CHECKOUT_SAMPLES)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._waits.clear()
+            self.checkouts = 0
+            self.checkout_seconds = 0.0
+            self.checkout_max = 0.0
+            self.timeouts = 0
+            self.connects = 0
+            self.disconnects = 0
+            self.invalidations = 0
+
+    def record_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.checkout_max = max(self.checkout_max, seconds)
+            self._waits.append(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def _count(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def stats(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                "name": self.name,
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "disconnects": self.disconnects,
+                "invalidations": self.invalidations,
+                "checkout_ms": {
+                    "mean": self.checkout_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                    "p50": _percentile(waits, 0.50) * 1000,
+                    "p99": _percentile(waits, 0.99) * 1000,
+                    "max": self.checkout_max * 1000,
+                },
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), in_use=pool.checkedout(), idle=pool.checkedin(),
+                         overflow=max(pool.overflow(), 0), max_overflow=pool._max_overflow)
+        return stats
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class _TimedCheckout:
+    """QueuePool mixin timing how long callers wait for a connection."""
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - start)
+        return record
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool, keep reporting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+# engine name -> metrics, read by GET /api/metrics/db-pool
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def instrument_pool(engine: Engine, name: str) -> PoolMetrics:
+    """Attach telemetry to an engine's pool and register it under `name`.
+    Checkout waits are only measured for the Instrumented* pool classes; connection
+    churn is counted for any pool.
+    """
+    metrics = PoolMetrics(name)
+    metrics.pool = engine.pool
+    if isinstance(engine.pool, _TimedCheckout):
+        engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics._count("connects")
+
+    @event.listens_for(engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        metrics._count("disconnects")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics._count("invalidations")
+
+    pool_metrics[name] = metrics
+    return metrics
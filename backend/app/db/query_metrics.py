@@ -0,0 +1,50 @@
+# Query counts and time, per engine and per HTTP request, from SQLAlchemy cursor events
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.metrics import metrics_registry
+
+# Upper bounds (seconds) of query latency buckets
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+db_queries = metrics_registry.counter("db_queries_total", "SQL statements executed", ("engine",))
+db_query_duration = metrics_registry.histogram("db_query_duration_seconds", "Time spent executing SQL statements",
+                                               ("engine",), QUERY_BUCKETS)
+
+
+class QueryStats:
+    """Statements run and time spent in the database on behalf of one request."""
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set by the request metrics middleware for the duration of a request. Threadpool routes and
+# AsyncSession greenlets run in a copy of the request's context, so they add to the same object.
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def instrument_queries(engine: Engine, name: str) -> None:
+    """Count and time every statement `engine` executes, labelled `name`
+    (for an AsyncEngine, pass its sync_engine).
+    """
+    labels = (name,)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._metrics_started
+        db_queries.inc(labels)
+        db_query_duration.observe(labels, seconds)
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += seconds
@@ -1,13 +1,89 @@
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
 from decouple import config
+from app.db.pool_metrics import InstrumentedQueuePool, instrument_pool
+from app.db.query_metrics import instrument_queries
 
 SQLALCHEMY_DATABASE_URL = str(config("SQLALCHEMY_DATABASE_URL", default="sqlite:///./test.db"))
+# "sync": Session-based CRUD in threadpool routes; "async": AsyncSession-based CRUD (see async_session.py)
+DB_MODE = str(config("DB_MODE", default="sync"))
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# PRAGMAs applied to every new SQLite connection, by profile name.
+# "performance": WAL lets readers run alongside the single writer, synchronous=NORMAL
+# only fsyncs at checkpoints (safe in WAL mode), plus a 256 MB mmap window, a 64 MB
+# page cache, in-memory temp tables and a 5 s wait on locks instead of failing.
+SQLITE_PROFILES = {
+    "none": {},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -64000,  # negative = KiB
+        "busy_timeout": 5000,  # ms
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PROFILE = str(config("SQLITE_PROFILE", default="performance"))
+
+# Connection pool (QueuePool) sizing, shared by the sync and async engines
+DB_POOL_SIZE = int(config("DB_POOL_SIZE", default=5))
+DB_MAX_OVERFLOW = int(config("DB_MAX_OVERFLOW", default=10))
+DB_POOL_TIMEOUT = float(config("DB_POOL_TIMEOUT", default=30))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(config("DB_POOL_RECYCLE", default=-1))  # seconds, -1 never recycles
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=False, cast=bool)
+
+
+def sqlite_pragmas(profile: str = SQLITE_PROFILE) -> dict:
+    """PRAGMAs for a profile, each overridable with SQLITE_<PRAGMA> (e.g. SQLITE_SYNCHRONOUS=FULL)."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}, expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name in SQLITE_PROFILES["performance"]:
+        override = config(f"SQLITE_{name.upper()}", default=None)
+        if override is not None:
+            pragmas[name] = override
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: dict) -> None:
+    """Run the given PRAGMAs on every connection the engine opens."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def engine_options(url: str, poolclass=None) -> dict:
+    """create_engine() keyword arguments for `url` from the DB_POOL_* settings.
+    In-memory SQLite keeps SQLAlchemy's single-connection pool; file SQLite and
+    server databases (e.g. PostgreSQL) get a sized QueuePool.
+    """
+    parsed = make_url(url)
+    options = {}
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            return options
+    options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+                   pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING)
+    if poolclass is not None:
+        options["poolclass"] = poolclass
+    return options
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL, InstrumentedQueuePool))
+apply_sqlite_pragmas(engine, sqlite_pragmas())
+instrument_pool(engine, "sync")
+instrument_queries(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
@@ -15,4 +91,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
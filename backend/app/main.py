@@ -1,16 +1,50 @@
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Response
 from starlette.middleware.cors import CORSMiddleware
-from app.api.auth.auth_routes import router as auth_router
-from app.api.events.event_routes import router as events_router
-from app.db.session import engine
+from app.api.metrics.metrics_routes import router as metrics_router, prometheus_router
+from app.api.weather.weather_routes import router as weather_router
+from app.api.debug.profile_routes import router as debug_profile_router
+from app.db.session import engine, DB_MODE
 from app.db.base import Base
 from app.db.models import *
+from app.crud.weather_crud import forecast_prefetcher
+from app.utils.geocoding_cache import geocoding_cache
+from app.utils.open_meteo import open_meteo_client
+from app.utils.metrics import metrics_exporter
+from app.utils.request_metrics import RequestMetricsMiddleware
+from app.utils.server_timing import ServerTimingMiddleware
+from app.utils.profiler import ProfilerMiddleware
 
 # Create DB tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+# DB_MODE picks the data-access stack for this deployment
+if DB_MODE == "async":
+    from app.api.auth.auth_routes_async import router as auth_router
+    from app.api.events.event_routes_async import router as events_router
+elif DB_MODE == "sync":
+    from app.api.auth.auth_routes import router as auth_router
+    from app.api.events.event_routes import router as events_router
+else:
+    raise ValueError(f"Unknown DB_MODE {DB_MODE!r}, expected 'sync' or 'async'")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load the geocoding cache's warm start before serving, off the event loop
+    await asyncio.to_thread(geocoding_cache.open)
+    # warm the forecast cache for upcoming events in the background
+    forecast_prefetcher.start()
+    # share this worker's counters with the others (GET /metrics)
+    metrics_exporter.start()
+    yield
+    await forecast_prefetcher.stop()
+    await metrics_exporter.stop()
+    # close the pooled upstream connections on shutdown
+    await open_meteo_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS middleware - some origins otherwise not allowed
 app.add_middleware(
@@ -33,8 +67,20 @@ app.add_middleware(
     ],
 )
 
+# Sampled or X-Profile-Token requests profiled to PROFILE_DIR (PROFILE_SAMPLE_RATE, PROFILER_TOKEN)
+app.add_middleware(ProfilerMiddleware)
+# Server-Timing header / log line per request (SERVER_TIMING, SERVER_TIMING_LOG)
+app.add_middleware(ServerTimingMiddleware)
+# Outermost, so the time spent in CORS handling is measured too (and its per-request
+# DB statement counts are there for ServerTimingMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+
 app.include_router(auth_router, prefix="/api")
 app.include_router(events_router, prefix="/api")
+app.include_router(weather_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
+app.include_router(prometheus_router)
+app.include_router(debug_profile_router)
 
 @app.get("/")
 def root():
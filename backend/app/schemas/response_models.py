@@ -1,9 +1,12 @@
 # Pydantic models for API response schemas
 
-from pydantic import BaseModel, ConfigDict
-from typing import Dict, Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from decouple import config
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
 
+EVENTS_MAX_BATCH_SIZE = int(config("EVENTS_MAX_BATCH_SIZE", default=5000))
+
 # Request models
 class RegisterRequest(BaseModel):
     first_name: str
@@ -19,11 +22,28 @@ class EventRequest(BaseModel):
     title: str
     description: Optional[str] = None
     date_time: datetime
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 class EventUpdateRequest(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     date_time: Optional[datetime] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+class EventBatchOperation(BaseModel):
+    """One item of a batch: create needs title and date_time, update and delete need id"""
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    date_time: Optional[datetime] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+class EventBatchRequest(BaseModel):
+    operations: List[EventBatchOperation] = Field(min_length=1, max_length=EVENTS_MAX_BATCH_SIZE)
 
 # Response models
 class GenericResponseModel(BaseModel):
@@ -51,7 +71,45 @@ class EventResponseModel(GenericResponseModel):
     """Response model for event operations"""
     pass
 
+class EventOut(BaseModel):
+    """A single event as returned by the list endpoints"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    date_time: datetime
+    user_email: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    # only with ?weather=true: the forecast hour nearest the event, or {"unavailable": true, "reason": ...}
+    weather: Optional[Dict] = None
+
+class EventListData(BaseModel):
+    """One page of events plus the cursor of the next page (None on the last page)"""
+    events: List[EventOut]
+    next_cursor: Optional[str] = None
+
 class EventListResponseModel(GenericResponseModel):
     """Response model for listing events"""
-    pass
-    
\ No newline at end of file
+    data: Optional[EventListData] = None
+
+class EventChangesResponseModel(GenericResponseModel):
+    """Response model for delta sync: changed events, deleted ids, the next cursor and has_more"""
+
+class EventBatchResponseModel(GenericResponseModel):
+    """Response model for batch event operations (per-item results in data["results"])"""
+
+class EventImportResponseModel(GenericResponseModel):
+    """Response model for iCalendar imports and their progress"""
+
+# Operational response models
+class MetricsResponseModel(GenericResponseModel):
+    """Response model for runtime metrics"""
+
+class ProfileResponseModel(GenericResponseModel):
+    """Response model for the profiler's status and saved profiles"""
+
+class WeatherResponseModel(GenericResponseModel):
+    """Response model for forecasts proxied from the weather upstream (the upstream payload in data)"""
+
+class LocationsResponseModel(GenericResponseModel):
+    """Response model for place searches (the geocoding upstream's matches in data["results"])"""
@@ -0,0 +1,98 @@
+"""
+Local stand-in for the Open-Meteo forecast and geocoding APIs, for tests and benchmarks.
+Usage:
+  uvicorn app.tests.fake_open_meteo:app --port 8081
+  WEATHER_BASE_URL=http://127.0.0.1:8081/v1 GEOCODING_BASE_URL=http://127.0.0.1:8081/v1 uvicorn app.main:app
+
+Behavior:
+- GET /v1/forecast answers with deterministic values for every requested current/daily/hourly
+  variable, shaped like the real API (parallel arrays under "daily"/"hourly").
+- GET /v1/search answers with up to three made-up places named after the query.
+- app.state.requests counts calls, app.state.latency (seconds) delays each answer and
+  app.state.fail_status makes it return that HTTP status instead.
+"""
+
+import asyncio
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+app.state.requests = 0
+app.state.latency = 0.0
+app.state.fail_status = None
+
+
+
+def reset(latency: float = 0.0) -> None:
+    app.state.requests = 0
+    app.state.latency = latency
+    app.state.fail_status = None
+
+
+def today() -> datetime:
+    """Forecasts start at midnight UTC today, like the real ones (in their timezone)."""
+    return datetime.combine(datetime.now(timezone.utc).date(), datetime.min.time())
+
+
+def value(name: str, lat: float, lon: float, i: int):
+    if name == "time":
+        return None
+    if name in ("sunrise", "sunset"):
+        hour = 6 if name == "sunrise" else 18
+        return (today() + timedelta(days=i, hours=hour)).isoformat(timespec="minutes")
+    if name == "is_day":
+        return int(6 <= i % 24 < 18)
+    if name == "weather_code":
+        return (0, 1, 2, 3, 61, 71)[i % 6]
+    if name in ("relative_humidity_2m", "precipitation_probability", "cloud_cover", "wind_direction_10m"):
+        return int((lat + lon) * 7 + i * 3) % 100
+    return round((lat + lon) % 30 + (i % 24) * 0.5, 1)
+
+
+async def upstream_call() -> JSONResponse | None:
+    """Count the call, wait the configured latency, and return the configured failure if any."""
+    app.state.requests += 1
+    if app.state.latency:
+        await asyncio.sleep(app.state.latency)
+    if app.state.fail_status:
+        return JSONResponse({"error": True, "reason": "Fake upstream failure"}, status_code=app.state.fail_status)
+    return None
+
+
+@app.get("/v1/search")
+async def search(name: str, count: int = 10):
+    if failure := await upstream_call():
+        return failure
+    base = zlib.crc32(name.strip().casefold().encode())
+    names = [name.strip().title(), f"{name.strip().title()} North", f"{name.strip().title()} South"]
+    return {"results": [{"id": base * 10 + i, "name": names[i], "latitude": base % 60 - 30 + i * 0.5,
+                         "longitude": base % 60 + i * 0.5, "country": "Testland", "country_code": "TL"}
+                        for i in range(min(count, 3))]}
+
+
+@app.get("/v1/forecast")
+async def forecast(request: Request):
+    if failure := await upstream_call():
+        return failure
+
+    start = today()
+    q = request.query_params
+    lat, lon = float(q["latitude"]), float(q["longitude"])
+    days = int(q.get("forecast_days", 7))
+    body = {"latitude": lat, "longitude": lon, "timezone": "GMT", "utc_offset_seconds": 0,
+            "temperature_unit": q.get("temperature_unit", "celsius")}
+    if "current" in q:
+        body["current"] = {"time": start.isoformat(timespec="minutes"),
+                           **{name: value(name, lat, lon, 0) for name in q["current"].split(",")}}
+    if "daily" in q:
+        times = [(start + timedelta(days=i)).date().isoformat() for i in range(days)]
+        body["daily"] = {"time": times, **{name: [value(name, lat, lon, i) for i in range(days)]
+                                           for name in q["daily"].split(",")}}
+    if "hourly" in q:
+        times = [(start + timedelta(hours=i)).isoformat(timespec="minutes") for i in range(days * 24)]
+        body["hourly"] = {"time": times, **{name: [value(name, lat, lon, i) for i in range(days * 24)]
+                                            for name in q["hourly"].split(",")}}
+    return body
@@ -0,0 +1,119 @@
+"""
+Micro-benchmark fixture in the style of pytest-benchmark: `benchmark(fn, *args)` warms up, calibrates
+how many calls make one timed round, times several rounds, and compares the fastest call with the
+baseline stored for this machine. Run with `-s` to see the numbers.
+
+Benchmarks are slow (seconds of timed rounds, a 100k-row fixture) and depend on how busy the
+machine is, so tests marked with `opt_in` are skipped unless asked for:
+
+  BENCHMARK_SAVE=1 python -m pytest -q app/tests/test_microbenchmarks.py   # store the baseline
+  BENCHMARK_RUN=1 python -m pytest -q app/tests/test_microbenchmarks.py    # compare with it
+
+- BENCHMARK_THRESHOLD: allowed slowdown before a benchmark fails (default 0.25, i.e. 25% slower).
+- BENCHMARK_BASELINE: baseline file (default benchmarks/results/microbenchmarks.json, not versioned).
+Without a baseline, or with one recorded on another machine or Python, the numbers are only printed.
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+
+BENCHMARK_THRESHOLD = float(os.environ.get("BENCHMARK_THRESHOLD", 0.25))
+BENCHMARK_SAVE = os.environ.get("BENCHMARK_SAVE", "").lower() in ("1", "true", "yes")
+BENCHMARK_RUN = BENCHMARK_SAVE or os.environ.get("BENCHMARK_RUN", "").lower() in ("1", "true", "yes")
+BENCHMARK_BASELINE = Path(os.environ.get(
+    "BENCHMARK_BASELINE", Path(__file__).resolve().parents[2] / "benchmarks" / "results" / "microbenchmarks.json"))
+
+# A round repeats the function until it took at least this long, so the timer's resolution doesn't matter
+MIN_ROUND_SECONDS = 0.005
+ROUNDS = 15
+# Slow functions (bcrypt) get fewer rounds, at least MIN_ROUNDS, once a benchmark took this long
+MAX_SECONDS = 1.0
+MIN_ROUNDS = 3
+
+
+opt_in = pytest.mark.skipif(not BENCHMARK_RUN, reason="micro-benchmark, set BENCHMARK_RUN=1 to run it")
+
+
+def machine() -> dict:
+    """What a baseline is only valid for."""
+    return {"node": platform.node(), "machine": platform.machine(), "cpus": os.cpu_count(),
+            "python": platform.python_version()}
+
+
+def load_baseline(path: Path = BENCHMARK_BASELINE) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+class Benchmark:
+    """Times one function for one test; the stats are seconds per call."""
+
+    def __init__(self, name: str, baseline: Path = BENCHMARK_BASELINE, threshold: float = BENCHMARK_THRESHOLD,
+                 save: bool = BENCHMARK_SAVE):
+        self.name = name
+        self.baseline = baseline
+        self.threshold = threshold
+        self.save = save
+        self.stats: dict | None = None
+
+    def __call__(self, fn, *args, **kwargs):
+        result = fn(*args, **kwargs)  # warm up
+
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        once = time.perf_counter() - start
+        iterations = max(1, math.ceil(MIN_ROUND_SECONDS / once)) if once > 0 else 1000
+
+        times = []
+        deadline = time.perf_counter() + MAX_SECONDS
+        while len(times) < ROUNDS and (len(times) < MIN_ROUNDS or time.perf_counter() < deadline):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn(*args, **kwargs)
+            times.append((time.perf_counter() - start) / iterations)
+
+        self.stats = {"min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times),
+                      "rounds": len(times), "iterations": iterations}
+        self._compare()
+        return result
+
+    def _compare(self) -> None:
+        stats = self.stats
+        line = (f"\n{self.name}: min {stats['min'] * 1e6:,.1f}us  median {stats['median'] * 1e6:,.1f}us  "
+                f"({stats['rounds']} rounds x {stats['iterations']})")
+        stored = load_baseline(self.baseline)
+
+        if self.save:
+            if stored.get("machine") != machine():
+                stored = {"machine": machine(), "benchmarks": {}}
+            stored.setdefault("benchmarks", {})[self.name] = stats
+            self.baseline.parent.mkdir(parents=True, exist_ok=True)
+            self.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+            print(line + "  [saved as baseline]")
+            return
+
+        base = stored.get("benchmarks", {}).get(self.name) if stored.get("machine") == machine() else None
+        if base is None:
+            print(line + "  [no baseline]")
+            return
+        ratio = stats["min"] / base["min"]
+        print(line + f"  baseline {base['min'] * 1e6:,.1f}us ({ratio - 1:+.0%})")
+        if ratio > 1 + self.threshold:
+            pytest.fail(f"{self.name} slowed down {ratio - 1:.0%} against the baseline "
+                        f"({base['min'] * 1e6:,.1f}us -> {stats['min'] * 1e6:,.1f}us per call), "
+                        f"more than BENCHMARK_THRESHOLD={self.threshold:.0%}")
+
+
+@pytest.fixture
+def benchmark(request):
+    """`benchmark(fn, *args, **kwargs)` returns fn's result and checks its speed against the baseline."""
+    return Benchmark(request.node.name)
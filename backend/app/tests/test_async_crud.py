@@ -0,0 +1,215 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.auth.auth_routes_async import router as auth_router
+from app.api.events.event_routes_async import router as events_router
+from app.crud import users_crud_async
+from app.crud.events_crud_async import import_ical_events
+from app.db.async_session import async_database_url, get_async_db
+from app.db.base import Base
+from app.db.models import *
+
+
+# The async stack runs against a temporary SQLite file through aiosqlite
+db_dir = tempfile.mkdtemp()
+db_path = os.path.join(db_dir, "async_test.db")
+Base.metadata.create_all(bind=create_engine(f"sqlite:///{db_path}"))
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(auth_router, prefix="/api")
+app.include_router(events_router, prefix="/api")
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def register(client, email: str) -> dict:
+    r = client.post("/api/auth/register", json={"email": email, "password": "asyncpass",
+                                                "first_name": "Async", "last_name": "User"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['data']['access_token']}"}
+
+
+class TestAsyncDatabaseUrl:
+    def test_sqlite_url_uses_aiosqlite(self):
+        assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+    def test_postgres_url_uses_asyncpg(self):
+        assert async_database_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            async_database_url("mssql://h/db")
+
+
+class TestAsyncAuth:
+    def test_register_login_validate_logout(self, client):
+        headers = register(client, "async.auth@example.com")
+        r = client.post("/api/auth/login", json={"email": "async.auth@example.com", "password": "asyncpass"})
+        assert r.status_code == 200
+        assert client.post("/api/auth/validate", headers=headers).json()["data"]["email"] == "async.auth@example.com"
+        assert client.post("/api/auth/logout", headers=headers).status_code == 200
+        # the logged-out token is revoked
+        assert client.post("/api/auth/validate", headers=headers).status_code == 401
+
+    def test_wrong_password(self, client):
+        register(client, "async.wrong@example.com")
+        r = client.post("/api/auth/login", json={"email": "async.wrong@example.com", "password": "nope"})
+        assert r.status_code == 401
+
+    def test_no_connection_held_while_hashing(self, client, monkeypatch):
+        checked_out = []
+        real = users_crud_async.password_hasher
+
+        class RecordingHasher:
+            async def hash_password(self, password):
+                checked_out.append(async_engine.sync_engine.pool.checkedout())
+                return await real.hash_password(password)
+
+            async def verify_password(self, password, hashed):
+                checked_out.append(async_engine.sync_engine.pool.checkedout())
+                return await real.verify_password(password, hashed)
+
+        monkeypatch.setattr(users_crud_async, "password_hasher", RecordingHasher())
+        register(client, "async.pool@example.com")
+        r = client.post("/api/auth/login", json={"email": "async.pool@example.com", "password": "asyncpass"})
+        assert r.status_code == 200
+        assert checked_out == [0, 0]
+
+
+class TestAsyncEvents:
+    def test_event_lifecycle(self, client):
+        headers = register(client, "async.events@example.com")
+        r = client.post("/api/events", headers=headers,
+                        json={"title": "Async", "description": "d", "date_time": "2025-01-01T10:00:00"})
+        assert r.status_code == 200, r.text
+        event_id = r.json()["data"]["id"]
+
+        assert client.get(f"/api/events/{event_id}", headers=headers).json()["data"]["title"] == "Async"
+        r = client.put(f"/api/events/{event_id}", headers=headers, json={"title": "Renamed"})
+        assert r.json()["data"]["title"] == "Renamed"
+        assert client.delete(f"/api/events/{event_id}", headers=headers).status_code == 200
+        assert client.get(f"/api/events/{event_id}", headers=headers).status_code == 400
+
+    def test_event_location(self, client):
+        headers = register(client, "async.location@example.com")
+        r = client.post("/api/events", headers=headers,
+                        json={"title": "Beach", "date_time": "2025-03-01T10:00:00", "latitude": 32.08, "longitude": 34.78})
+        event_id = r.json()["data"]["id"]
+        r = client.put(f"/api/events/{event_id}", headers=headers, json={"latitude": 32.79})
+        assert (r.json()["data"]["latitude"], r.json()["data"]["longitude"]) == (32.79, 34.78)
+        # long past: no forecast is fetched for it
+        event = client.get("/api/events", headers=headers, params={"weather": "true"}).json()["data"]["events"][0]
+        assert event["latitude"] == 32.79 and event["weather"] == {"unavailable": True, "reason": "past"}
+
+    def test_conditional_list(self, client):
+        headers = register(client, "async.etag@example.com")
+        event_id = client.post("/api/events", headers=headers,
+                               json={"title": "E", "date_time": "2025-01-01T10:00:00"}).json()["data"]["id"]
+        etag = client.get("/api/events", headers=headers).headers["etag"]
+        assert client.get("/api/events", headers={**headers, "If-None-Match": etag}).status_code == 304
+        client.put(f"/api/events/{event_id}", headers=headers, json={"title": "Renamed"})
+        r = client.get("/api/events", headers={**headers, "If-None-Match": etag})
+        assert r.status_code == 200 and r.headers["etag"] != etag
+
+    def test_changes(self, client):
+        headers = register(client, "async.changes@example.com")
+        kept, dropped = (client.post("/api/events", headers=headers,
+                                     json={"title": t, "date_time": "2025-01-01T10:00:00"}).json()["data"]["id"]
+                         for t in ("Kept", "Dropped"))
+        data = client.get("/api/events/changes", headers=headers).json()["data"]
+        assert [e["id"] for e in data["events"]] == [kept, dropped]
+
+        client.put(f"/api/events/{kept}", headers=headers, json={"title": "Renamed"})
+        client.delete(f"/api/events/{dropped}", headers=headers)
+        client.delete(f"/api/events/{dropped}", headers=headers)  # already gone: not a change
+        data = client.get("/api/events/changes", headers=headers, params={"since": data["cursor"]}).json()["data"]
+        assert [e["title"] for e in data["events"]] == ["Renamed"] and data["deleted"] == [dropped]
+
+    def test_list_pages_with_cursor(self, client):
+        headers = register(client, "async.list@example.com")
+        for day in range(1, 6):
+            client.post("/api/events", headers=headers, json={"title": f"E{day}", "date_time": f"2025-02-0{day}T09:00:00"})
+        first = client.get("/api/events", headers=headers, params={"limit": 3}).json()["data"]
+        second = client.get("/api/events", headers=headers,
+                            params={"limit": 3, "cursor": first["next_cursor"]}).json()["data"]
+        assert [e["title"] for e in first["events"] + second["events"]] == ["E1", "E2", "E3", "E4", "E5"]
+        assert second["next_cursor"] is None
+
+    def test_other_users_event_not_accessible(self, client):
+        owner = register(client, "async.owner@example.com")
+        other = register(client, "async.other@example.com")
+        event_id = client.post("/api/events", headers=owner,
+                               json={"title": "Mine", "date_time": "2025-01-01T10:00:00"}).json()["data"]["id"]
+        assert client.delete(f"/api/events/{event_id}", headers=other).status_code == 400
+
+    def test_batch_export_and_import(self, client):
+        headers = register(client, "async.bulk@example.com")
+        r = client.post("/api/events/batch", headers=headers, json={"operations": [
+            {"op": "create", "title": "B1", "date_time": "2025-03-01T09:00:00"},
+            {"op": "create", "title": "B2", "date_time": "2025-03-02T09:00:00"},
+            {"op": "delete", "id": 999999},
+        ]})
+        data = r.json()["data"]
+        assert (data["created"], data["failed"]) == (2, 1)
+
+        r = client.get("/api/events/export", headers=headers, params={"format": "ics"})
+        assert r.status_code == 200
+        ics = r.content
+        assert ics.count(b"BEGIN:VEVENT") == 2
+
+        importer = register(client, "async.import@example.com")
+        for expected_inserted in (2, 0):  # re-importing the same file skips every UID
+            r = client.post("/api/events/import", headers=importer, params={"import_id": "job"},
+                            files={"file": ("events.ics", ics, "text/calendar")})
+            assert r.status_code == 200, r.text
+            assert r.json()["data"]["inserted"] == expected_inserted
+        progress = client.get("/api/events/import/job", headers=importer).json()["data"]
+        assert progress["status"] == "done" and progress["duplicates"] == 2
+
+    def test_import_parses_off_the_event_loop(self, client):
+        token = register(client, "async.parse@example.com")["Authorization"].split()[1]
+        ics = (b"BEGIN:VCALENDAR\r\n" + b"".join(
+            b"BEGIN:VEVENT\r\nUID:parse-%d\r\nSUMMARY:E%d\r\nDTSTART:20250301T0900%02d\r\nEND:VEVENT\r\n" % (i, i, i)
+            for i in range(5)) + b"END:VCALENDAR\r\n").splitlines(keepends=True)
+        threads = set()
+
+        def lines():
+            for line in ics:
+                threads.add(threading.get_ident())
+                yield line
+
+        async def run_import():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+            try:
+                async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                    return await import_ical_events(lines(), token, db, batch_size=2), threading.get_ident()
+            finally:
+                await engine.dispose()
+
+        res, loop_thread = asyncio.run(run_import())
+        assert res.error is None and res.data["inserted"] == 5
+        assert loop_thread not in threads
+
+    def test_missing_token(self, client):
+        assert client.get("/api/events").status_code == 401
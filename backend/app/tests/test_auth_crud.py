@@ -7,6 +7,7 @@ from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.db.base import Base
 from app.db.session import get_db
+from app.utils.password_utils import password_hasher, PasswordHasherBusy
 import importlib
 importlib.import_module("app.db.models.users_ORM")
 importlib.import_module("app.db.models.events_ORM")
@@ -151,3 +152,18 @@ def test_invalid_authorization_header_format():
     r = client.post("/api/auth/logout", headers=headers)
     assert r.status_code == 401
 
+
+def test_login_returns_503_when_hasher_is_busy(monkeypatch):
+    email = "crud.busy@example.com"
+    password = "busypassword"
+
+    r = register_user(email, password)
+    assert r.status_code == 200
+
+    async def busy(*args, **kwargs):
+        raise PasswordHasherBusy(retry_after=3)
+
+    monkeypatch.setattr(password_hasher, "verify_password", busy)
+    r = login_user(email, password)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "3"
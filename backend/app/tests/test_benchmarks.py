@@ -0,0 +1,40 @@
+import io
+
+from benchmarks.data import ANCHOR, generate
+from benchmarks.report import compare, latency_ms
+
+
+def test_dataset_is_deterministic():
+    first, again, other = generate(7, users=30, events_per_user=40), generate(7, 30, 40), generate(8, 30, 40)
+    assert first.users == again.users and first.events == again.events
+    assert first.events != other.events
+    assert len(first.users) == 30 and len({user["email"] for user in first.users}) == 30
+    # log-normal counts average out near the target, and every user has some events
+    assert 30 * 20 < len(first.events) < 30 * 80
+    assert {event["user_email"] for event in first.events} == {user["email"] for user in first.users}
+    # calendars around the anchor: some history, mostly the coming weeks
+    upcoming = sum(event["date_time"] >= ANCHOR for event in first.events)
+    assert 0.4 < upcoming / len(first.events) < 0.9
+    assert all(event["date_time"].minute in (0, 15, 30, 45) for event in first.events)
+
+
+def report(rps, p95, queries):
+    numbers = {"rps": rps, "p50": 1.0, "p95": p95, "p99": p95, "db_queries_per_request": queries}
+    return {"meta": {"commit": "abc"},
+            "scenarios": {"event_crud": {**numbers, "routes": {"GET /api/events": dict(numbers)}}}}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = report(rps=100, p95=10, queries=2)
+    assert compare(baseline, report(rps=95, p95=10.5, queries=2), 0.1, out=io.StringIO()) == []
+
+    regressions = compare(baseline, report(rps=80, p95=10, queries=3), 0.1, out=io.StringIO())
+    assert sorted(regression.split(":")[0] for regression in regressions) == [
+        "event_crud GET /api/events db_queries_per_request", "event_crud GET /api/events rps",
+        "event_crud db_queries_per_request", "event_crud rps"]
+
+
+def test_latency_summary():
+    summary = latency_ms([i / 1000 for i in range(1, 101)])
+    assert summary["p50"] == 51 and summary["p99"] == 99 and summary["max"] == 100
+    assert latency_ms([])["p95"] is None
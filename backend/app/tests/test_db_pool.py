@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.main import app
+from app.db.session import engine_options
+from app.db.pool_metrics import InstrumentedQueuePool, instrument_pool, pool_metrics
+from app.utils.metrics import metrics_access
+
+
+class TestEngineOptions:
+    def test_sqlite_file_gets_sized_queue_pool(self):
+        options = engine_options("sqlite:///./test.db", InstrumentedQueuePool)
+        assert options["connect_args"] == {"check_same_thread": False}
+        assert options["poolclass"] is InstrumentedQueuePool
+        assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"} <= options.keys()
+
+    def test_sqlite_memory_keeps_default_pool(self):
+        assert engine_options("sqlite:///:memory:") == {"connect_args": {"check_same_thread": False}}
+
+    def test_postgres_has_no_sqlite_connect_args(self):
+        options = engine_options("postgresql://user:pw@db/weather")
+        assert "connect_args" not in options
+        assert options["pool_size"] > 0
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    metrics = instrument_pool(engine, "test")
+    yield engine, metrics
+    engine.dispose()
+    pool_metrics.pop("test", None)
+
+
+class TestPoolMetrics:
+    def test_checkouts_and_in_use(self, pooled_engine):
+        engine, metrics = pooled_engine
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert metrics.stats()["in_use"] == 1
+        stats = metrics.stats()
+        assert stats["checkouts"] == 1 and stats["in_use"] == 0
+        assert stats["connects"] == 1 and stats["size"] == 1
+
+    def test_timeout_counted(self, pooled_engine):
+        engine, metrics = pooled_engine
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        assert metrics.stats()["timeouts"] == 1
+
+    def test_checkout_wait_measured(self, pooled_engine):
+        engine, metrics = pooled_engine
+        engine.pool._timeout = 2
+        held = engine.connect()
+        threading.Timer(0.1, held.close).start()
+        with engine.connect():
+            pass
+        assert metrics.stats()["checkout_ms"]["max"] >= 50
+
+    def test_metrics_survive_dispose(self, pooled_engine):
+        engine, metrics = pooled_engine
+        engine.dispose()
+        with engine.connect():
+            pass
+        assert metrics.stats()["checkouts"] == 1
+        assert metrics.pool is engine.pool
+
+
+def test_metrics_endpoint_lists_sync_engine():
+    metrics_access.configure(token="metrics-secret")
+    try:
+        r = TestClient(app).get("/api/metrics/db-pool", headers={"Authorization": "Bearer metrics-secret"})
+    finally:
+        metrics_access.configure(token="")
+    assert r.status_code == 200
+    assert r.json()["data"]["sync"]["pool_class"] == "InstrumentedQueuePool"
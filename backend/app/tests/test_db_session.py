@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db.session import apply_sqlite_pragmas, sqlite_pragmas
+
+
+def read_pragmas(engine):
+    with engine.connect() as conn:
+        return {name: conn.execute(text(f"PRAGMA {name}")).scalar()
+                for name in ["journal_mode", "synchronous", "cache_size", "busy_timeout", "temp_store"]}
+
+
+class TestSQLiteProfile:
+    def test_performance_profile_is_applied_on_connect(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+        apply_sqlite_pragmas(engine, sqlite_pragmas("performance"))
+
+        pragmas = read_pragmas(engine)
+        engine.dispose()
+        assert pragmas["journal_mode"] == "wal"
+        assert pragmas["synchronous"] == 1  # NORMAL
+        assert pragmas["cache_size"] == -64000
+        assert pragmas["busy_timeout"] == 5000
+        assert pragmas["temp_store"] == 2  # MEMORY
+
+    def test_none_profile_keeps_sqlite_defaults(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+        apply_sqlite_pragmas(engine, sqlite_pragmas("none"))
+
+        pragmas = read_pragmas(engine)
+        engine.dispose()
+        assert pragmas["journal_mode"] == "delete"
+        assert pragmas["synchronous"] == 2  # FULL
+
+    def test_single_pragma_can_be_overridden(self, monkeypatch):
+        monkeypatch.setenv("SQLITE_SYNCHRONOUS", "FULL")
+        assert sqlite_pragmas("performance")["synchronous"] == "FULL"
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError, match="Unknown SQLITE_PROFILE"):
+            sqlite_pragmas("turbo")
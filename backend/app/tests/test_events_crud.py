@@ -5,10 +5,13 @@ from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timezone
 from typing import Optional
+import json
 
 from app.main import app
 from app.db.base import Base
 from app.db.session import get_db
+from app.crud import events_crud
+from app.utils import http_cache
 import importlib
 
 # Force import models to ensure they're registered
@@ -58,9 +61,9 @@ def create_event(token: str, title: str, description: Optional[str] = None, date
     headers = {"Authorization": f"Bearer {token}"}
     return client.post("/api/events", json=event_data, headers=headers)
 
-def get_events(token: str):
+def get_events(token: str, **params):
     headers = {"Authorization": f"Bearer {token}"}
-    return client.get("/api/events", headers=headers)
+    return client.get("/api/events", headers=headers, params=params)
 
 def get_event_by_id(token: str, event_id: int):
     headers = {"Authorization": f"Bearer {token}"}
@@ -183,3 +186,423 @@ class TestEventDeletion:
         
         r = get_event_by_id(token, event_id)
         assert r.status_code == 400
+
+
+class TestEventPagination:
+    def test_date_range_filter(self):
+        token = register_and_get_token("events.range@example.com", "password123")
+        create_event(token, "February", date_time="2025-02-20T10:00:00")
+        create_event(token, "March start", date_time="2025-03-01T00:00:00")
+        create_event(token, "March end", date_time="2025-03-31T23:00:00")
+        create_event(token, "April", date_time="2025-04-01T00:00:00")
+
+        r = get_events(token, **{"from": "2025-03-01T00:00:00", "to": "2025-04-01T00:00:00"})
+        assert r.status_code == 200
+        titles = [event["title"] for event in r.json()["data"]["events"]]
+        assert titles == ["March start", "March end"]
+
+    def test_cursor_pages_cover_all_events_in_order(self):
+        token = register_and_get_token("events.cursor@example.com", "password123")
+        # two events share a timestamp so the id tiebreaker is exercised
+        for day in [5, 1, 3, 3, 2]:
+            create_event(token, f"Day {day}", date_time=f"2025-01-0{day}T09:00:00")
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = get_events(token, **params).json()["data"]
+            seen.extend(data["events"])
+            pages += 1
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert [event["title"] for event in seen] == ["Day 1", "Day 2", "Day 3", "Day 3", "Day 5"]
+        assert len({event["id"] for event in seen}) == 5
+
+    def test_invalid_cursor(self):
+        token = register_and_get_token("events.badcursor@example.com", "password123")
+        r = get_events(token, cursor="not-a-cursor")
+        assert r.status_code == 400
+
+    def test_limit_above_maximum_is_rejected(self):
+        token = register_and_get_token("events.biglimit@example.com", "password123")
+        r = get_events(token, limit=10**6)
+        assert r.status_code == 422
+
+
+def later_second(monkeypatch):
+    """Let the HTTP clock run ahead, past the second of every change made so far."""
+    monkeypatch.setattr(http_cache, "_now", lambda: datetime(2100, 1, 1, tzinfo=timezone.utc))
+
+
+class TestConditionalGet:
+    def test_unchanged_list_is_not_modified(self, monkeypatch):
+        later_second(monkeypatch)
+        token = register_and_get_token("etag@example.com", "password123")
+        create_event(token, "Cached")
+        r = get_events(token)
+        etag = r.headers["etag"]
+        assert r.headers["cache-control"] == "private, no-cache"
+        assert r.headers["last-modified"].endswith("GMT")
+
+        headers = {"Authorization": f"Bearer {token}", "If-None-Match": etag}
+        r = client.get("/api/events", headers=headers)
+        assert r.status_code == 304 and r.content == b""
+        assert r.headers["etag"] == etag
+        # other parameters are another representation
+        assert client.get("/api/events", headers=headers, params={"limit": 1}).status_code == 200
+
+    def test_every_change_bumps_the_version(self):
+        token = register_and_get_token("etag.changes@example.com", "password123")
+        event_id = create_event(token, "First").json()["data"]["id"]
+        etags = [get_events(token).headers["etag"]]
+        update_event(token, event_id, title="Renamed")
+        etags.append(get_events(token).headers["etag"])
+        batch_events(token, [{"op": "create", "title": "Batch", "date_time": "2025-01-01T10:00:00"}])
+        etags.append(get_events(token).headers["etag"])
+        delete_event(token, event_id)
+        etags.append(get_events(token).headers["etag"])
+        assert len(set(etags)) == 4
+
+        headers = {"Authorization": f"Bearer {token}", "If-None-Match": etags[0]}
+        r = client.get("/api/events", headers=headers)
+        assert r.status_code == 200 and r.json()["data"]["events"][0]["title"] == "Batch"
+
+    def test_failed_change_keeps_the_version(self):
+        token = register_and_get_token("etag.failed@example.com", "password123")
+        other = register_and_get_token("etag.other@example.com", "password123")
+        event_id = create_event(other, "Theirs").json()["data"]["id"]
+        etag = get_events(token).headers["etag"]
+        assert delete_event(token, event_id).status_code == 400
+        create_event(other, "Also theirs")
+        assert get_events(token).headers["etag"] == etag
+
+    def test_if_modified_since(self, monkeypatch):
+        later_second(monkeypatch)
+        token = register_and_get_token("etag.since@example.com", "password123")
+        create_event(token, "Dated")
+        last_modified = get_events(token).headers["last-modified"]
+        headers = {"Authorization": f"Bearer {token}", "If-Modified-Since": last_modified}
+        assert client.get("/api/events", headers=headers).status_code == 304
+        headers["If-Modified-Since"] = "Mon, 01 Jan 2001 00:00:00 GMT"
+        assert client.get("/api/events", headers=headers).status_code == 200
+
+    def test_write_in_the_same_second_is_not_hidden(self, monkeypatch):
+        token = register_and_get_token("etag.second@example.com", "password123")
+        clock = [datetime(2025, 1, 1, 12, 0, 0, 100000)]
+        monkeypatch.setattr(events_crud, "_utcnow", lambda: clock[0])
+        monkeypatch.setattr(http_cache, "_now", lambda: clock[0].replace(tzinfo=timezone.utc))
+        create_event(token, "First")
+        # still within the second of the change: a later write could keep the same HTTP date
+        r = get_events(token)
+        assert "last-modified" not in r.headers
+
+        # a client that sends that date anyway, then writes within the same second
+        headers = {"Authorization": f"Bearer {token}", "If-Modified-Since": http_cache.http_date(clock[0])}
+        clock[0] = clock[0].replace(microsecond=700000)
+        create_event(token, "Second")
+        r = client.get("/api/events", headers=headers)
+        assert r.status_code == 200 and len(r.json()["data"]["events"]) == 2
+
+        # once the second is over, the date validates the list again
+        clock[0] = datetime(2025, 1, 1, 12, 0, 1, 200000)
+        r = get_events(token)
+        assert r.headers["last-modified"] == "Wed, 01 Jan 2025 12:00:00 GMT"
+        headers["If-Modified-Since"] = r.headers["last-modified"]
+        assert client.get("/api/events", headers=headers).status_code == 304
+
+    def test_with_weather_is_not_validated(self):
+        token = register_and_get_token("etag.weather@example.com", "password123")
+        r = get_events(token, weather="true")
+        assert "etag" not in r.headers and r.headers["cache-control"] == "private, no-cache"
+
+
+def export_events(token: str, export_format: Optional[str] = None):
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"format": export_format} if export_format else {}
+    return client.get("/api/events/export", headers=headers, params=params)
+
+
+class TestEventExport:
+    def test_export_ndjson(self):
+        token = register_and_get_token("events.export@example.com", "password123")
+        create_event(token, "Second", date_time="2025-05-02T10:00:00")
+        create_event(token, "First", "Has, a comma", date_time="2025-05-01T10:00:00")
+
+        r = export_events(token)
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in r.text.splitlines()]
+        assert [line["title"] for line in lines] == ["First", "Second"]
+        assert lines[0]["date_time"] == "2025-05-01T10:00:00"
+        assert lines[0]["user_email"] == "events.export@example.com"
+
+    def test_export_csv(self):
+        token = register_and_get_token("events.exportcsv@example.com", "password123")
+        create_event(token, "Meeting", "Room 1, floor 2", date_time="2025-05-01T10:00:00")
+
+        r = export_events(token, "csv")
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/csv")
+        lines = r.text.splitlines()
+        assert lines[0] == "id,title,description,date_time,user_email"
+        assert lines[1].endswith('Meeting,"Room 1, floor 2",2025-05-01T10:00:00,events.exportcsv@example.com')
+
+    def test_export_ics(self):
+        token = register_and_get_token("events.exportics@example.com", "password123")
+        create_event(token, "Picnic; bring food", date_time="2025-06-01T12:30:00")
+        create_event(token, "Hike", date_time="2025-06-02T08:00:00")
+
+        r = export_events(token, "ics")
+        assert r.status_code == 200
+        body = r.text
+        assert body.startswith("BEGIN:VCALENDAR\r\n")
+        assert body.endswith("END:VCALENDAR\r\n")
+        assert body.count("BEGIN:VEVENT") == 2
+        assert "SUMMARY:Picnic\\; bring food\r\n" in body
+        assert "DTSTART:20250601T123000\r\n" in body
+
+    def test_export_requires_valid_token(self):
+        assert client.get("/api/events/export").status_code == 401
+        r = client.get("/api/events/export", headers={"Authorization": "Bearer invalid.token.here"})
+        assert r.status_code == 400
+
+    def test_export_unknown_format(self):
+        token = register_and_get_token("events.exportfmt@example.com", "password123")
+        assert export_events(token, "xml").status_code == 422
+
+
+def batch_events(token: str, operations: list):
+    headers = {"Authorization": f"Bearer {token}"}
+    return client.post("/api/events/batch", json={"operations": operations}, headers=headers)
+
+
+class TestEventBatch:
+    def test_batch_create_update_delete(self):
+        token = register_and_get_token("events.batch@example.com", "password123")
+        to_update = create_event(token, "Old title").json()["data"]["id"]
+        to_delete = create_event(token, "Doomed").json()["data"]["id"]
+
+        r = batch_events(token, [
+            {"op": "create", "title": "New 1", "date_time": "2025-07-01T10:00:00"},
+            {"op": "update", "id": to_update, "title": "New title"},
+            {"op": "create", "title": "New 2", "description": "second", "date_time": "2025-07-02T10:00:00"},
+            {"op": "delete", "id": to_delete},
+        ])
+        assert r.status_code == 200
+        data = r.json()["data"]
+        assert (data["created"], data["updated"], data["deleted"], data["failed"]) == (2, 1, 1, 0)
+        results = data["results"]
+        assert [result["index"] for result in results] == [0, 1, 2, 3]
+        assert all(result["error"] is None for result in results)
+
+        # created ids come back in request order
+        assert get_event_by_id(token, results[0]["id"]).json()["data"]["title"] == "New 1"
+        assert get_event_by_id(token, results[2]["id"]).json()["data"]["description"] == "second"
+        assert get_event_by_id(token, to_update).json()["data"]["title"] == "New title"
+        assert get_event_by_id(token, to_delete).status_code == 400
+
+    def test_batch_reports_invalid_items_and_applies_the_rest(self):
+        owner = register_and_get_token("events.batchowner@example.com", "password123")
+        other = register_and_get_token("events.batchother@example.com", "password123")
+        foreign_id = create_event(owner, "Not yours").json()["data"]["id"]
+
+        r = batch_events(other, [
+            {"op": "create", "title": "Missing date"},
+            {"op": "update", "id": foreign_id, "title": "Hijacked"},
+            {"op": "delete"},
+            {"op": "create", "title": "Fine", "date_time": "2025-07-03T10:00:00"},
+        ])
+        assert r.status_code == 200
+        data = r.json()["data"]
+        assert [result["error"] is None for result in data["results"]] == [False, False, False, True]
+        assert data["created"] == 1 and data["failed"] == 3
+        assert get_event_by_id(owner, foreign_id).json()["data"]["title"] == "Not yours"
+
+    def test_batch_requires_valid_token(self):
+        ops = [{"op": "create", "title": "x", "date_time": "2025-07-01T10:00:00"}]
+        assert client.post("/api/events/batch", json={"operations": ops}).status_code == 401
+        r = client.post("/api/events/batch", json={"operations": ops},
+                        headers={"Authorization": "Bearer invalid.token.here"})
+        assert r.status_code == 400
+
+    def test_empty_batch_is_rejected(self):
+        token = register_and_get_token("events.batchempty@example.com", "password123")
+        assert batch_events(token, []).status_code == 422
+
+
+SAMPLE_ICS = (
+    "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//test//EN\r\n"
+    "BEGIN:VEVENT\r\nUID:one@test\r\nDTSTART:20250801T090000\r\nSUMMARY:Standup\\, daily\r\n"
+    "DESCRIPTION:A long description that is folded onto\r\n  a second line\r\n"
+    "BEGIN:VALARM\r\nSUMMARY:Not the title\r\nEND:VALARM\r\nEND:VEVENT\r\n"
+    "BEGIN:VEVENT\r\nUID:two@test\r\nDTSTART;VALUE=DATE:20250802\r\nSUMMARY:All day\r\nEND:VEVENT\r\n"
+    "BEGIN:VEVENT\r\nUID:one@test\r\nDTSTART:20250801T090000\r\nSUMMARY:Repeated UID\r\nEND:VEVENT\r\n"
+    "BEGIN:VEVENT\r\nUID:three@test\r\nSUMMARY:No start\r\nEND:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+def import_events(token: str, content: str, import_id: Optional[str] = None):
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"import_id": import_id} if import_id else {}
+    files = {"file": ("calendar.ics", content.encode(), "text/calendar")}
+    return client.post("/api/events/import", headers=headers, params=params, files=files)
+
+
+class TestEventImport:
+    def test_import_maps_vevents_and_deduplicates(self):
+        token = register_and_get_token("events.import@example.com", "password123")
+
+        r = import_events(token, SAMPLE_ICS)
+        assert r.status_code == 200
+        data = r.json()["data"]
+        assert (data["processed"], data["inserted"], data["duplicates"], data["skipped"]) == (4, 2, 1, 1)
+        assert data["status"] == "done"
+
+        events = get_events(token).json()["data"]["events"]
+        assert [(e["title"], e["date_time"]) for e in events] == [
+            ("Standup, daily", "2025-08-01T09:00:00"),
+            ("All day", "2025-08-02T00:00:00"),
+        ]
+        assert events[0]["description"] == "A long description that is folded onto a second line"
+
+        # importing the same file again adds nothing
+        data = import_events(token, SAMPLE_ICS).json()["data"]
+        assert data["inserted"] == 0 and data["duplicates"] == 3
+
+        # exports keep the original UIDs
+        exported = export_events(token, "ics").text
+        assert "UID:one@test\r\n" in exported and "UID:two@test\r\n" in exported
+
+    def test_export_round_trips_through_import(self):
+        source = register_and_get_token("events.roundtrip.src@example.com", "password123")
+        target = register_and_get_token("events.roundtrip.dst@example.com", "password123")
+        create_event(source, "Semi;colon, comma", "Two\nlines " + "x" * 120, "2025-09-01T18:30:00")
+
+        exported = export_events(source, "ics").text
+        assert import_events(target, exported).json()["data"]["inserted"] == 1
+
+        event = get_events(target).json()["data"]["events"][0]
+        assert event["title"] == "Semi;colon, comma"
+        assert event["description"] == "Two\nlines " + "x" * 120
+        assert event["date_time"] == "2025-09-01T18:30:00"
+
+    def test_import_progress_is_queryable(self):
+        token = register_and_get_token("events.importprogress@example.com", "password123")
+        headers = {"Authorization": f"Bearer {token}"}
+        assert import_events(token, SAMPLE_ICS, import_id="job-1").status_code == 200
+
+        r = client.get("/api/events/import/job-1", headers=headers)
+        assert r.status_code == 200
+        assert r.json()["data"]["status"] == "done"
+        assert r.json()["data"]["inserted"] == 2
+
+        # other users cannot see it
+        other = register_and_get_token("events.importother@example.com", "password123")
+        r = client.get("/api/events/import/job-1", headers={"Authorization": f"Bearer {other}"})
+        assert r.status_code == 400
+
+    def test_import_requires_auth(self):
+        files = {"file": ("calendar.ics", SAMPLE_ICS.encode(), "text/calendar")}
+        assert client.post("/api/events/import", files=files).status_code == 401
+
+
+def get_changes(token: str, since: Optional[str] = None, **params):
+    if since is not None:
+        params["since"] = since
+    return client.get("/api/events/changes", headers={"Authorization": f"Bearer {token}"}, params=params)
+
+
+class TestEventChanges:
+    def test_full_sync_then_deltas(self):
+        token = register_and_get_token("changes@example.com", "password123")
+        first = create_event(token, "First").json()["data"]["id"]
+        second = create_event(token, "Second").json()["data"]["id"]
+
+        data = get_changes(token).json()["data"]
+        assert [e["id"] for e in data["events"]] == [first, second]
+        assert data["deleted"] == [] and data["has_more"] is False
+        assert data["events"][0]["updated_at"] is not None
+        cursor = data["cursor"]
+
+        # nothing new: an empty delta with the same cursor
+        data = get_changes(token, cursor).json()["data"]
+        assert (data["events"], data["deleted"], data["cursor"]) == ([], [], cursor)
+
+        update_event(token, first, title="Renamed")
+        third = create_event(token, "Third").json()["data"]["id"]
+        delete_event(token, second)
+        data = get_changes(token, cursor).json()["data"]
+        assert [(e["id"], e["title"]) for e in data["events"]] == [(first, "Renamed"), (third, "Third")]
+        assert data["deleted"] == [second]
+
+        data = get_changes(token, data["cursor"]).json()["data"]
+        assert data["events"] == [] and data["deleted"] == []
+
+    def test_batch_and_import_changes(self):
+        token = register_and_get_token("changes.bulk@example.com", "password123")
+        kept = create_event(token, "Kept").json()["data"]["id"]
+        dropped = create_event(token, "Dropped").json()["data"]["id"]
+        cursor = get_changes(token).json()["data"]["cursor"]
+
+        batch_events(token, [{"op": "create", "title": "Batch", "date_time": "2025-01-01T10:00:00"},
+                             {"op": "update", "id": kept, "description": "edited"},
+                             {"op": "delete", "id": dropped}])
+        import_events(token, SAMPLE_ICS)
+        data = get_changes(token, cursor).json()["data"]
+        seqs = [e["change_seq"] for e in data["events"]]
+        assert sorted(e["title"] for e in data["events"]) == ["All day", "Batch", "Kept", "Standup, daily"]
+        assert data["deleted"] == [dropped]
+        # one change_seq per transaction: the batch's, then the import's
+        assert seqs == sorted(seqs) and len(set(seqs)) == 2
+
+        # re-importing only duplicates is not a change
+        import_events(token, SAMPLE_ICS)
+        assert get_changes(token, data["cursor"]).json()["data"]["events"] == []
+
+    def test_reused_id_is_an_update(self):
+        token = register_and_get_token("changes.reuse@example.com", "password123")
+        last = create_event(token, "Last").json()["data"]["id"]
+        cursor = get_changes(token).json()["data"]["cursor"]
+        delete_event(token, last)
+        # SQLite hands the highest rowid out again once it is deleted
+        reused = create_event(token, "New").json()["data"]["id"]
+        data = get_changes(token, cursor).json()["data"]
+        assert [(e["id"], e["title"]) for e in data["events"]] == [(reused, "New")]
+        assert data["deleted"] == ([] if reused == last else [last])
+
+    def test_pages_split_a_large_transaction(self):
+        token = register_and_get_token("changes.pages@example.com", "password123")
+        cursor = get_changes(token).json()["data"]["cursor"]
+        created = batch_events(token, [{"op": "create", "title": f"E{i}", "date_time": "2025-01-01T10:00:00"}
+                                       for i in range(5)]).json()["data"]["results"]
+        delete_event(token, created[0]["id"])
+
+        seen, deleted, more = [], [], True
+        while more:
+            data = get_changes(token, cursor, limit=2).json()["data"]
+            assert len(data["events"]) + len(data["deleted"]) <= 2
+            seen += [e["id"] for e in data["events"]]
+            deleted += data["deleted"]
+            cursor, more = data["cursor"], data["has_more"]
+        assert seen == [r["id"] for r in created[1:]] and deleted == [created[0]["id"]]
+
+    def test_other_users_changes_are_not_visible(self):
+        token = register_and_get_token("changes.mine@example.com", "password123")
+        other = register_and_get_token("changes.theirs@example.com", "password123")
+        cursor = get_changes(token).json()["data"]["cursor"]
+        delete_event(other, create_event(other, "Theirs").json()["data"]["id"])
+        data = get_changes(token, cursor).json()["data"]
+        assert data["events"] == [] and data["deleted"] == []
+
+    def test_invalid_cursor_and_auth(self):
+        token = register_and_get_token("changes.invalid@example.com", "password123")
+        assert get_changes(token, "not-a-cursor").status_code == 400
+        assert client.get("/api/events/changes").status_code == 401
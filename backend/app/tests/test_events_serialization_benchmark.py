@@ -0,0 +1,100 @@
+"""
+Benchmark of event list serialization for a user with 10k events: the previous
+ORM -> dict -> Pydantic -> json path against the column-projected orjson path
+used by GET /api/events. Run with `-s` to see rows/sec. Only the row counts are
+asserted; regressions in speed are caught by test_microbenchmarks.py's
+test_get_user_events against the stored baseline.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.users_ORM import UserORM
+from app.db.models.events_ORM import EventORM
+from app.crud.events_crud import get_user_events, EVENTS_MAX_PAGE_SIZE
+from app.schemas.response_models import EventListResponseModel
+from app.utils.token_utils import create_access_token
+
+EVENT_COUNT = 10_000
+EMAIL = "serialization.bench@example.com"
+
+# Use in-memory SQLite for tests
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def seed():
+    db = TestingSessionLocal()
+    db.add(UserORM(email=EMAIL, password="x", token_version=0))
+    start = datetime(2024, 1, 1, 9, 0)
+    db.execute(insert(EventORM), [
+        {"title": f"Event {i}", "description": "benchmark", "date_time": start + timedelta(hours=i), "user_email": EMAIL}
+        for i in range(EVENT_COUNT)
+    ])
+    db.commit()
+    db.close()
+
+
+def legacy_serialize(db) -> bytes:
+    """The pre-fast-path pipeline: ORM instances, per-row dicts, Pydantic validation, json."""
+    events = db.execute(select(EventORM).where(EventORM.user_email == EMAIL)).scalars().all()
+    events_data = [{
+        "id": event.id,
+        "title": event.title,
+        "description": event.description,
+        "date_time": event.date_time.isoformat(),
+        "user_email": event.user_email
+    } for event in events]
+    res = EventListResponseModel(message=f"Found {len(events_data)} events", data={"events": events_data})
+    return json.dumps(jsonable_encoder(res)).encode()
+
+
+def fast_serialize(db, token) -> int:
+    """The GET /api/events path, paging through every event."""
+    rows = 0
+    cursor = None
+    while True:
+        res = get_user_events(token, db, cursor=cursor, limit=EVENTS_MAX_PAGE_SIZE)
+        ORJSONResponse({"message": res.message, "data": res.data, "error": res.error}).body
+        rows += len(res.data["events"])
+        cursor = res.data["next_cursor"]
+        if cursor is None:
+            return rows
+
+
+def rows_per_second(fn) -> float:
+    best = float("inf")
+    for _ in range(3):
+        db = TestingSessionLocal()
+        start = time.perf_counter()
+        fn(db)
+        best = min(best, time.perf_counter() - start)
+        db.close()
+    return EVENT_COUNT / best
+
+
+def test_fast_path_serializes_every_row():
+    seed()
+    token = create_access_token({"email": EMAIL, "token_version": 0})
+
+    legacy = rows_per_second(legacy_serialize)
+    fast = rows_per_second(lambda db: fast_serialize(db, token))
+    print(f"\nevent list serialization ({EVENT_COUNT} events): {legacy:,.0f} rows/s legacy, "
+          f"{fast:,.0f} rows/s fast path ({fast / legacy:.1f}x)")
+
+    db = TestingSessionLocal()
+    assert fast_serialize(db, token) == EVENT_COUNT
+    db.close()
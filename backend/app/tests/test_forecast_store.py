@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.utils.forecast_store import HourlyForecast
+
+
+def payload(hours=48, **variables):
+    start = datetime(2025, 3, 1)
+    times = [(start + timedelta(hours=i)).isoformat(timespec="minutes") for i in range(hours)]
+    hourly = {"time": times, "temperature_2m": [round(10 + i * 0.25, 2) for i in range(hours)],
+              "precipitation": [0.5 if i % 6 == 0 else 0.0 for i in range(hours)],
+              "weather_code": [i % 4 for i in range(hours)], **variables}
+    return {"latitude": 32.1, "longitude": 34.8, "timezone": "Asia/Jerusalem", "hourly": hourly,
+            "hourly_units": {"time": "iso8601", "temperature_2m": "°C"}}
+
+
+class TestHourlyForecast:
+    def test_payload_roundtrip(self):
+        p = payload(humidity=[None] + [50] * 47)
+        assert HourlyForecast.from_payload(p).to_payload() == p
+
+    def test_float32_matrix(self):
+        forecast = HourlyForecast.from_payload(payload(hours=14 * 24))
+        assert forecast.values.dtype == np.float32
+        assert forecast.column("temperature_2m")[1] == np.float32(10.25)
+        assert forecast.nbytes == 14 * 24 * (8 + 3 * 4)
+
+    def test_nearest(self):
+        forecast = HourlyForecast.from_payload(payload())
+        assert forecast.nearest(datetime(2025, 3, 1, 5, 20)) == (5, timedelta(minutes=20))
+        assert forecast.nearest(datetime(2025, 3, 1, 5, 40)) == (6, timedelta(minutes=20))
+        assert forecast.nearest(datetime(2025, 2, 1)) == (0, timedelta(days=28))
+        assert forecast.nearest(datetime(2025, 4, 1))[0] == 47
+        assert HourlyForecast.from_payload({}).nearest(datetime(2025, 3, 1)) is None
+
+    def test_hour(self):
+        forecast = HourlyForecast.from_payload(payload())
+        assert forecast.hour(3, ["temperature_2m", "weather_code", "missing"]) == {
+            "time": "2025-03-01T03:00", "temperature_2m": 10.75, "weather_code": 3, "missing": None}
+
+    def test_slice_is_half_open(self):
+        day = HourlyForecast.from_payload(payload()).slice(datetime(2025, 3, 2), datetime(2025, 3, 3))
+        assert len(day.times) == 24
+        assert day.hour(0)["time"] == "2025-03-02T00:00"
+
+    def test_daily_summary(self):
+        summary = HourlyForecast.from_payload(payload()).daily_summary()
+        assert summary["time"] == ["2025-03-01", "2025-03-02"]
+        assert summary["temperature_2m_min"] == [10.0, 16.0]
+        assert summary["temperature_2m_max"] == [15.75, 21.75]
+        assert summary["temperature_2m_mean"] == [12.88, 18.88]  # rounded like the upstream values
+        assert summary["precipitation_sum"] == [2.0, 2.0]
+        assert "uv_index_max" not in summary
+
+    def test_daily_summary_skips_missing_hours(self):
+        p = payload(cloud_cover=[None] * 24 + [None] * 12 + [40] * 12)
+        summary = HourlyForecast.from_payload(p).daily_summary()
+        assert summary["cloud_cover_mean"] == [None, 40.0]
@@ -0,0 +1,116 @@
+import sqlite3
+
+import pytest
+
+from app.utils.geocoding_cache import GeocodingCache, normalize
+
+
+def place(id, name, population=0):
+    return {"id": id, "name": name, "latitude": 0.0, "longitude": 0.0, "population": population}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GeocodingCache(path=str(tmp_path / "geocoding.db"), max_size=100, prefix_min_length=3)
+
+
+def test_normalize():
+    assert normalize("  Tel   AVIV ") == "tel aviv"
+
+
+def test_exact_search_hit(cache):
+    assert cache.search("Paris", 2) is None
+    cache.put("Paris", 2, "en", [place(1, "Paris", 2_000_000), place(2, "Paris", 25_000)])
+    assert [p["id"] for p in cache.search("paris", 2)] == [1, 2]
+    assert [p["id"] for p in cache.search("PARIS", 1)] == [1]
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_search_for_more_results_misses(cache):
+    cache.put("Paris", 2, "en", [place(1, "Paris"), place(2, "Paris")])
+    assert cache.search("Paris", 5) is None
+    # a search that came back short was complete, asking for more cannot find anything new
+    cache.put("Springfield", 10, "en", [place(3, "Springfield")])
+    assert len(cache.search("Springfield", 50)) == 1
+
+
+def test_languages_are_separate(cache):
+    cache.put("Munich", 1, "en", [place(1, "Munich")])
+    assert cache.search("Munich", 1, "de") is None
+
+
+def test_prefix_hit_ranked_by_population(cache):
+    cache.put("Lon", 3, "en", [place(1, "London", 9_000_000), place(2, "Londrina", 500_000),
+                               place(3, "Long Beach", 450_000)])
+    assert [p["name"] for p in cache.search("Lond", 2)] == ["London", "Londrina"]
+    assert cache.stats()["prefix_hits"] == 1
+    # fewer cached matches than requested, or too short a prefix: ask the upstream
+    assert cache.search("Lond", 3) is None
+    assert cache.search("Lo", 1) is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = GeocodingCache(path=str(tmp_path / "geocoding.db"), max_size=2)
+    cache.put("Aaa", 1, "en", [place(1, "Aaa")])
+    cache.put("Bbb", 1, "en", [place(2, "Bbb")])
+    cache.search("Aaa", 1)
+    cache.put("Ccc", 1, "en", [place(3, "Ccc")])
+    assert cache.search("Bbb", 1) is None
+    assert cache.search("Aaa", 1) is not None
+    assert cache.stats()["evictions"] == 1
+    rows = sqlite3.connect(tmp_path / "geocoding.db").execute("SELECT id FROM geocoding_places ORDER BY id").fetchall()
+    assert rows == [(1,), (3,)]
+
+
+def test_expired_search_misses(tmp_path):
+    now = [1000.0]
+    cache = GeocodingCache(path=str(tmp_path / "geocoding.db"), ttl=60, prefix_min_length=100, clock=lambda: now[0])
+    cache.put("Oslo", 1, "en", [place(1, "Oslo")])
+    now[0] += 61
+    assert cache.search("Oslo", 1) is None
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "geocoding.db")
+    first = GeocodingCache(path=path)
+    assert first.search("Rome", 1) is None
+    GeocodingCache(path=path).put("Rome", 1, "en", [place(1, "Rome", 2_800_000)])
+    # another worker's fetch is picked up on a miss, a restart loads it up front
+    assert first.search("Rome", 1)[0]["name"] == "Rome"
+    assert GeocodingCache(path=path).search("rom", 1)[0]["name"] == "Rome"
+
+
+def test_searches_are_bounded(tmp_path):
+    path = str(tmp_path / "geocoding.db")
+    cache = GeocodingCache(path=path, max_size=3, prefix_min_length=100)
+    # every keystroke of search-as-you-type is a search of its own, for the same place
+    for query in ("Ber", "Berl", "Berli", "Berlin", "Berlin "):
+        cache.put(query, 1, "en", [place(1, "Berlin")])
+    cache.put("Bern", 1, "en", [place(2, "Bern")])
+    stats = cache.stats()
+    assert stats["searches"] == 3 and stats["search_evictions"] == 2
+    assert cache.lookup("Ber", 1) is None and cache.lookup("Bern", 1) is not None
+    rows = sqlite3.connect(path).execute("SELECT query FROM geocoding_searches ORDER BY query").fetchall()
+    assert rows == [("berli",), ("berlin",), ("bern",)]
+    # the warm start honours the cap too
+    assert GeocodingCache(path=path, max_size=2).stats()["searches"] == 0
+    warm = GeocodingCache(path=path, max_size=2)
+    warm.open()
+    assert warm.stats()["searches"] == 2
+
+
+def test_search_of_evicted_places_is_dropped(tmp_path):
+    cache = GeocodingCache(path=str(tmp_path / "geocoding.db"), max_size=2, prefix_min_length=100)
+    cache.put("Aaa", 2, "en", [place(1, "Aaa"), place(2, "Aab")])
+    cache.put("Ccc", 1, "en", [place(3, "Ccc")])
+    assert cache.lookup("Aaa", 2) is None
+    assert cache.stats()["searches"] == 1
+
+
+def test_lookup_only_reads_memory(tmp_path):
+    path = str(tmp_path / "geocoding.db")
+    GeocodingCache(path=path).put("Rome", 1, "en", [place(1, "Rome")])
+    cache = GeocodingCache(path=path)
+    assert cache.lookup("Rome", 1) is None and cache._conn is None
+    assert cache.load("Rome", 1)[0]["name"] == "Rome"
+    assert cache.lookup("Rome", 1)[0]["name"] == "Rome"
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+from app.utils import http_cache
+from app.utils.http_cache import http_date, make_etag, not_modified, validator_headers
+
+
+ETAG = make_etag("events", "a@example.com", 3)
+
+
+class TestNotModified:
+    def test_etag_is_quoted_and_stable(self):
+        assert ETAG.startswith('"') and ETAG.endswith('"')
+        assert ETAG == make_etag("events", "a@example.com", 3) != make_etag("events", "a@example.com", 4)
+
+    def test_if_none_match(self):
+        assert not_modified({"if-none-match": ETAG}, ETAG)
+        assert not_modified({"if-none-match": f'"x", W/{ETAG}'}, ETAG)
+        assert not_modified({"if-none-match": "*"}, ETAG)
+        assert not not_modified({"if-none-match": '"x"'}, ETAG)
+        assert not not_modified({}, ETAG)
+
+    def test_if_modified_since(self):
+        modified = datetime(2025, 1, 1, 12, 0, 0, 500000)
+        assert http_date(modified) == "Wed, 01 Jan 2025 12:00:00 GMT"
+        assert not_modified({"if-modified-since": "Wed, 01 Jan 2025 12:00:00 GMT"}, ETAG, modified)
+        assert not not_modified({"if-modified-since": "Wed, 01 Jan 2025 11:59:59 GMT"}, ETAG, modified)
+        assert not not_modified({"if-modified-since": "yesterday"}, ETAG, modified)
+
+    def test_date_within_the_current_second_is_not_used(self, monkeypatch):
+        modified = datetime(2025, 1, 1, 12, 0, 0, 500000)
+        monkeypatch.setattr(http_cache, "_now", lambda: datetime(2025, 1, 1, 12, 0, 0, 900000, timezone.utc))
+        assert not not_modified({"if-modified-since": "Wed, 01 Jan 2025 12:00:00 GMT"}, ETAG, modified)
+        assert "Last-Modified" not in validator_headers(ETAG, modified, "no-cache")
+        monkeypatch.setattr(http_cache, "_now", lambda: datetime(2025, 1, 1, 12, 0, 1, tzinfo=timezone.utc))
+        assert not_modified({"if-modified-since": "Wed, 01 Jan 2025 12:00:00 GMT"}, ETAG, modified)
+        assert validator_headers(ETAG, modified, "no-cache")["Last-Modified"] == "Wed, 01 Jan 2025 12:00:00 GMT"
+
+    def test_if_none_match_takes_precedence(self):
+        headers = {"if-none-match": '"x"', "if-modified-since": "Wed, 01 Jan 2025 12:00:00 GMT"}
+        assert not not_modified(headers, ETAG, datetime(2025, 1, 1))
@@ -0,0 +1,187 @@
+import threading
+
+import orjson
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.db.query_metrics import instrument_queries
+from app.main import app
+from app.utils.metrics import (MetricsAccess, MetricsExporter, MetricsRegistry, metrics_access, metrics_exporter,
+                               metrics_registry, render)
+from app.utils.request_metrics import RequestMetricsMiddleware
+
+
+def make_registry():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    return registry, requests, latency
+
+
+def sample(text_body: str, line_prefix: str) -> float:
+    matches = [line for line in text_body.splitlines() if line.startswith(line_prefix + " ")]
+    assert len(matches) == 1, (line_prefix, matches)
+    return float(matches[0].rsplit(" ", 1)[1])
+
+
+class TestRegistry:
+    def test_render_counters_and_histograms(self):
+        registry, requests, latency = make_registry()
+        requests.inc(("/a",))
+        requests.inc(("/a",), 2)
+        requests.inc(('say "hi"\n',))
+        for seconds in (0.05, 0.1, 0.5, 3):
+            latency.observe(("/a",), seconds)
+
+        body = render(registry, registry.snapshot())
+        assert "# TYPE requests_total counter" in body and "# TYPE latency_seconds histogram" in body
+        assert sample(body, 'requests_total{route="/a"}') == 3
+        assert sample(body, 'requests_total{route="say \\"hi\\"\\n"}') == 1
+        # buckets are cumulative and include their upper bound
+        assert sample(body, 'latency_seconds_bucket{route="/a",le="0.1"}') == 2
+        assert sample(body, 'latency_seconds_bucket{route="/a",le="1.0"}') == 3
+        assert sample(body, 'latency_seconds_bucket{route="/a",le="+Inf"}') == 4
+        assert sample(body, 'latency_seconds_count{route="/a"}') == 4
+        assert sample(body, 'latency_seconds_sum{route="/a"}') == pytest.approx(3.65)
+
+    def test_concurrent_updates_are_not_lost(self):
+        registry, requests, latency = make_registry()
+
+        def work():
+            for _ in range(10000):
+                requests.inc(("/a",))
+                latency.observe(("/a",), 0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        snapshot = registry.snapshot()
+        assert snapshot[("requests_total", ("/a",))] == 80000
+        assert snapshot[("latency_seconds", ("/a",))][0] == 80000
+
+    def test_duplicate_family_is_rejected(self):
+        registry, _, _ = make_registry()
+        with pytest.raises(ValueError):
+            registry.counter("requests_total", "Again")
+
+
+class TestExporter:
+    def test_collect_sums_every_worker(self, tmp_path):
+        worker_registry, worker_requests, worker_latency = make_registry()
+        worker = MetricsExporter(worker_registry, str(tmp_path))
+        worker_requests.inc(("/a",), 5)
+        worker_latency.observe(("/a",), 2)
+        worker.write()
+
+        registry, requests, latency = make_registry()
+        exporter = MetricsExporter(registry, str(tmp_path))
+        requests.inc(("/a",))
+        requests.inc(("/b",))
+        latency.observe(("/a",), 0.05)
+
+        snapshot = exporter.collect()
+        assert snapshot[("requests_total", ("/a",))] == 6
+        assert snapshot[("requests_total", ("/b",))] == 1
+        assert snapshot[("latency_seconds", ("/a",))] == [1, 0, 1, pytest.approx(2.05)]
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+        # the worker's later snapshot replaces its earlier one instead of adding to it
+        worker_requests.inc(("/a",))
+        worker.write()
+        assert exporter.collect()[("requests_total", ("/a",))] == 7
+
+    def test_without_directory_only_this_process(self):
+        registry, requests, _ = make_registry()
+        requests.inc(("/a",))
+        assert MetricsExporter(registry, "").collect() == {("requests_total", ("/a",)): 1}
+
+
+def make_app():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    instrument_queries(engine, "metrics-test")
+    test_app = FastAPI()
+    test_app.add_middleware(RequestMetricsMiddleware)
+
+    @test_app.get("/metrics-test/items/{item_id}")
+    def item(item_id: int):
+        with engine.connect() as conn:
+            for _ in range(item_id):
+                conn.execute(text("SELECT 1"))
+        if item_id == 0:
+            raise HTTPException(status_code=404, detail="No item")
+        return {"id": item_id}
+
+    @test_app.get("/metrics-test/crash")
+    async def crash():
+        raise RuntimeError("boom")
+
+    return test_app
+
+
+class TestRequestMetrics:
+    def test_routes_statuses_and_queries(self):
+        with TestClient(make_app(), raise_server_exceptions=False) as client:
+            assert client.get("/metrics-test/items/3").status_code == 200
+            assert client.get("/metrics-test/items/2").status_code == 200
+            assert client.get("/metrics-test/items/0").status_code == 404
+            assert client.get("/metrics-test/crash").status_code == 500
+            assert client.get("/metrics-test/nowhere").status_code == 404
+
+        body = render(metrics_registry, metrics_registry.snapshot())
+        route = '{method="GET",route="/metrics-test/items/{item_id}"'
+        assert sample(body, f'http_requests_total{route},status="200"}}') == 2
+        assert sample(body, f'http_requests_total{route},status="404"}}') == 1
+        assert sample(body, 'http_requests_total{method="GET",route="/metrics-test/crash",status="500"}') == 1
+        assert sample(body, f"http_request_duration_seconds_count{route}}}") == 3
+        # 3 + 2 + 0 statements, attributed to the requests that ran them
+        assert sample(body, f"http_request_db_queries_sum{route}}}") == 5
+        assert sample(body, f'http_request_db_queries_bucket{route},le="2.0"}}') == 2
+        assert sample(body, f"http_request_db_seconds_total{route}}}") > 0
+        assert sample(body, 'db_queries_total{engine="metrics-test"}') == 5
+
+    def test_prometheus_endpoint_sums_workers(self, tmp_path):
+        other_worker = [["http_requests_total", ["GET", "/api/metrics/db-pool", "200"], 40]]
+        (tmp_path / "1-other.json").write_bytes(orjson.dumps(other_worker))
+        metrics_exporter.configure(directory=str(tmp_path))
+        metrics_access.configure(token="metrics-secret")
+        try:
+            with TestClient(app, headers={"Authorization": "Bearer metrics-secret"}) as client:
+                before = client.get("/metrics").text
+                client.get("/api/metrics/db-pool")
+                r = client.get("/metrics")
+        finally:
+            metrics_access.configure(token="")
+            metrics_exporter.configure(directory="")
+
+        assert r.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+        assert r.headers["cache-control"] == "no-store"
+        line = 'http_requests_total{method="GET",route="/api/metrics/db-pool",status="200"}'
+        assert sample(r.text, line) == sample(before, line) + 1
+        assert sample(r.text, line) >= 41
+
+
+class TestAccess:
+    def test_token_check(self):
+        access = MetricsAccess(token="metrics-secret")
+        assert access.authorized("metrics-secret")
+        assert not access.authorized("wrong") and not access.authorized(None)
+        access.configure(token="")
+        assert not access.enabled and not access.authorized("")
+
+    @pytest.mark.parametrize("path", ["/metrics", "/api/metrics/db-pool", "/api/metrics/weather"])
+    def test_endpoints_require_the_token(self, path):
+        client = TestClient(app)
+        # no METRICS_TOKEN: not served at all
+        assert client.get(path, headers={"Authorization": "Bearer anything"}).status_code == 404
+        metrics_access.configure(token="metrics-secret")
+        try:
+            assert client.get(path).status_code == 403
+            assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 403
+            assert client.get(path, headers={"Authorization": "Bearer metrics-secret"}).status_code == 200
+        finally:
+            metrics_access.configure(token="")
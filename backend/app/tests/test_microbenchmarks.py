@@ -0,0 +1,140 @@
+"""
+Micro-benchmarks of the per-request building blocks: tokens, the authenticated-user lookup, creating
+and listing events, password hashing. Each compares its fastest call with the stored baseline and
+fails on a slowdown beyond BENCHMARK_THRESHOLD (see microbench.py; BENCHMARK_SAVE=1 stores a new
+baseline). Skipped unless BENCHMARK_RUN=1 (or BENCHMARK_SAVE=1) is set; run with `-s` to see
+the numbers. TestBaselines checks the mechanism itself and always runs.
+"""
+
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.crud.events_crud import EVENTS_PAGE_SIZE, create_event, get_user_events
+from app.db.base import Base
+from app.db.models.events_ORM import EventORM
+from app.db.models.users_ORM import UserORM
+from app.tests import microbench
+from app.tests.microbench import Benchmark, benchmark  # noqa: F401 (fixture)
+from app.utils.password_utils import hash_password, verify_password
+from app.utils.token_utils import (create_access_token, validate_access_token, validate_user_from_token,
+                                   verified_token_cache)
+from app.utils.user_cache import user_cache
+
+ROW_COUNTS = (10, 1_000, 100_000)
+WRITER = "writer@microbench.example.com"
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def email_for(rows: int) -> str:
+    return f"calendar{rows}@microbench.example.com"
+
+
+def token_for(email: str) -> str:
+    return create_access_token({"email": email, "token_version": 0})
+
+
+@pytest.fixture(scope="module")
+def db():
+    """One user per ROW_COUNTS size with that many events, plus WRITER without any."""
+    with engine.begin() as conn:
+        conn.execute(insert(UserORM), [{"email": email, "password": "x", "token_version": 0}
+                                       for email in [WRITER] + [email_for(rows) for rows in ROW_COUNTS]])
+        start = datetime(2025, 1, 1, 9, 0)
+        for rows in ROW_COUNTS:
+            conn.execute(insert(EventORM), [
+                {"title": f"Event {i}", "description": "microbench", "date_time": start + timedelta(minutes=30 * i),
+                 "user_email": email_for(rows)}
+                for i in range(rows)
+            ])
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+
+@contextmanager
+def caches(enabled: bool):
+    """With enabled=False, the verified-token and user caches are off (every call does the full work)."""
+    sizes = verified_token_cache.max_size, user_cache.max_size
+    if not enabled:
+        verified_token_cache.max_size = user_cache.max_size = 0
+    try:
+        yield
+    finally:
+        verified_token_cache.max_size, user_cache.max_size = sizes
+
+
+@microbench.opt_in
+def test_create_access_token(benchmark):
+    token = benchmark(create_access_token, {"email": WRITER, "token_version": 0})
+    assert validate_access_token(token)["email"] == WRITER
+
+
+@microbench.opt_in
+@pytest.mark.parametrize("cached", [True, False], ids=["cached", "uncached"])
+def test_validate_access_token(benchmark, cached):
+    token = token_for(WRITER)
+    with caches(cached):
+        assert benchmark(validate_access_token, token)["email"] == WRITER
+
+
+@microbench.opt_in
+@pytest.mark.parametrize("cached", [True, False], ids=["cached", "uncached"])
+def test_validate_user_from_token(benchmark, db, cached):
+    token = token_for(email_for(10))
+    with caches(cached):
+        assert benchmark(validate_user_from_token, token, db).email == email_for(10)
+
+
+@microbench.opt_in
+def test_create_event(benchmark, db):
+    res = benchmark(create_event, "Microbench", "created", datetime(2025, 6, 1, 12, 0), token_for(WRITER), db)
+    assert res.error is None
+
+
+@microbench.opt_in
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_get_user_events(benchmark, db, rows):
+    res = benchmark(get_user_events, token_for(email_for(rows)), db)
+    assert len(res.data["events"]) == min(rows, EVENTS_PAGE_SIZE)
+
+
+@microbench.opt_in
+def test_hash_password(benchmark):
+    hashed = benchmark(hash_password, "microbench-password")
+    assert verify_password("microbench-password", hashed)
+
+
+class TestBaselines:
+    def test_save_then_compare(self, tmp_path, monkeypatch):
+        baseline = tmp_path / "baseline.json"
+        Benchmark("fast", baseline, 0.25, save=True)(sum, range(100))
+        stored = json.loads(baseline.read_text())
+        assert stored["machine"] == microbench.machine()
+        assert stored["benchmarks"]["fast"]["min"] > 0
+
+        # the same code against its own baseline passes
+        Benchmark("fast", baseline, 10.0)(sum, range(100))
+
+        # 20x the work is well past a 25% threshold
+        with pytest.raises(pytest.fail.Exception, match="fast slowed down"):
+            Benchmark("fast", baseline, 0.25)(sum, range(2000))
+
+    def test_other_machine_or_missing_entry_only_reports(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"machine": {"node": "elsewhere"},
+                                        "benchmarks": {"fast": {"min": 1e-12}}}))
+        Benchmark("fast", baseline, 0.25)(sum, range(100))
+        Benchmark("new", tmp_path / "missing.json", 0.25)(sum, range(100))
@@ -5,8 +5,16 @@ This test module verifies that password hashing and verification work correctly,
 ensuring that passwords are stored securely and can be properly validated.
 """
 
+import asyncio
+import threading
+
 import pytest
-from app.utils.password_utils import hash_password, verify_password
+from app.utils.password_utils import (
+    hash_password,
+    verify_password,
+    PasswordHasher,
+    PasswordHasherBusy,
+)
 
 
 class TestPasswordHashing:
@@ -97,6 +105,56 @@ class TestPasswordIntegration:
         assert verify_password("MYPASSWORD", hashed) is False
 
 
+class TestPasswordHasherPool:
+    """Test the bounded async password hashing service."""
+
+    def test_async_hash_and_verify(self):
+        """Test that the pooled hash/verify give the same results as the sync helpers."""
+        hasher = PasswordHasher(max_workers=2, max_pending=2)
+
+        async def workflow():
+            hashed = await hasher.hash_password("pooledpassword")
+            ok = await hasher.verify_password("pooledpassword", hashed)
+            bad = await hasher.verify_password("wrong", hashed)
+            malformed = await hasher.verify_password("pooledpassword", "not_a_real_hash")
+            return hashed, ok, bad, malformed
+
+        hashed, ok, bad, malformed = asyncio.run(workflow())
+        hasher.shutdown()
+
+        assert hashed.startswith('$2b$')
+        assert ok is True
+        assert bad is False
+        assert malformed is False
+        assert hasher.stats()["completed"] == 4
+
+    def test_rejects_when_queue_is_full(self):
+        """Test that work beyond workers + pending is rejected instead of queued."""
+        hasher = PasswordHasher(max_workers=1, max_pending=1, retry_after=7)
+        release = threading.Event()
+
+        async def saturate():
+            # one running and one waiting fill the pool
+            running = asyncio.ensure_future(hasher._run(release.wait))
+            waiting = asyncio.ensure_future(hasher._run(release.wait))
+            await asyncio.sleep(0.05)
+            stats = hasher.stats()
+            with pytest.raises(PasswordHasherBusy) as exc_info:
+                await hasher.hash_password("overflow")
+            release.set()
+            await asyncio.gather(running, waiting)
+            return stats, exc_info.value
+
+        stats, busy = asyncio.run(saturate())
+        hasher.shutdown()
+
+        assert stats["in_flight"] == 1
+        assert stats["queued"] == 1
+        assert busy.retry_after == 7
+        assert hasher.stats()["rejected"] == 1
+        assert hasher.stats()["queued"] == 0
+
+
 if __name__ == "__main__":
     # Run tests if script is executed directly
     pytest.main([__file__, "-v"])
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.metrics import metrics_access
+from app.utils.profiler import StackSampler, profiler
+
+TOKEN = "profile-secret"
+ADMIN = {"X-Profile-Token": TOKEN}
+# the profiled endpoint, /api/metrics/db-pool, needs the metrics token as well
+METRICS = {"Authorization": "Bearer metrics-secret"}
+
+
+def spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def wait_for(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def client(tmp_path):
+    settings = (profiler.token, profiler.sample_rate, str(profiler.directory), profiler.interval, profiler.keep)
+    profiler.configure(token=TOKEN, sample_rate=0, directory=str(tmp_path), interval=0.001)
+    metrics_access.configure(token="metrics-secret")
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        metrics_access.configure(token="")
+        profiler.stop_worker()
+        profiler.worker = None
+        token, sample_rate, directory, interval, keep = settings
+        profiler.configure(token=token, sample_rate=sample_rate, directory=directory, interval=interval, keep=keep)
+
+
+def test_sampler_records_busy_threads_only(tmp_path):
+    stop = threading.Event()
+    busy = threading.Thread(target=spin, args=(stop,), name="busy")
+    idle = threading.Thread(target=stop.wait, name="idle")
+    busy.start()
+    idle.start()
+    saved = []
+    sampler = StackSampler(tmp_path / "t.collapsed", 0.001, 10, root="GET /x", on_saved=lambda: saved.append(1))
+    sampler.start()
+    time.sleep(0.2)
+    sampler.stop(wait=True)
+    stop.set()
+    busy.join()
+    idle.join()
+
+    assert sampler.samples > 0 and saved == [1]
+    text = (tmp_path / "t.collapsed").read_text()
+    assert text == sampler.collapsed()
+    lines = text.splitlines()
+    assert all(line.startswith("GET /x;") for line in lines)
+    assert any(line.startswith("GET /x;busy;") and ";spin (" in line for line in lines)
+    assert not any(";idle;" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1 and "spin (test_profiler.py:" in text
+
+
+def test_disabled_without_token(client):
+    profiler.configure(token="")
+    assert client.get("/debug/profile", headers=ADMIN).status_code == 404
+    r = client.get("/api/metrics/db-pool", headers={**ADMIN, **METRICS})
+    assert r.status_code == 200 and "x-profile-id" not in r.headers
+
+
+def test_token_required(client):
+    assert client.get("/debug/profile").status_code == 403
+    assert client.get("/debug/profile", headers={"X-Profile-Token": "wrong"}).status_code == 403
+    r = client.get("/api/metrics/db-pool", headers={"X-Profile-Token": "wrong", **METRICS})
+    assert r.status_code == 200 and "x-profile-id" not in r.headers
+
+
+def test_profile_one_request(client):
+    r = client.get("/api/metrics/db-pool", headers={**ADMIN, **METRICS})
+    assert r.status_code == 200
+    name = r.headers["x-profile-id"]
+    wait_for(lambda: client.get(f"/debug/profile/{name}", headers=ADMIN).status_code == 200)
+
+    r = client.get(f"/debug/profile/{name}", headers=ADMIN)
+    assert r.headers["content-type"].startswith("text/plain")
+    assert all(line.startswith("GET /api/metrics/db-pool;") for line in r.text.splitlines())
+    listed = client.get("/debug/profile", headers=ADMIN).json()["data"]["profiles"]
+    assert [profile["name"] for profile in listed] == [name]
+    assert client.get("/debug/profile/requests", headers=ADMIN,
+                      params={"route": "GET /api/other"}).text == ""
+    assert client.get("/debug/profile/..%2Fpasswd", headers=ADMIN).status_code == 404
+
+
+def test_sample_rate_profiles_without_header(client, tmp_path):
+    profiler.configure(sample_rate=1)
+    for _ in range(3):
+        r = client.get("/api/metrics/db-pool", headers=METRICS)
+        assert "x-profile-id" not in r.headers
+    wait_for(lambda: len(list(tmp_path.glob("request-*.collapsed"))) == 3)
+
+    profiler.configure(keep=2)
+    client.get("/api/metrics/db-pool", headers=METRICS)
+    wait_for(lambda: len(list(tmp_path.glob("request-*.collapsed"))) == 2)
+
+
+def test_worker_profile(client, tmp_path):
+    r = client.post("/debug/profile/start", headers=ADMIN, params={"seconds": 5})
+    assert r.status_code == 200 and r.json()["data"]["running"]
+    assert client.post("/debug/profile/start", headers=ADMIN).status_code == 409
+
+    stop = threading.Event()
+    busy = threading.Thread(target=spin, args=(stop,), name="busy")
+    busy.start()
+    time.sleep(0.2)
+    r = client.post("/debug/profile/stop", headers=ADMIN)
+    stop.set()
+    busy.join()
+
+    assert r.status_code == 200
+    assert any(line.startswith("busy;") for line in r.text.splitlines())
+    status = client.get("/debug/profile", headers=ADMIN).json()["data"]
+    assert status["worker"]["running"] is False and status["worker"]["samples"] > 0
+    assert (tmp_path / status["worker"]["name"]).read_text() == r.text
+
+    # time-boxed: stops by itself
+    profiler.configure(max_seconds=0.05)
+    client.post("/debug/profile/start", headers=ADMIN, params={"seconds": 60})
+    wait_for(lambda: not profiler.worker.running)
+    assert client.post("/debug/profile/stop", headers=ADMIN).status_code == 200
@@ -0,0 +1,115 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.query_metrics import instrument_queries
+from app.db.session import get_db
+from app.main import app
+from app.utils.server_timing import current_timings, server_timing, span
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+instrument_queries(engine, "timing-test")
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client():
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    enabled, log = server_timing.enabled, server_timing.log
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        server_timing.enabled, server_timing.log = enabled, log
+        if previous is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def login(client, email: str) -> dict:
+    credentials = {"email": email, "password": "password123"}
+    client.post("/api/auth/register", json={**credentials, "first_name": "T", "last_name": "U"})
+    token = client.post("/api/auth/login", json=credentials).json()["data"]["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def phases(header: str) -> dict[str, str]:
+    entries = {}
+    for entry in header.split(", "):
+        name, _, params = entry.partition(";")
+        entries[name] = params
+    return entries
+
+
+def test_header_lists_request_phases(client):
+    server_timing.configure(enabled=True)
+    headers = login(client, "timing@example.com")
+    client.post("/api/events", headers=headers, json={"title": "A", "date_time": "2030-01-01T10:00:00+00:00"})
+
+    r = client.get("/api/events", headers=headers)
+    assert r.status_code == 200
+    entries = phases(r.headers["server-timing"])
+    for name in ("token", "user", "version", "query", "rows", "serialize", "parse", "endpoint", "total"):
+        assert entries[name].startswith("dur="), name
+    assert 'desc="' in entries["db"]
+    assert list(entries)[-1] == "total"
+
+    r = client.post("/api/auth/login", json={"email": "timing@example.com", "password": "password123"})
+    assert "password" in phases(r.headers["server-timing"])
+
+
+def test_rejected_requests_still_timed(client):
+    server_timing.configure(enabled=True)
+    headers = login(client, "rejected@example.com")
+    r = client.post("/api/events", headers=headers, json={"title": 5})
+    assert r.status_code == 422
+    entries = phases(r.headers["server-timing"])
+    # validation failed before the route function ran: all of it counts as parsing
+    assert "parse" in entries and "total" in entries
+    assert "endpoint" not in entries and "serialize" not in entries
+
+
+def test_disabled_by_default(client):
+    server_timing.configure(enabled=False, log=False)
+    headers = login(client, "untimed@example.com")
+    r = client.get("/api/events", headers=headers)
+    assert r.status_code == 200
+    assert "server-timing" not in r.headers
+
+
+def test_log_line(client, caplog):
+    server_timing.configure(enabled=False, log=True)
+    headers = login(client, "logged@example.com")
+    with caplog.at_level(logging.INFO, logger="app.timing"):
+        logging.getLogger("app.timing").propagate = True
+        try:
+            r = client.get("/api/events", headers=headers)
+        finally:
+            logging.getLogger("app.timing").propagate = False
+    assert "server-timing" not in r.headers
+    line = next(record.getMessage() for record in caplog.records
+                if '"route":"/api/events"' in record.getMessage())
+    assert '"status":200' in line and '"phases_ms":{' in line and '"db_queries":' in line
+
+
+def test_span_outside_request_is_noop():
+    assert current_timings.get() is None
+    with span("anything") as first, span("else") as second:
+        pass
+    assert first is second
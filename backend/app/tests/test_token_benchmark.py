@@ -0,0 +1,41 @@
+"""
+Micro-benchmark of per-request auth cost: JWT verification with and without
+the verified-token cache. Run with `-s` to see the numbers. Only the cache's use is
+asserted; regressions in its speed are caught by test_microbenchmarks.py's
+test_validate_access_token[cached/uncached] against the stored baseline.
+"""
+
+import time
+
+from app.utils.token_utils import create_access_token, validate_access_token, verified_token_cache
+
+ITERATIONS = 2000
+
+
+def time_validations(token: str, use_cache: bool) -> float:
+    """Return the mean cost of one validate_access_token call in microseconds."""
+    max_size = verified_token_cache.max_size
+    verified_token_cache.max_size = max_size if use_cache else 0
+    verified_token_cache.clear()
+    try:
+        validate_access_token(token)  # warm up (and fill the cache when enabled)
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            validate_access_token(token)
+        return (time.perf_counter() - start) / ITERATIONS * 1e6
+    finally:
+        verified_token_cache.max_size = max_size
+
+
+def test_cached_validation_skips_full_decode():
+    token = create_access_token({"email": "bench@example.com", "token_version": 0})
+
+    hits = verified_token_cache.hits
+    uncached = time_validations(token, use_cache=False)
+    assert verified_token_cache.hits == hits
+    cached = time_validations(token, use_cache=True)
+    print(f"\nvalidate_access_token: {uncached:.1f}us uncached, {cached:.1f}us cached "
+          f"({uncached / cached:.1f}x)")
+
+    # every timed call was answered from the cache
+    assert verified_token_cache.hits == hits + ITERATIONS
@@ -8,6 +8,8 @@ from app.utils.token_utils import (
     validate_access_token,
     validate_user_from_token,
     extract_bearer_token,
+    verified_token_cache,
+    VerifiedTokenCache,
     SECRET_KEY,
     ALGORITHM
 )
@@ -389,3 +391,53 @@ class TestTokenIntegration:
         with patch('app.utils.token_utils.SECRET_KEY', 'different_secret'):
             with pytest.raises(ValueError, match="Invalid token"):
                 validate_access_token(token)
+
+
+class TestVerifiedTokenCache:
+    def setup_method(self):
+        verified_token_cache.clear()
+
+    def test_repeated_validation_skips_jwt_decode(self):
+        token = create_access_token({"email": "cache@example.com", "token_version": 0})
+        validate_access_token(token)
+
+        with patch('app.utils.token_utils.jwt.decode') as decode:
+            payload = validate_access_token(token)
+            decode.assert_not_called()
+        assert payload["email"] == "cache@example.com"
+
+    def test_returned_payload_is_a_copy(self):
+        token = create_access_token({"email": "copy@example.com", "token_version": 0})
+        validate_access_token(token)["email"] = "mutated@example.com"
+
+        assert validate_access_token(token)["email"] == "copy@example.com"
+
+    def test_cached_token_still_expires(self):
+        token = create_access_token({"email": "expiring@example.com", "token_version": 0}, timedelta(seconds=1))
+        validate_access_token(token)
+
+        # once past exp the entry is dropped and jwt.decode reports the expiry
+        later = datetime.now(timezone.utc).timestamp() + 5
+        with patch('app.utils.token_utils.time.time', return_value=later), \
+             patch('jwt.api_jwt.datetime') as jwt_datetime:
+            jwt_datetime.now.return_value = datetime.fromtimestamp(later, tz=timezone.utc)
+            with pytest.raises(ValueError, match="Token has expired"):
+                validate_access_token(token)
+
+    def test_rotated_secret_does_not_hit_cache(self):
+        token = create_access_token({"email": "rotate@example.com", "token_version": 0})
+        validate_access_token(token)
+
+        with patch('app.utils.token_utils.SECRET_KEY', 'rotated_secret'):
+            with pytest.raises(ValueError, match="Invalid token"):
+                validate_access_token(token)
+
+    def test_cache_is_bounded(self):
+        cache = VerifiedTokenCache(max_size=2)
+        tokens = [create_access_token({"email": f"bounded{i}@example.com"}) for i in range(3)]
+        for token in tokens:
+            cache.put(token, jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]))
+
+        assert cache.stats()["size"] == 2
+        assert cache.get(tokens[0]) is None
+        assert cache.get(tokens[2]) is not None
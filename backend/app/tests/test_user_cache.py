@@ -0,0 +1,188 @@
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.users_ORM import UserORM
+from app.crud.users_crud import logout_api_user
+from app.utils.token_utils import create_access_token, validate_user_from_token
+from app.utils import user_cache as user_cache_module
+from app.utils.user_cache import (
+    CachedUser,
+    UserCache,
+    SQLiteInvalidationChannel,
+    user_cache,
+)
+import importlib
+importlib.import_module("app.db.models.users_ORM")
+importlib.import_module("app.db.models.events_ORM")
+
+# Use in-memory SQLite for tests
+SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Create tables in the test DB
+Base.metadata.create_all(bind=engine)
+
+# Count the statements that touch the users table
+user_queries = []
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_user_queries(conn, cursor, statement, parameters, context, executemany):
+    if "FROM users" in statement:
+        user_queries.append(statement)
+
+
+def make_user(email: str, token_version: int = 0) -> CachedUser:
+    return CachedUser(email=email, first_name="Cache", last_name="User", token_version=token_version)
+
+
+class TestUserCache:
+    def test_hit_requires_matching_token_version(self):
+        cache = UserCache(max_size=10, ttl=60)
+        cache.put(make_user("a@example.com", token_version=2))
+
+        assert cache.get("a@example.com", 2) is not None
+        assert cache.get("a@example.com", 1) is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        cache = UserCache(max_size=10, ttl=0.01)
+        cache.put(make_user("ttl@example.com"))
+        time.sleep(0.02)
+
+        assert cache.get("ttl@example.com", 0) is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = UserCache(max_size=2, ttl=60)
+        cache.put(make_user("one@example.com"))
+        cache.put(make_user("two@example.com"))
+        cache.get("one@example.com", 0)  # "two" is now the oldest
+        cache.put(make_user("three@example.com"))
+
+        assert cache.get("two@example.com", 0) is None
+        assert cache.get("one@example.com", 0) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_put_is_skipped_after_concurrent_invalidation(self):
+        cache = UserCache(max_size=10, ttl=60)
+        generation = cache.generation()
+        cache.invalidate("race@example.com")  # e.g. a logout landed while we were querying
+        cache.put(make_user("race@example.com"), generation)
+
+        assert cache.get("race@example.com", 0) is None
+
+    def test_zero_size_disables_cache(self):
+        cache = UserCache(max_size=0, ttl=60)
+        cache.put(make_user("off@example.com"))
+        assert cache.get("off@example.com", 0) is None
+
+    def test_sqlite_channel_invalidates_other_workers(self, tmp_path):
+        path = str(tmp_path / "invalidations.db")
+        worker_a = UserCache(max_size=10, ttl=60, channel=SQLiteInvalidationChannel(path, poll_interval=0))
+        worker_b = UserCache(max_size=10, ttl=60, channel=SQLiteInvalidationChannel(path, poll_interval=0))
+        worker_b.put(make_user("shared@example.com"))
+
+        worker_a.invalidate("shared@example.com")
+
+        assert worker_b.get("shared@example.com", 0) is None
+        assert worker_b.stats()["invalidations"] == 1
+
+    def test_shared_channel_by_default(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(user_cache_module, "USER_CACHE_INVALIDATION_DB", str(tmp_path / "invalidations.db"))
+        monkeypatch.setattr(user_cache_module, "WEB_CONCURRENCY", 4)
+        cache = user_cache_module._build_cache()
+        assert isinstance(cache.channel, SQLiteInvalidationChannel) and cache.max_size > 0
+
+    def test_no_channel_disables_cache_with_several_workers(self, monkeypatch):
+        monkeypatch.setattr(user_cache_module, "USER_CACHE_INVALIDATION_DB", "")
+        monkeypatch.setattr(user_cache_module, "WEB_CONCURRENCY", 4)
+        # a logout in one worker could not reach the others' cached snapshots
+        assert user_cache_module._build_cache().max_size == 0
+        monkeypatch.setattr(user_cache_module, "WEB_CONCURRENCY", 1)
+        assert user_cache_module._build_cache().max_size > 0
+
+
+class TestValidateUserFromTokenCaching:
+    def setup_method(self):
+        self.db = TestingSessionLocal()
+
+    def teardown_method(self):
+        self.db.close()
+
+    def test_repeated_validation_does_no_user_queries(self):
+        self.db.add(UserORM(email="cached@example.com", first_name="C", last_name="U",
+                            password="password123", token_version=0))
+        self.db.commit()
+        token = create_access_token({"email": "cached@example.com", "token_version": 0})
+
+        assert validate_user_from_token(token, self.db) is not None
+        user_queries.clear()
+        for _ in range(5):
+            user = validate_user_from_token(token, self.db)
+            assert user is not None
+            assert user.email == "cached@example.com"
+        assert user_queries == []
+
+    def test_logout_invalidates_cached_user(self):
+        self.db.add(UserORM(email="cached.logout@example.com", first_name="C", last_name="L",
+                            password="password123", token_version=0))
+        self.db.commit()
+        token = create_access_token({"email": "cached.logout@example.com", "token_version": 0})
+        assert validate_user_from_token(token, self.db) is not None
+
+        res = logout_api_user(token, self.db)
+        assert res.error is None
+        assert user_cache.get("cached.logout@example.com", 0) is None
+
+        assert validate_user_from_token(token, self.db) is None
+        new_token = create_access_token({"email": "cached.logout@example.com", "token_version": 1})
+        assert validate_user_from_token(new_token, self.db) is not None
+
+    def test_read_between_flush_and_commit_is_not_cached(self, tmp_path):
+        # separate connections, so the reader sees the committed row while the writer's flush is pending
+        file_engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}", connect_args={"timeout": 1})
+        Base.metadata.create_all(bind=file_engine)
+        Sessions = sessionmaker(autocommit=False, autoflush=False, bind=file_engine)
+        email = "flush.race@example.com"
+        with Sessions() as db:
+            db.add(UserORM(email=email, first_name="F", last_name="R", password="password123", token_version=0))
+            db.commit()
+        token = create_access_token({"email": email, "token_version": 0})
+
+        writer = Sessions()
+        user = writer.query(UserORM).filter_by(email=email).one()
+        user.token_version = 1
+        writer.flush()
+        with Sessions() as reader:
+            # a request validating the old token misses and loads the not yet updated row
+            assert validate_user_from_token(token, reader) is not None
+        writer.commit()
+        writer.close()
+
+        with Sessions() as db:
+            assert validate_user_from_token(token, db) is None
+        file_engine.dispose()
+
+    def test_rolled_back_change_keeps_cached_user(self):
+        self.db.add(UserORM(email="rollback@example.com", first_name="R", last_name="B",
+                            password="password123", token_version=0))
+        self.db.commit()
+        token = create_access_token({"email": "rollback@example.com", "token_version": 0})
+        assert validate_user_from_token(token, self.db) is not None
+
+        invalidations = user_cache.stats()["invalidations"]
+        self.db.query(UserORM).filter_by(email="rollback@example.com").one().first_name = "Changed"
+        self.db.flush()
+        self.db.rollback()
+        assert user_cache.stats()["invalidations"] == invalidations
+        assert user_cache.get("rollback@example.com", 0) is not None
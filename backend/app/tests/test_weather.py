@@ -0,0 +1,548 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.db.base import Base
+from app.db.models.events_ORM import EventORM
+from app.db.session import get_db
+from app.crud.weather_crud import _hour_weather, forecast_prefetcher, geocoding_flight, get_forecast, search_locations
+from app.tests import fake_open_meteo
+from app.utils.forecast_cache import ForecastCache, ForecastKey, forecast_cache, grid_cell, next_refresh
+from app.utils.forecast_store import HourlyForecast
+from app.utils.geocoding_cache import geocoding_cache
+from app.utils.metrics import metrics_access
+from app.utils.open_meteo import open_meteo_client
+from app.utils.single_flight import SingleFlight
+
+TEL_AVIV = {"lat": 32.0853, "lon": 34.7818}
+METRICS = {"Authorization": "Bearer metrics-secret"}
+
+
+@pytest.fixture(autouse=True)
+def fake_upstream(tmp_path):
+    """Route the shared client to the in-process fake Open-Meteo with empty caches."""
+    fake_open_meteo.reset()
+    forecast_cache.clear()
+    geocoding_cache.configure(path=str(tmp_path / "geocoding.db"))
+    open_meteo_client.configure(base_url="http://fake-open-meteo/v1", geocoding_url="http://fake-open-meteo/v1",
+                                transport=httpx.ASGITransport(app=fake_open_meteo.app))
+    yield fake_open_meteo.app.state
+    open_meteo_client.configure(transport=None)
+
+
+@pytest.fixture
+def metrics_token():
+    metrics_access.configure(token="metrics-secret")
+    yield
+    metrics_access.configure(token="")
+
+
+@pytest.fixture
+def client(metrics_token):
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    """The fake Open-Meteo served over real sockets by uvicorn, yields its base URL."""
+    server = uvicorn.Server(uvicorn.Config(fake_open_meteo.app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/v1"
+    server.should_exit = True
+    thread.join()
+
+
+class TestGrid:
+    def test_nearby_points_share_a_cell(self):
+        assert grid_cell(32.0853, 34.7818) == grid_cell(32.1102, 34.8049) == (32.1, 34.8)
+
+    def test_cell_boundary(self):
+        assert grid_cell(32.04, 34.76, step=0.1) != grid_cell(32.06, 34.76, step=0.1)
+
+    def test_refresh_aligned_to_cadence(self):
+        assert next_refresh(900, 1000.0) == 1800
+        assert next_refresh(3600, 3600.0) == 7200
+
+
+class TestForecastCache:
+    def test_expires_at_next_update(self):
+        now = [1000.0]
+        cache = ForecastCache(clock=lambda: now[0])
+        key = ForecastKey("current", 32.1, 34.8, "celsius", "kmh")
+        assert cache.put(key, {"x": 1}) == 1800
+        now[0] = 1799.0
+        assert cache.get(key) == ({"x": 1}, 1800)
+        now[0] = 1800.0
+        assert cache.get(key) is None
+
+    def test_lru_bound(self):
+        cache = ForecastCache(max_size=2)
+        keys = [ForecastKey("daily", float(i), 0.0, "celsius", "kmh") for i in range(3)]
+        for key in keys:
+            cache.put(key, {})
+        assert cache.get(keys[0]) is None and cache.get(keys[2]) is not None
+
+    def test_concurrent_misses_coalesced(self, fake_upstream):
+        fake_upstream.latency = 0.05
+
+        async def burst():
+            return await asyncio.gather(*(get_forecast("daily", **TEL_AVIV) for _ in range(50)))
+
+        results = asyncio.run(burst())
+        assert fake_upstream.requests == 1
+        assert all(res.error is None and res.data is results[0][0].data for res, _ in results)
+        assert forecast_cache.stats()["coalesced"] == 49
+
+    def test_failure_reaches_every_waiter_and_is_not_cached(self, fake_upstream):
+        fake_upstream.latency = 0.02
+        fake_upstream.fail_status = 500
+
+        async def burst():
+            return await asyncio.gather(*(get_forecast("current", **TEL_AVIV) for _ in range(5)))
+
+        assert all(res.error for res, _ in asyncio.run(burst()))
+        assert fake_upstream.requests == 1
+        fake_upstream.fail_status = None
+        res, _ = asyncio.run(get_forecast("current", **TEL_AVIV))
+        assert res.error is None and fake_upstream.requests == 2
+
+
+class TestSingleFlight:
+    def test_error_reaches_every_caller(self):
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def burst():
+            flight = SingleFlight()
+            return await asyncio.gather(*(flight.do("k", fail) for _ in range(10)), return_exceptions=True)
+
+        results = asyncio.run(burst())
+        assert len(calls) == 1
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_waiter_timeout_does_not_cancel_the_call(self):
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def scenario():
+            flight = SingleFlight()
+            with pytest.raises(asyncio.TimeoutError):
+                await flight.do("k", slow, timeout=0.01)
+            assert flight.pending("k")
+            return await flight.do("k", slow), flight.calls
+
+        assert asyncio.run(scenario()) == ("done", 1)
+
+
+class TestStaleWhileRevalidate:
+    def test_expired_entry_served_while_one_refresh_runs(self, fake_upstream, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(forecast_cache, "_clock", lambda: now[0])
+        fake_upstream.latency = 0.02
+
+        async def scenario():
+            first, _ = await get_forecast("current", **TEL_AVIV)
+            now[0] = 1800.0  # expired, still within the stale window
+            start = time.perf_counter()
+            stale = await asyncio.gather(*(get_forecast("current", **TEL_AVIV) for _ in range(100)))
+            elapsed = time.perf_counter() - start
+            await asyncio.sleep(0.1)  # let the background refresh land
+            fresh, expires_at = await get_forecast("current", **TEL_AVIV)
+            return first, stale, elapsed, fresh, expires_at
+
+        first, stale, elapsed, fresh, expires_at = asyncio.run(scenario())
+        assert all(res.data is first.data for res, _ in stale)
+        assert elapsed < fake_upstream.latency
+        assert fake_upstream.requests == 2
+        assert fresh.data is not first.data and expires_at == 2700
+        assert forecast_cache.stats()["refreshes"] == 1
+
+    def test_failed_refresh_keeps_stale_entry(self, fake_upstream, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(forecast_cache, "_clock", lambda: now[0])
+
+        async def scenario():
+            first, _ = await get_forecast("current", **TEL_AVIV)
+            fake_upstream.fail_status = 500
+            now[0] = 1800.0
+            stale, _ = await get_forecast("current", **TEL_AVIV)
+            await asyncio.sleep(0.05)
+            again, _ = await get_forecast("current", **TEL_AVIV)
+            now[0] = 1800.0 + forecast_cache.stale_seconds  # past the stale window: a plain miss
+            expired, _ = await get_forecast("current", **TEL_AVIV)
+            return first, stale, again, expired
+
+        first, stale, again, expired = asyncio.run(scenario())
+        assert stale.data is first.data and again.data is first.data
+        assert expired.error
+        assert forecast_cache.stats()["errors"] == 2
+
+
+class TestStubServer:
+    """1000 concurrent callers against the fake upstream over real sockets."""
+
+    CALLERS = 1000
+
+    @pytest.fixture(autouse=True)
+    def use_stub_server(self, fake_upstream, stub_server):
+        open_meteo_client.configure(base_url=stub_server, geocoding_url=stub_server, transport=None)
+        fake_upstream.latency = 0.2
+
+    def test_forecast_fetched_once(self, fake_upstream):
+        async def burst():
+            try:
+                return await asyncio.gather(*(get_forecast("hourly", **TEL_AVIV) for _ in range(self.CALLERS)))
+            finally:
+                await open_meteo_client.aclose()
+
+        results = asyncio.run(burst())
+        assert fake_upstream.requests == 1
+        assert all(res.error is None for res, _ in results)
+
+    def test_search_fetched_once(self, fake_upstream):
+        calls = geocoding_flight.calls
+
+        async def burst():
+            try:
+                return await asyncio.gather(*(search_locations(name) for name in ["Tel Aviv", " tel aviv"] * (self.CALLERS // 2)))
+            finally:
+                await open_meteo_client.aclose()
+
+        results = asyncio.run(burst())
+        assert fake_upstream.requests == 1 and geocoding_flight.calls == calls + 1
+        assert all(res.data["results"][0]["name"] == "Tel Aviv" for res in results)
+
+    def test_failure_propagates_to_every_caller(self, fake_upstream):
+        fake_upstream.fail_status = 503
+
+        async def burst():
+            try:
+                return await asyncio.gather(*(get_forecast("daily", **TEL_AVIV) for _ in range(self.CALLERS)))
+            finally:
+                await open_meteo_client.aclose()
+
+        results = asyncio.run(burst())
+        assert fake_upstream.requests == 1
+        assert all(res.error == "Weather upstream returned HTTP 503" for res, _ in results)
+
+
+class TestWeatherEndpoint:
+    def test_current_weather(self, client, fake_upstream):
+        r = client.get("/api/weather/current", params=TEL_AVIV)
+        assert r.status_code == 200
+        data = r.json()["data"]
+        assert "temperature_2m" in data["current"]
+        assert (data["latitude"], data["longitude"]) == (32.1, 34.8)
+        assert r.headers["cache-control"].startswith("public, max-age=")
+
+    def test_daily_and_hourly_are_14_days(self, client):
+        assert len(client.get("/api/weather/daily", params=TEL_AVIV).json()["data"]["daily"]["time"]) == 14
+        assert len(client.get("/api/weather/hourly", params=TEL_AVIV).json()["data"]["hourly"]["time"]) == 14 * 24
+
+    def test_same_cell_served_from_cache(self, client, fake_upstream):
+        client.get("/api/weather/daily", params=TEL_AVIV)
+        client.get("/api/weather/daily", params={"lat": 32.1102, "lon": 34.8049})
+        assert fake_upstream.requests == 1
+        # other units or forecast types are separate entries
+        client.get("/api/weather/daily", params={**TEL_AVIV, "temperature_unit": "fahrenheit"})
+        client.get("/api/weather/hourly", params=TEL_AVIV)
+        assert fake_upstream.requests == 3
+
+    def test_daily_summary_shares_the_hourly_forecast(self, client, fake_upstream):
+        hourly = client.get("/api/weather/hourly", params=TEL_AVIV).json()["data"]["hourly"]
+        r = client.get("/api/weather/daily-summary", params=TEL_AVIV)
+        assert r.status_code == 200
+        assert r.headers["cache-control"].startswith("public, max-age=")
+        daily = r.json()["data"]["daily"]
+        assert len(daily["time"]) == 14
+        assert daily["temperature_2m_max"][0] == max(hourly["temperature_2m"][:24])
+        assert daily["precipitation_sum"][1] == pytest.approx(sum(hourly["precipitation"][24:48]), abs=0.01)
+        assert fake_upstream.requests == 1
+
+    def test_conditional_get(self, client, fake_upstream):
+        r = client.get("/api/weather/hourly", params=TEL_AVIV)
+        etag = r.headers["etag"]
+        assert "stale-while-revalidate=" in r.headers["cache-control"]
+        r = client.get("/api/weather/hourly", params=TEL_AVIV, headers={"If-None-Match": f'W/{etag}, "other"'})
+        assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+        assert r.headers["cache-control"].startswith("public, max-age=")
+        summary = client.get("/api/weather/daily-summary", params=TEL_AVIV)
+        assert summary.headers["etag"] != etag
+        assert client.get("/api/weather/daily-summary", params=TEL_AVIV,
+                          headers={"If-None-Match": summary.headers["etag"]}).status_code == 304
+        assert fake_upstream.requests == 1
+
+    def test_etag_follows_the_upstream_data(self, client, fake_upstream):
+        etag = client.get("/api/weather/daily", params=TEL_AVIV).headers["etag"]
+        forecast_cache.clear()
+        # refetched, same data: the same ETag, as another worker would compute
+        assert client.get("/api/weather/daily", params=TEL_AVIV).headers["etag"] == etag
+        forecast_cache.clear()
+        r = client.get("/api/weather/daily", params={**TEL_AVIV, "temperature_unit": "fahrenheit"})
+        assert r.headers["etag"] != etag
+
+    def test_upstream_failure_is_502(self, client, fake_upstream):
+        fake_upstream.fail_status = 503
+        r = client.get("/api/weather/current", params=TEL_AVIV)
+        assert r.status_code == 502
+
+    def test_invalid_parameters(self, client):
+        assert client.get("/api/weather/current", params={"lat": 95, "lon": 0}).status_code == 422
+        assert client.get("/api/weather/monthly", params=TEL_AVIV).status_code == 422
+        assert client.get("/api/weather/current", params={**TEL_AVIV, "wind_speed_unit": "knots"}).status_code == 422
+
+    def test_metrics(self, client):
+        client.get("/api/weather/current", params=TEL_AVIV)
+        client.get("/api/weather/current", params=TEL_AVIV)
+        cache = client.get("/api/metrics/weather", headers=METRICS).json()["data"]["cache"]
+        assert (cache["hits"], cache["misses"]) == (1, 1)
+
+    def test_geocode(self, client, fake_upstream):
+        r = client.get("/api/geocode", params={"name": "Haifa", "count": 2})
+        assert r.status_code == 200
+        assert [p["name"] for p in r.json()["data"]["results"]] == ["Haifa", "Haifa North"]
+        assert client.get("/api/geocode", params={"name": "H"}).status_code == 422
+        fake_upstream.fail_status = 500
+        assert client.get("/api/geocode", params={"name": "Jaffa"}).status_code == 502
+
+    def test_geocode_cache_control(self, client):
+        r = client.get("/api/geocode", params={"name": "Haifa"})
+        assert r.headers["cache-control"] == "public, max-age=86400"
+        assert client.get("/api/metrics/weather", headers=METRICS).headers["cache-control"] == "no-store"
+
+    def test_geocode_served_from_cache(self, client, fake_upstream):
+        client.get("/api/geocode", params={"name": "Haifa", "count": 3})
+        # the same search, and a prefix of names already cached, stay local
+        assert client.get("/api/geocode", params={"name": " HAIFA ", "count": 2}).json()["data"]["results"][0]["name"] == "Haifa"
+        assert len(client.get("/api/geocode", params={"name": "Haif", "count": 3}).json()["data"]["results"]) == 3
+        assert fake_upstream.requests == 1
+        geocoding = client.get("/api/metrics/weather", headers=METRICS).json()["data"]["geocoding"]
+        assert (geocoding["hits"], geocoding["prefix_hits"], geocoding["misses"]) == (1, 1, 1)
+
+
+@pytest.fixture
+def events_client(client):
+    """The app on a fresh in-memory DB, plus a logged-in user's auth headers."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    user = {"email": "weather@example.com", "password": "secret", "first_name": "W", "last_name": "X"}
+    client.post("/api/auth/register", json=user)
+    token = client.post("/api/auth/login", json=user).json()["data"]["access_token"]
+    yield client, {"Authorization": f"Bearer {token}"}
+    if previous is None:
+        del app.dependency_overrides[get_db]
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
+def hours_from_now(hours: float) -> str:
+    now = datetime.now(timezone.utc).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    return (now + timedelta(hours=hours)).isoformat()
+
+
+class TestEventWeather:
+    def test_hour_lookup(self):
+        hourly = HourlyForecast.from_payload({"hourly": {
+            "time": ["2025-01-01T00:00", "2025-01-01T01:00", "2025-01-01T02:00"], "temperature_2m": [1, 2, 3]}})
+        assert _hour_weather(hourly, datetime(2025, 1, 1, 1, 20))["temperature"] == 2
+        assert _hour_weather(hourly, datetime(2025, 1, 1, 1, 40))["temperature"] == 3
+        assert _hour_weather(hourly, datetime(2024, 12, 31, 12))["reason"] == "past"
+        assert _hour_weather(hourly, datetime(2025, 1, 1, 5))["reason"] == "future"
+
+    def test_one_fetch_per_location(self, events_client, fake_upstream):
+        client, headers = events_client
+        haifa = {"latitude": 32.794, "longitude": 34.9896}
+        for hours, location in [(2, TEL_AVIV), (30, TEL_AVIV), (50, None), (3, haifa), (80, haifa),
+                                (-24 * 5, haifa), (24 * 40, TEL_AVIV)]:
+            event = {"title": f"in {hours}h", "date_time": hours_from_now(hours)}
+            if location is TEL_AVIV:
+                event.update(latitude=TEL_AVIV["lat"], longitude=TEL_AVIV["lon"])
+            elif location:
+                event.update(location)
+            assert client.post("/api/events", json=event, headers=headers).status_code == 200
+
+        r = client.get("/api/events", params={"weather": "true", **TEL_AVIV}, headers=headers)
+        assert r.status_code == 200
+        events = r.json()["data"]["events"]
+        # Tel Aviv events and the one without a location share a cell with ?lat=&lon=
+        assert fake_upstream.requests == 2
+        weather = {e["title"]: e["weather"] for e in events}
+        assert weather["in -120h"] == {"unavailable": True, "reason": "past"}
+        assert weather["in 960h"] == {"unavailable": True, "reason": "future"}
+        for title in ("in 2h", "in 30h", "in 50h", "in 3h", "in 80h"):
+            assert weather[title]["time"] == hours_from_now(int(title.split()[1][:-1]))[:16]
+            assert weather[title]["temperature"] is not None
+
+    def test_without_location_or_weather(self, events_client, fake_upstream):
+        client, headers = events_client
+        client.post("/api/events", json={"title": "Nowhere", "date_time": hours_from_now(5)}, headers=headers)
+        event = client.get("/api/events", params={"weather": "true"}, headers=headers).json()["data"]["events"][0]
+        assert event["weather"] == {"unavailable": True, "reason": "no_location"}
+        assert "weather" not in client.get("/api/events", headers=headers).json()["data"]["events"][0]
+        assert fake_upstream.requests == 0
+
+    def test_upstream_failure_marks_events(self, events_client, fake_upstream):
+        client, headers = events_client
+        fake_upstream.fail_status = 500
+        client.post("/api/events", json={"title": "Soon", "date_time": hours_from_now(5)}, headers=headers)
+        r = client.get("/api/events", params={"weather": "true", **TEL_AVIV}, headers=headers)
+        assert r.status_code == 200
+        assert r.json()["data"]["events"][0]["weather"] == {"unavailable": True, "reason": "error"}
+
+
+@pytest.fixture
+def prefetcher_db(fake_upstream, stub_server):
+    """forecast_prefetcher on a fresh in-memory DB and the stub server; yields a sessionmaker."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    open_meteo_client.configure(base_url=stub_server, transport=None)
+    previous = (forecast_prefetcher.session_factory, forecast_prefetcher.interval, forecast_prefetcher.delay,
+                forecast_prefetcher.rate, forecast_prefetcher.jitter)
+    forecast_prefetcher.configure(session_factory=SessionLocal, rate=0)
+    yield SessionLocal
+    session_factory, interval, delay, rate, jitter = previous
+    forecast_prefetcher.configure(session_factory=session_factory, interval=interval, delay=delay, rate=rate,
+                                  jitter=jitter)
+    engine.dispose()
+
+
+def add_events(SessionLocal, *events):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with SessionLocal() as db:
+        for i, (hours, lat, lon) in enumerate(events):
+            db.add(EventORM(title=f"event {i}", date_time=now + timedelta(hours=hours), user_email="p@example.com",
+                            latitude=lat, longitude=lon))
+        db.commit()
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await open_meteo_client.aclose()
+    return asyncio.run(main())
+
+
+class TestForecastPrefetcher:
+    def test_warms_cells_of_upcoming_events(self, prefetcher_db, fake_upstream):
+        add_events(prefetcher_db, (5, 32.0853, 34.7818), (30, 32.1102, 34.8049), (48, 32.794, 34.9896),
+                   (6, None, None), (24 * 10, 40.0, 40.0), (-24 * 3, 41.0, 41.0))
+        first = run(forecast_prefetcher.run_once())
+        # Tel Aviv's two events share a cell; Haifa is the other one
+        assert (first["locations"], first["cells"], first["fetched"], first["errors"]) == (3, 2, 6, 0)
+        assert fake_upstream.requests == 6
+        assert run(forecast_prefetcher.run_once())["fresh"] == 6
+        assert fake_upstream.requests == 6
+
+        res, _ = run(get_forecast("hourly", **TEL_AVIV))
+        assert res.error is None and fake_upstream.requests == 6
+        stats = forecast_cache.stats()
+        assert (stats["prefetches"], stats["warm_hits"], stats["warm_hit_ratio"]) == (6, 1, 1.0)
+
+    def test_demand_fetch_is_not_a_warm_hit(self, prefetcher_db):
+        run(get_forecast("daily", **TEL_AVIV))
+        run(get_forecast("daily", **TEL_AVIV))
+        assert forecast_cache.stats()["warm_hits"] == 0
+
+    def test_rate_limited(self, prefetcher_db, fake_upstream):
+        add_events(prefetcher_db, *((1, 30.0 + i, 30.0) for i in range(4)))
+        forecast_prefetcher.configure(rate=40)
+        start = time.perf_counter()
+        assert run(forecast_prefetcher.run_once())["fetched"] == 12
+        # 12 fetches, at least 1/40 s between consecutive ones
+        assert time.perf_counter() - start >= 11 / 40
+
+    def test_upstream_failures_counted(self, prefetcher_db, fake_upstream):
+        add_events(prefetcher_db, (5, 32.0853, 34.7818))
+        fake_upstream.fail_status = 503
+        result = run(forecast_prefetcher.run_once())
+        assert (result["fetched"], result["errors"]) == (0, 3)
+        assert "503" in forecast_prefetcher.stats()["last_error"]
+        assert forecast_cache.stats()["size"] == 0
+
+    def test_runs_in_the_app_lifespan(self, prefetcher_db, fake_upstream, metrics_token):
+        add_events(prefetcher_db, (5, 32.0853, 34.7818))
+        forecast_prefetcher.configure(interval=60, delay=0, jitter=0)
+        with TestClient(app) as c:
+            deadline = time.monotonic() + 5
+            while forecast_prefetcher.runs == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert forecast_prefetcher.running
+            prefetch = c.get("/api/metrics/weather", headers=METRICS).json()["data"]["prefetch"]
+            assert (prefetch["runs"], prefetch["cells"], prefetch["fetched"]) == (1, 1, 3)
+            c.get("/api/weather/current", params=TEL_AVIV)
+        assert not forecast_prefetcher.running
+        assert fake_upstream.requests == 3
+        assert forecast_cache.stats()["warm_hit_ratio"] == 1.0
+
+    def test_locations_set_through_the_api_are_warmed(self, client, prefetcher_db, fake_upstream):
+        def override_get_db():
+            db = prefetcher_db()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            user = {"email": "planner@example.com", "password": "secret", "first_name": "P", "last_name": "X"}
+            client.post("/api/auth/register", json=user)
+            token = client.post("/api/auth/login", json=user).json()["data"]["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            haifa, eilat = (32.794, 34.9896), (29.5577, 34.9519)
+            r = client.post("/api/events", headers=headers, json={
+                "title": "Beach", "date_time": hours_from_now(5),
+                "latitude": TEL_AVIV["lat"], "longitude": TEL_AVIV["lon"]})
+            assert r.status_code == 200
+            r = client.post("/api/events/batch", headers=headers, json={"operations": [
+                {"op": "create", "title": "Port", "date_time": hours_from_now(20),
+                 "latitude": haifa[0], "longitude": haifa[1]}]})
+            assert r.status_code == 200
+            # an event created without a location gets one later
+            event_id = client.post("/api/events", headers=headers, json={
+                "title": "Trip", "date_time": hours_from_now(40)}).json()["data"]["id"]
+            r = client.put(f"/api/events/{event_id}", headers=headers,
+                           json={"latitude": eilat[0], "longitude": eilat[1]})
+            assert r.status_code == 200
+        finally:
+            del app.dependency_overrides[get_db]
+
+        result = run(forecast_prefetcher.run_once())
+        assert (result["locations"], result["cells"], result["errors"]) == (3, 3, 0)
+        for lat, lon in [(TEL_AVIV["lat"], TEL_AVIV["lon"]), haifa, eilat]:
+            for forecast_type in forecast_prefetcher.forecast_types:
+                assert forecast_cache.get(ForecastKey(forecast_type, *grid_cell(lat, lon), "celsius", "kmh"))
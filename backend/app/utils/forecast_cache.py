@@ -0,0 +1,179 @@
+# Shared in-process cache of upstream weather forecasts, keyed by grid cell
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from decouple import config
+
+from app.utils.single_flight import SingleFlight
+
+
+# Coordinates are snapped to a grid of this many degrees (0.1 ~ 11 km), so nearby users share one entry
+WEATHER_GRID_DEGREES = float(config("WEATHER_GRID_DEGREES", default=0.1))
+WEATHER_CACHE_SIZE = int(config("WEATHER_CACHE_SIZE", default=5000))
+
+# Seconds between upstream model updates per forecast type. Entries expire at the next
+# multiple of this on the wall clock, i.e. when the upstream could have something new.
+FORECAST_TTLS = {
+    "current": int(config("WEATHER_TTL_CURRENT", default=900)),  # current conditions: every 15 min
+    "hourly": int(config("WEATHER_TTL_HOURLY", default=3600)),   # forecast model runs: hourly
+    "daily": int(config("WEATHER_TTL_DAILY", default=3600)),
+}
+# After expiring, an entry is still served for this long while one background fetch refreshes it
+WEATHER_STALE_SECONDS = int(config("WEATHER_STALE_SECONDS", default=900))
+# Longest a request waits on an upstream fetch (the fetch itself is bounded by WEATHER_TIMEOUT)
+WEATHER_WAIT_TIMEOUT = float(config("WEATHER_WAIT_TIMEOUT", default=15))
+
+
+def grid_cell(lat: float, lon: float, step: float = WEATHER_GRID_DEGREES) -> tuple[float, float]:
+    """Center of the grid cell containing (lat, lon)."""
+    return round(round(lat / step) * step, 6), round(round(lon / step) * step, 6)
+
+
+def next_refresh(ttl: int, now: float) -> float:
+    """The next wall-clock multiple of `ttl` seconds after `now`."""
+    return (now // ttl + 1) * ttl
+
+
+@dataclass(frozen=True, slots=True)
+class ForecastKey:
+    forecast_type: str
+    lat: float
+    lon: float
+    temperature_unit: str
+    wind_speed_unit: str
+
+
+class ForecastCache:
+    """LRU of forecasts with expiry aligned to the upstream update cadence.
+
+    Misses go through a SingleFlight, so a burst of identical requests costs one
+    upstream call and every caller gets its result or its error. Failed fetches
+    are not cached. Entries expired less than `stale_seconds` ago are served
+    as-is (stale-while-revalidate) while a single background fetch replaces them,
+    so a popular key expiring never makes its callers wait on the upstream.
+
+    Values are whatever `fetch` returns (JSON payloads, HourlyForecast) and are
+    shared between callers, not copied.
+
+    prefetch() fills entries ahead of demand without counting as a lookup; hits
+    on entries it put are counted as warm hits.
+    """
+
+    def __init__(self, max_size: int = WEATHER_CACHE_SIZE, stale_seconds: int = WEATHER_STALE_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.stale_seconds = stale_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[ForecastKey, tuple[Any, float]] = OrderedDict()
+        self._prefetched: set[ForecastKey] = set()  # entries put by prefetch() and not replaced since
+        self._flight = SingleFlight()
+        self.clear()
+
+    def _lookup(self, key: ForecastKey) -> tuple[Any, float] | None:
+        """(forecast, expires_at), fresh or still within the stale window."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] + self.stale_seconds <= self._clock():
+                del self._entries[key]
+                self._prefetched.discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def get(self, key: ForecastKey) -> tuple[Any, float] | None:
+        """(forecast, expires_at) if cached and fresh."""
+        entry = self._lookup(key)
+        if entry is None or entry[1] <= self._clock():
+            return None
+        return entry
+
+    def put(self, key: ForecastKey, forecast: Any, prefetched: bool = False) -> float:
+        expires_at = next_refresh(FORECAST_TTLS[key.forecast_type], self._clock())
+        if self.max_size <= 0:
+            return expires_at
+        with self._lock:
+            self._entries[key] = (forecast, expires_at)
+            self._entries.move_to_end(key)
+            if prefetched:
+                self._prefetched.add(key)
+            else:
+                self._prefetched.discard(key)
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                self._prefetched.discard(evicted)
+        return expires_at
+
+    async def _fetch(self, key: ForecastKey, fetch: Callable[[], Awaitable[Any]],
+                     prefetched: bool = False) -> tuple[Any, float]:
+        try:
+            forecast = await fetch()
+        except Exception:
+            self.errors += 1
+            raise
+        return forecast, self.put(key, forecast, prefetched)
+
+    async def get_or_fetch(self, key: ForecastKey, fetch: Callable[[], Awaitable[Any]],
+                           timeout: float | None = WEATHER_WAIT_TIMEOUT) -> tuple[Any, float]:
+        """Cached (forecast, expires_at) for `key`, calling `fetch` at most once at a time.
+        Raises what `fetch` raised, or asyncio.TimeoutError after `timeout` seconds.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            if key in self._prefetched:
+                self.warm_hits += 1
+            if entry[1] > self._clock():
+                self.hits += 1
+            else:
+                self.stale += 1
+                if not self._flight.pending(key):
+                    self.refreshes += 1
+                    self._flight.start(key, lambda: self._fetch(key, fetch))
+            return entry
+
+        if self._flight.pending(key):
+            self.coalesced += 1
+        else:
+            self.misses += 1
+        return await self._flight.do(key, lambda: self._fetch(key, fetch), timeout)
+
+    async def prefetch(self, key: ForecastKey, fetch: Callable[[], Awaitable[Any]],
+                       timeout: float | None = WEATHER_WAIT_TIMEOUT) -> bool:
+        """Fetch `key` unless it is fresh or already being fetched; True if this called `fetch`.
+        Not counted as a lookup. Raises like get_or_fetch().
+        """
+        if self.get(key) is not None or self._flight.pending(key):
+            return False
+        self.prefetches += 1
+        await self._flight.do(key, lambda: self._fetch(key, fetch, prefetched=True), timeout)
+        return True
+
+    def clear(self) -> None:
+        """Drop every entry and zero the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._prefetched.clear()
+            self.hits = 0
+            self.stale = 0
+            self.misses = 0
+            self.coalesced = 0
+            self.refreshes = 0
+            self.errors = 0
+            self.prefetches = 0
+            self.warm_hits = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale + self.misses + self.coalesced
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits,
+                    "stale": self.stale, "misses": self.misses, "coalesced": self.coalesced,
+                    "refreshes": self.refreshes, "errors": self.errors, "prefetches": self.prefetches,
+                    "warm_hits": self.warm_hits, "warm_hit_ratio": self.warm_hits / lookups if lookups else 0.0}
+
+
+forecast_cache = ForecastCache()
@@ -0,0 +1,170 @@
+# Background warming of the forecast cache for places with upcoming events
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from decouple import config
+from sqlalchemy import select
+
+from app.db.models.events_ORM import EventORM
+from app.utils.forecast_cache import grid_cell
+
+
+# Seconds between scans of the events table, 0 disables the prefetcher
+WEATHER_PREFETCH_INTERVAL = float(config("WEATHER_PREFETCH_INTERVAL", default=600))
+# Seconds after startup before the first scan (plus jitter), so a restart doesn't compete with the first requests
+WEATHER_PREFETCH_DELAY = float(config("WEATHER_PREFETCH_DELAY", default=10))
+WEATHER_PREFETCH_DAYS = float(config("WEATHER_PREFETCH_DAYS", default=3))  # events this far ahead are warmed
+WEATHER_PREFETCH_RATE = float(config("WEATHER_PREFETCH_RATE", default=2))  # upstream fetches per second, at most
+WEATHER_PREFETCH_CONCURRENCY = int(config("WEATHER_PREFETCH_CONCURRENCY", default=4))  # fetches in flight, at most
+# Each wait is randomized by up to this fraction, so workers started together don't scan in lockstep
+WEATHER_PREFETCH_JITTER = float(config("WEATHER_PREFETCH_JITTER", default=0.2))
+# Forecast types the home page loads for an event's location
+WEATHER_PREFETCH_TYPES = tuple(str(config("WEATHER_PREFETCH_TYPES", default="current,daily,hourly")).split(","))
+
+
+class ForecastPrefetcher:
+    """Periodically warms the forecast cache for the grid cells of upcoming events.
+
+    Every `interval` seconds (± jitter) it reads the distinct locations of events in
+    the next `days` days and calls `warm(forecast_type, lat, lon, throttle)` for each
+    cell and type, `concurrency` at a time. `warm` returns whether it had to fetch
+    (see ForecastCache.prefetch) and awaits `throttle()` right before calling the
+    upstream, so cells that are already fresh cost nothing and actual fetches start
+    at most `rate` per second. Failures are counted and the scan moves on.
+    """
+
+    def __init__(self, warm: Callable[..., Awaitable[bool]], session_factory=None,
+                 interval: float = WEATHER_PREFETCH_INTERVAL, delay: float = WEATHER_PREFETCH_DELAY,
+                 days: float = WEATHER_PREFETCH_DAYS, rate: float = WEATHER_PREFETCH_RATE,
+                 concurrency: int = WEATHER_PREFETCH_CONCURRENCY, jitter: float = WEATHER_PREFETCH_JITTER,
+                 forecast_types: tuple[str, ...] = WEATHER_PREFETCH_TYPES):
+        self.warm = warm
+        self.session_factory = session_factory
+        self.interval = interval
+        self.delay = delay
+        self.days = days
+        self.rate = rate
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.forecast_types = forecast_types
+        self._task: asyncio.Task | None = None
+        self._next_fetch = 0.0
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.runs = 0
+        self.locations = 0  # in the last run
+        self.cells = 0  # in the last run
+        self.fetched = 0
+        self.fresh = 0
+        self.errors = 0
+        self.last_run_at: float | None = None
+        self.last_run_seconds: float | None = None
+        self.last_error: str | None = None
+
+    def configure(self, session_factory=None, interval: float | None = None, delay: float | None = None,
+                  days: float | None = None, rate: float | None = None, concurrency: int | None = None,
+                  jitter: float | None = None) -> None:
+        """Change settings (e.g. in tests); takes effect on the next run. Resets the counters."""
+        self.session_factory = session_factory or self.session_factory
+        self.interval = self.interval if interval is None else interval
+        self.delay = self.delay if delay is None else delay
+        self.days = self.days if days is None else days
+        self.rate = self.rate if rate is None else rate
+        self.concurrency = self.concurrency if concurrency is None else concurrency
+        self.jitter = self.jitter if jitter is None else jitter
+        self._reset_counters()
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _upcoming_locations(self, start: datetime, end: datetime) -> list[tuple[float, float]]:
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(EventORM.latitude, EventORM.longitude).distinct()
+                .where(EventORM.date_time >= start, EventORM.date_time < end,
+                       EventORM.latitude.is_not(None), EventORM.longitude.is_not(None))
+            ).all()
+        return [(lat, lon) for lat, lon in rows]
+
+    async def _throttle(self) -> None:
+        """Wait for the next upstream slot; slots are `1 / rate` seconds apart."""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        start = max(now, self._next_fetch)
+        self._next_fetch = start + 1 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def run_once(self) -> dict:
+        """Scan once and warm every stale cell; returns this run's counts."""
+        started = time.monotonic()
+        # event times are naive local times; a day of slack covers every timezone
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        locations = await asyncio.to_thread(self._upcoming_locations, now - timedelta(days=1),
+                                            now + timedelta(days=self.days + 1))
+        cells = sorted({grid_cell(lat, lon) for lat, lon in locations})
+        run = {"locations": len(locations), "cells": len(cells), "fetched": 0, "fresh": 0, "errors": 0}
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def warm(forecast_type, lat, lon):
+            async with semaphore:
+                try:
+                    fetched = await self.warm(forecast_type, lat, lon, self._throttle)
+                except Exception as e:
+                    run["errors"] += 1
+                    self.last_error = f"{e.__class__.__name__}: {e}"
+                    return
+            run["fetched" if fetched else "fresh"] += 1
+
+        await asyncio.gather(*(warm(forecast_type, lat, lon)
+                               for lat, lon in cells for forecast_type in self.forecast_types))
+        self.runs += 1
+        self.locations, self.cells = run["locations"], run["cells"]
+        self.fetched += run["fetched"]
+        self.fresh += run["fresh"]
+        self.errors += run["errors"]
+        self.last_run_at = time.time()
+        self.last_run_seconds = time.monotonic() - started
+        return run
+
+    async def _loop(self) -> None:
+        await asyncio.sleep(self.delay + random.uniform(0, self.jitter * self.interval))
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:  # e.g. the database is unavailable; try again next time
+                self.errors += 1
+                self.last_error = f"{e.__class__.__name__}: {e}"
+            await asyncio.sleep(self._jittered(self.interval))
+
+    def start(self) -> None:
+        """Start the periodic scans on the running event loop (no-op if disabled or running)."""
+        if self.interval <= 0 or self.session_factory is None or self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def stats(self) -> dict:
+        return {"running": self.running, "interval": self.interval, "days": self.days, "rate": self.rate,
+                "concurrency": self.concurrency,
+                "runs": self.runs, "locations": self.locations, "cells": self.cells, "fetched": self.fetched,
+                "fresh": self.fresh, "errors": self.errors, "last_run_at": self.last_run_at,
+                "last_run_seconds": self.last_run_seconds, "last_error": self.last_error}
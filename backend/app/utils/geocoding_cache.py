@@ -0,0 +1,321 @@
+# Persistent cache of geocoding results with an in-memory prefix index for search-as-you-type
+import bisect
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from decouple import config
+
+
+# SQLite file shared by every worker and kept across restarts
+GEOCODING_CACHE_DB = str(config("GEOCODING_CACHE_DB", default="./geocoding_cache.db"))
+GEOCODING_CACHE_SIZE = int(config("GEOCODING_CACHE_SIZE", default=50000))  # places kept, 0 disables the cache
+GEOCODING_CACHE_TTL = float(config("GEOCODING_CACHE_TTL", default=30 * 24 * 3600))  # seconds a search result is reused
+# Shorter queries only use exact cached searches: a two-letter prefix says little about what the user wants
+GEOCODING_PREFIX_MIN_LENGTH = int(config("GEOCODING_PREFIX_MIN_LENGTH", default=3))
+
+
+def normalize(name: str) -> str:
+    """Case- and whitespace-insensitive search key."""
+    return " ".join(name.casefold().split())
+
+
+@dataclass(slots=True)
+class CachedSearch:
+    """Place ids an upstream search returned for `count` requested results."""
+    ids: tuple[int, ...]
+    count: int
+    fetched_at: float
+
+    def covers(self, count: int) -> bool:
+        # fewer results than asked for means the upstream had nothing more
+        return count <= self.count or len(self.ids) < self.count
+
+
+class GeocodingCache:
+    """Places from previous geocoding searches, per language.
+
+    A search is answered locally when the same query was searched before (for at
+    least as many results), or when at least `count` cached places have names
+    starting with it, ranked by population. Everything else misses and the caller
+    fetches from the upstream and put()s the result.
+
+    Places and searches live in LRUs bounded by `max_size` each, with a sorted
+    (name, -population, id) array per language as the prefix index; both are
+    mirrored in a SQLite file so other workers and restarts start warm.
+
+    lookup() only reads memory. load(), put() and open() (the warm start, also done
+    lazily by load()) do SQLite I/O and may wait on another worker's write, so async
+    code runs them in a thread. `_lock` guards the in-memory state and is never held
+    during I/O; `_db_lock` serializes use of the connection.
+    """
+
+    def __init__(self, path: str = GEOCODING_CACHE_DB, max_size: int = GEOCODING_CACHE_SIZE,
+                 ttl: float = GEOCODING_CACHE_TTL, prefix_min_length: int = GEOCODING_PREFIX_MIN_LENGTH,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.prefix_min_length = prefix_min_length
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._places: OrderedDict[tuple[str, int], dict] = OrderedDict()
+        self._index: dict[str, list[tuple[str, int, int]]] = {}
+        self._searches: OrderedDict[tuple[str, str], CachedSearch] = OrderedDict()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.search_evictions = 0
+
+    def configure(self, path: str | None = None, max_size: int | None = None) -> None:
+        """Switch to another file (e.g. in tests); drops the in-memory state and counters."""
+        with self._db_lock, self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self.path = path or self.path
+            self.max_size = self.max_size if max_size is None else max_size
+            self._places.clear()
+            self._index.clear()
+            self._searches.clear()
+            self._reset_counters()
+
+    # --- storage (call with _db_lock held) ---
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # a cache: losing the last writes on power loss is fine
+        conn.execute("CREATE TABLE IF NOT EXISTS geocoding_places ("
+                     "language TEXT NOT NULL, id INTEGER NOT NULL, data TEXT NOT NULL, last_used REAL NOT NULL, "
+                     "PRIMARY KEY (language, id))")
+        conn.execute("CREATE TABLE IF NOT EXISTS geocoding_searches ("
+                     "language TEXT NOT NULL, query TEXT NOT NULL, ids TEXT NOT NULL, count INTEGER NOT NULL, "
+                     "fetched_at REAL NOT NULL, PRIMARY KEY (language, query))")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_geocoding_searches_fetched_at ON geocoding_searches (fetched_at)")
+        self._conn = conn
+        self._warm(conn)
+        return conn
+
+    def _warm(self, conn: sqlite3.Connection) -> None:
+        """Load the most recently used places and searches. Entries put() in the meantime are
+        newer, so the loaded ones only fill in behind them at the old end of the LRUs."""
+        places = conn.execute("SELECT language, data FROM geocoding_places ORDER BY last_used DESC LIMIT ?",
+                              (self.max_size,)).fetchall()
+        searches = conn.execute("SELECT language, query, ids, count, fetched_at FROM geocoding_searches "
+                                "WHERE fetched_at > ? ORDER BY fetched_at DESC LIMIT ?",
+                                (self._clock() - self.ttl, self.max_size)).fetchall()
+        with self._lock:
+            added: dict[str, list] = {}
+            for language, data in places:
+                place = json.loads(data)
+                key = (language, place["id"])
+                if key not in self._places:
+                    self._places[key] = place
+                    self._places.move_to_end(key, last=False)
+                    added.setdefault(language, []).append(self._index_entry(place))
+            for language, entries in added.items():
+                index = self._index.setdefault(language, [])
+                index.extend(entries)
+                index.sort()
+            for language, query, ids, count, fetched_at in searches:
+                key = (language, query)
+                if key not in self._searches:
+                    self._searches[key] = CachedSearch(tuple(json.loads(ids)), count, fetched_at)
+                    self._searches.move_to_end(key, last=False)
+            self._evict()
+
+    def open(self) -> None:
+        """Connect and load the warm start; blocking, a no-op once done."""
+        if self.max_size <= 0:
+            return
+        with self._db_lock:
+            self._connect()
+
+    # --- in-memory places, searches and prefix index (call with _lock held) ---
+
+    @staticmethod
+    def _index_entry(place: dict) -> tuple[str, int, int]:
+        return normalize(place.get("name") or ""), -(place.get("population") or 0), place["id"]
+
+    def _remember(self, language: str, place: dict) -> None:
+        key = (language, place["id"])
+        old = self._places.pop(key, None)
+        index = self._index.setdefault(language, [])
+        if old is not None:
+            self._unindex(index, old)
+        self._places[key] = place
+        bisect.insort(index, self._index_entry(place))
+
+    def _remember_search(self, key: tuple[str, str], search: CachedSearch) -> None:
+        self._searches[key] = search
+        self._searches.move_to_end(key)
+
+    def _unindex(self, index: list, place: dict) -> None:
+        entry = self._index_entry(place)
+        i = bisect.bisect_left(index, entry)
+        if i < len(index) and index[i] == entry:
+            del index[i]
+
+    def _evict(self) -> tuple[list[tuple[str, int]], list[tuple[str, str]]]:
+        """Trim both LRUs to max_size; returns the evicted place and search keys."""
+        places = []
+        while len(self._places) > self.max_size:
+            key, place = self._places.popitem(last=False)
+            self._unindex(self._index[key[0]], place)
+            places.append(key)
+        searches = []
+        while len(self._searches) > self.max_size:
+            searches.append(self._searches.popitem(last=False)[0])
+        self.evictions += len(places)
+        self.search_evictions += len(searches)
+        return places, searches
+
+    def _resolve(self, language: str, ids) -> list[dict] | None:
+        """Places for `ids`, marked as recently used; None if any was evicted."""
+        places = []
+        for place_id in ids:
+            key = (language, place_id)
+            place = self._places.get(key)
+            if place is None:
+                return None
+            self._places.move_to_end(key)
+            places.append(place)
+        return places
+
+    def _exact(self, language: str, query: str, count: int) -> list[dict] | None:
+        key = (language, query)
+        search = self._searches.get(key)
+        if search is None or search.fetched_at + self.ttl <= self._clock() or not search.covers(count):
+            return None
+        places = self._resolve(language, search.ids[:count])
+        if places is None:
+            # some of its places were evicted: it can't answer again
+            del self._searches[key]
+            return None
+        self._searches.move_to_end(key)
+        return places
+
+    def _prefix(self, language: str, query: str, count: int) -> list[dict] | None:
+        index = self._index.get(language)
+        if not index:
+            return None
+        start = bisect.bisect_left(index, (query,))
+        end = bisect.bisect_left(index, (query + "\uffff",), start)
+        if end - start < count:
+            return None
+        best = heapq.nsmallest(count, index[start:end], key=lambda entry: entry[1])
+        return self._resolve(language, [entry[2] for entry in best])
+
+    # --- public API ---
+
+    def lookup(self, name: str, count: int = 10, language: str = "en") -> list[dict] | None:
+        """Cached places for a search from memory only, or None if load() has to look further."""
+        if self.max_size <= 0:
+            return None
+        query = normalize(name)
+        with self._lock:
+            places = self._exact(language, query, count)
+            if places is not None:
+                self.hits += 1
+                return places
+            if len(query) >= self.prefix_min_length:
+                places = self._prefix(language, query, count)
+                if places is not None:
+                    self.prefix_hits += 1
+                    return places
+            return None
+
+    def load(self, name: str, count: int = 10, language: str = "en") -> list[dict] | None:
+        """After a lookup() miss: places for a search another worker stored since we started
+        (or that the warm start brought in), or None on a miss. Blocking."""
+        if self.max_size <= 0:
+            return None
+        query = normalize(name)
+        with self._db_lock:
+            conn = self._connect()
+            row = conn.execute("SELECT ids, count, fetched_at FROM geocoding_searches "
+                               "WHERE language = ? AND query = ? AND fetched_at > ?",
+                               (language, query, self._clock() - self.ttl)).fetchone()
+            search = None if row is None else CachedSearch(tuple(json.loads(row[0])), row[1], row[2])
+            rows = []
+            if search is not None and search.covers(count):
+                placeholders = ",".join("?" * len(search.ids))
+                rows = conn.execute(f"SELECT data FROM geocoding_places WHERE language = ? AND id IN ({placeholders})",
+                                    (language, *search.ids)).fetchall()
+        with self._lock:
+            places = self._exact(language, query, count)
+            if places is None:
+                places = self._prefix_or_none(language, query, count)
+            if places is None and search is not None and search.covers(count):
+                for (data,) in rows:
+                    self._remember(language, json.loads(data))
+                self._remember_search((language, query), search)
+                places = self._resolve(language, search.ids[:count])
+                self._evict()
+            if places is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return places
+
+    def _prefix_or_none(self, language: str, query: str, count: int) -> list[dict] | None:
+        # what the warm start brought in may answer it now
+        if len(query) < self.prefix_min_length:
+            return None
+        return self._prefix(language, query, count)
+
+    def search(self, name: str, count: int = 10, language: str = "en") -> list[dict] | None:
+        """Cached places for a search, or None on a miss: lookup(), then load(). Blocking."""
+        places = self.lookup(name, count, language)
+        return places if places is not None else self.load(name, count, language)
+
+    def put(self, name: str, count: int, language: str, places: list[dict]) -> None:
+        """Store an upstream search result. Blocking."""
+        if self.max_size <= 0:
+            return
+        query = normalize(name)
+        places = [place for place in places if place.get("id") is not None]
+        now = self._clock()
+        search = CachedSearch(tuple(place["id"] for place in places), count, now)
+        with self._db_lock:
+            conn = self._connect()
+            with self._lock:
+                for place in places:
+                    self._remember(language, place)
+                self._remember_search((language, query), search)
+                evicted_places, evicted_searches = self._evict()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("INSERT OR REPLACE INTO geocoding_places (language, id, data, last_used) "
+                                 "VALUES (?, ?, ?, ?)",
+                                 [(language, place["id"], json.dumps(place), now) for place in places])
+                conn.execute("INSERT OR REPLACE INTO geocoding_searches (language, query, ids, count, fetched_at) "
+                             "VALUES (?, ?, ?, ?, ?)", (language, query, json.dumps(search.ids), count, now))
+                conn.executemany("DELETE FROM geocoding_places WHERE language = ? AND id = ?", evicted_places)
+                conn.executemany("DELETE FROM geocoding_searches WHERE language = ? AND query = ?", evicted_searches)
+                conn.execute("DELETE FROM geocoding_searches WHERE fetched_at <= ?", (now - self.ttl,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.prefix_hits + self.misses
+            return {"size": len(self._places), "max_size": self.max_size, "searches": len(self._searches),
+                    "hits": self.hits, "prefix_hits": self.prefix_hits, "misses": self.misses,
+                    "hit_rate": (self.hits + self.prefix_hits) / lookups if lookups else 0.0,
+                    "evictions": self.evictions, "search_evictions": self.search_evictions}
+
+
+geocoding_cache = GeocodingCache()
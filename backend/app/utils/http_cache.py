@@ -0,0 +1,79 @@
+# Validators (ETag / Last-Modified) and conditional GET helpers for the API routes
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Response
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag (quoted) identifying a representation built from `parts`."""
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """IMF-fixdate for Last-Modified; naive datetimes are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _whole_second(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def last_modified_is_strong(last_modified: datetime) -> bool:
+    """Whether the second of `last_modified` is over. Until then another change in the same
+    second would leave the HTTP date (whole seconds) unchanged, so it can't validate anything
+    (RFC 9110 8.8.2.2): it is neither sent nor used to answer 304.
+    """
+    return _whole_second(last_modified) < _whole_second(_now())
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(headers, etag: str | None, last_modified: datetime | None = None) -> bool:
+    """Whether a GET with these request headers can be answered 304.
+    If-None-Match wins when present; If-Modified-Since is only looked at without it.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole seconds
+    return _whole_second(last_modified) <= since and last_modified_is_strong(last_modified)
+
+
+def validator_headers(etag: str | None, last_modified: datetime | None, cache_control: str) -> dict:
+    headers = {"Cache-Control": cache_control}
+    if etag is not None:
+        headers["ETag"] = etag
+    if last_modified is not None and last_modified_is_strong(last_modified):
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified_response(headers: dict) -> Response:
+    """304 carrying the same validators and caching policy a 200 would have."""
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,162 @@
+# Minimal iCalendar (RFC 5545) helpers for exporting and importing events
+
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from decouple import config
+
+PRODID = "-//weatherstation//events//EN"
+# Imported times with a zone (UTC "Z" or TZID) are stored as wall-clock time in this zone
+TIMEZONE = str(config("TIMEZONE", default="UTC"))
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value."""
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line to 75 octets per physical line, terminated by CRLF."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # never split a multi-byte UTF-8 character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime(value: datetime) -> str:
+    """Event times are stored as wall-clock values, so they are written as floating times."""
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def calendar_header() -> str:
+    return "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + fold_line(f"PRODID:{PRODID}")
+
+
+def calendar_footer() -> str:
+    return "END:VCALENDAR\r\n"
+
+
+def format_vevent(uid: str, title: str, description: str | None, date_time: datetime, stamp: datetime) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{format_datetime(stamp)}Z",
+        f"DTSTART:{format_datetime(date_time)}",
+        f"SUMMARY:{escape_text(title)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def unescape_text(value: str) -> str:
+    """Inverse of escape_text."""
+    out = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            out.append("\n" if nxt in ("n", "N") else nxt)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def unfold_lines(lines: Iterable[bytes]) -> Iterator[str]:
+    """Yield logical content lines from raw (possibly folded) lines, one at a time."""
+    current = None
+    for raw in lines:
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def split_property(line: str) -> tuple[str, dict, str]:
+    """Split "NAME;PARAM=x:value" into (NAME, {PARAM: x}, value)."""
+    in_quotes = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ":" and not in_quotes:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return line.upper(), {}, ""
+    name, *raw_params = head.split(";")
+    params = {}
+    for param in raw_params:
+        key, _, val = param.partition("=")
+        params[key.upper()] = val.strip('"')
+    return name.upper(), params, value
+
+
+def parse_datetime(value: str, params: dict) -> datetime:
+    """Parse a DTSTART value into the naive wall-clock time events are stored as."""
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value[:8], "%Y%m%d")
+    if value.endswith("Z"):
+        parsed = datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+    else:
+        parsed = datetime.strptime(value, "%Y%m%dT%H%M%S")
+        if "TZID" not in params:
+            return parsed  # floating time
+        try:
+            parsed = parsed.replace(tzinfo=ZoneInfo(params["TZID"]))
+        except (ZoneInfoNotFoundError, ValueError):
+            return parsed  # unknown zone, keep the wall-clock time
+    return parsed.astimezone(ZoneInfo(TIMEZONE)).replace(tzinfo=None)
+
+
+def iter_vevents(lines: Iterable[bytes]) -> Iterator[dict]:
+    """Incrementally parse VEVENTs from an iterable of raw lines (e.g. an open file).
+    Yields {"uid", "title", "description", "date_time"} per event, with date_time
+    None when DTSTART is missing or unparseable. Only the current event is held in memory.
+    """
+    event = None
+    depth = 0  # nesting inside the VEVENT (e.g. VALARM), whose properties are ignored
+    for line in unfold_lines(lines):
+        name, params, value = split_property(line)
+        if name == "BEGIN":
+            if event is None and value.upper() == "VEVENT":
+                event, depth = {"uid": None, "title": None, "description": None, "date_time": None}, 0
+            elif event is not None:
+                depth += 1
+        elif name == "END" and event is not None:
+            if depth:
+                depth -= 1
+            elif value.upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not depth:
+            if name == "UID":
+                event["uid"] = value.strip() or None
+            elif name == "SUMMARY":
+                event["title"] = unescape_text(value)
+            elif name == "DESCRIPTION":
+                event["description"] = unescape_text(value)
+            elif name == "DTSTART":
+                try:
+                    event["date_time"] = parse_datetime(value, params)
+                except ValueError:
+                    event["date_time"] = None
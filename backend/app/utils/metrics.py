@@ -0,0 +1,278 @@
+# Counters and histograms in the Prometheus text format, summed across uvicorn worker processes
+import asyncio
+import bisect
+import hmac
+import math
+import os
+import threading
+import uuid
+from pathlib import Path
+
+import orjson
+from decouple import config
+
+
+# Directory shared by the worker processes of one server; each worker writes a snapshot of its
+# counters there and GET /metrics adds them up. Empty: only the answering worker's counters are served.
+METRICS_DIR = str(config("METRICS_DIR", default=""))
+# Seconds between snapshot writes, i.e. how far behind the other workers' numbers may be
+METRICS_FLUSH_INTERVAL = float(config("METRICS_FLUSH_INTERVAL", default=5))
+# Bearer token the metrics endpoints (/metrics, /api/metrics/*) require, e.g. in Prometheus'
+# `authorization` scrape setting. Empty: the endpoints are not served at all
+METRICS_TOKEN = str(config("METRICS_TOKEN", default=""))
+
+# Upper bounds (seconds) of request latency buckets, the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Family:
+    def __init__(self, registry: "MetricsRegistry", name: str, documentation: str, labelnames: tuple[str, ...]):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), value: float = 1) -> None:
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+
+class Histogram(_Family):
+    """Bucket counts (not cumulative; the last slot counts values above every bound) plus the sum."""
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames, buckets: tuple[float, ...]):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: tuple, value: float) -> None:
+        shard = self.registry._shard()
+        key = (self.name, labels)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = [0] * (len(self.buckets) + 2)
+        # a bucket holds values <= its bound
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+
+class MetricsRegistry:
+    """Metric families of this process and their values.
+
+    Updates are lock-free: every thread adds into its own shard (a dict only that thread
+    writes), and snapshot() sums the shards. The request middleware runs on the event
+    loop thread, database hooks on the threadpool threads, so no two threads ever
+    contend for the same counter.
+    """
+
+    def __init__(self):
+        self.families: dict[str, _Family] = {}
+        self._local = threading.local()
+        self._shards: list[dict] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, family):
+        if family.name in self.families:
+            raise ValueError(f"Metric {family.name!r} is already registered")
+        self.families[family.name] = family
+        return family
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            self._shards.append(shard)  # list.append is atomic
+        return shard
+
+    def snapshot(self) -> dict:
+        """{(name, labels): value or bucket list} summed over every thread's shard."""
+        total: dict = {}
+        for shard in list(self._shards):
+            # dict.copy() runs without releasing the GIL, so the owner can't resize it meanwhile
+            for key, value in shard.copy().items():
+                _add(total, key, list(value) if isinstance(value, list) else value)
+        return total
+
+    def clear(self) -> None:
+        """Zero every series (tests)."""
+        for shard in list(self._shards):
+            shard.clear()
+
+
+def _add(total: dict, key, value) -> None:
+    current = total.get(key)
+    if current is None:
+        total[key] = value
+    elif isinstance(current, list):
+        for i, v in enumerate(value):
+            current[i] += v
+    else:
+        total[key] = current + value
+
+
+class MetricsAccess:
+    """Who may read the metrics: route labels, pool and cache internals are not for the public."""
+
+    def __init__(self, token: str = METRICS_TOKEN):
+        self.token = token
+
+    def configure(self, token: str | None = None) -> None:
+        """Change the token (e.g. in tests); "" turns the endpoints off."""
+        self.token = self.token if token is None else token
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def authorized(self, presented: str | None) -> bool:
+        return self.enabled and presented is not None and hmac.compare_digest(presented.encode(), self.token.encode())
+
+
+class MetricsExporter:
+    """Shares a registry's values with the other worker processes through `directory`.
+
+    Each process keeps one file there (named by pid and a random suffix, so a restarted
+    worker never overwrites a predecessor's totals) and rewrites it every `interval`
+    seconds and on shutdown. collect() writes this process's file and sums all of them,
+    so whichever worker answers a scrape reports the server-wide totals. Files of exited
+    workers are kept: counters must not go backwards. Clear the directory when the whole
+    server restarts (scripts/start.sh does).
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str = METRICS_DIR,
+                 interval: float = METRICS_FLUSH_INTERVAL):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+        self._pid: int | None = None
+        self._filename = ""
+
+    def configure(self, directory: str | None = None, interval: float | None = None) -> None:
+        """Change settings (e.g. in tests)."""
+        self.directory = self.directory if directory is None else directory
+        self.interval = self.interval if interval is None else interval
+        self._pid = None
+
+    @property
+    def path(self) -> Path | None:
+        if not self.directory:
+            return None
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._filename = f"{self._pid}-{uuid.uuid4().hex[:8]}.json"
+        return Path(self.directory) / self._filename
+
+    def write(self) -> None:
+        """Write this process's snapshot (atomically, via rename)."""
+        path = self.path
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = [[name, list(labels), value] for (name, labels), value in self.registry.snapshot().items()]
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(orjson.dumps(data))
+        os.replace(tmp, path)
+
+    def collect(self) -> dict:
+        """Snapshot of every worker (just this one without a directory)."""
+        path = self.path
+        if path is None:
+            return self.registry.snapshot()
+        self.write()
+        total: dict = {}
+        for file in path.parent.glob("*.json"):
+            try:
+                data = orjson.loads(file.read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                continue  # vanished or half-written by hand; skip it this time
+            for name, labels, value in data:
+                _add(total, (name, tuple(labels)), value)
+        return total
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.write)
+            except OSError:
+                pass  # e.g. the directory was removed; the next write recreates it
+
+    def start(self) -> None:
+        """Write snapshots periodically on the running event loop (no-op without a directory)."""
+        if not self.directory or self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.directory:
+            self.write()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def render(registry: MetricsRegistry, snapshot: dict) -> str:
+    """Prometheus text exposition (format 0.0.4) of `snapshot` for the registry's families."""
+    series_by_family: dict[str, list] = {}
+    for (name, labels), value in snapshot.items():
+        series_by_family.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, family in registry.families.items():
+        lines.append(f"# HELP {name} {_escape(family.documentation)}")
+        lines.append(f"# TYPE {name} {family.kind}")
+        for labels, value in sorted(series_by_family.get(name, ()), key=lambda item: tuple(map(str, item[0]))):
+            if family.kind == "counter":
+                lines.append(f"{name}{_labels(family.labelnames, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(family.buckets + (math.inf,), value[:-1]):
+                cumulative += count
+                le = 'le="' + _number(float(bound)) + '"'
+                lines.append(f"{name}_bucket{_labels(family.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(family.labelnames, labels)} {_number(float(value[-1]))}")
+            lines.append(f"{name}_count{_labels(family.labelnames, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# Families are registered here by the modules that record them (see request_metrics.py)
+metrics_registry = MetricsRegistry()
+metrics_exporter = MetricsExporter(metrics_registry)
+metrics_access = MetricsAccess()
@@ -0,0 +1,100 @@
+# Pooled async client for the Open-Meteo forecast and geocoding APIs (https://open-meteo.com/en/docs)
+import httpx
+from decouple import config
+
+
+WEATHER_BASE_URL = str(config("WEATHER_BASE_URL", default="https://api.open-meteo.com/v1"))
+GEOCODING_BASE_URL = str(config("GEOCODING_BASE_URL", default="https://geocoding-api.open-meteo.com/v1"))
+WEATHER_TIMEOUT = float(config("WEATHER_TIMEOUT", default=10))  # seconds
+WEATHER_MAX_CONNECTIONS = int(config("WEATHER_MAX_CONNECTIONS", default=20))
+
+# Variables requested per forecast type, the same ones frontend/API/weatherAPI.js used to ask for
+FORECAST_PARAMS = {
+    "current": {
+        "current": "temperature_2m,relative_humidity_2m,apparent_temperature,is_day,precipitation,rain,"
+                   "showers,snowfall,weather_code,cloud_cover,pressure_msl,surface_pressure,"
+                   "wind_speed_10m,wind_direction_10m,wind_gusts_10m",
+    },
+    "daily": {
+        "daily": "weather_code,temperature_2m_max,temperature_2m_min,apparent_temperature_max,"
+                 "apparent_temperature_min,precipitation_sum,rain_sum,showers_sum,snowfall_sum,"
+                 "precipitation_probability_max,wind_speed_10m_max,wind_gusts_10m_max,"
+                 "wind_direction_10m_dominant,sunrise,sunset",
+        "forecast_days": 14,
+    },
+    "hourly": {
+        "hourly": "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation_probability,"
+                  "precipitation,rain,showers,snowfall,weather_code,cloud_cover,wind_speed_10m,"
+                  "wind_direction_10m,wind_gusts_10m,uv_index,is_day",
+        "forecast_days": 14,
+    },
+}
+
+
+class UpstreamError(Exception):
+    """The weather upstream failed or returned an error payload."""
+
+
+class OpenMeteoClient:
+    """One keep-alive connection pool shared by every forecast request of the worker."""
+
+    def __init__(self, base_url: str = WEATHER_BASE_URL, geocoding_url: str = GEOCODING_BASE_URL,
+                 transport: httpx.AsyncBaseTransport | None = None):
+        self.base_url = base_url
+        self.geocoding_url = geocoding_url
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self.requests = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                transport=self._transport,
+                timeout=WEATHER_TIMEOUT,
+                limits=httpx.Limits(max_connections=WEATHER_MAX_CONNECTIONS,
+                                    max_keepalive_connections=WEATHER_MAX_CONNECTIONS),
+                headers={"Accept": "application/json"},
+            )
+        return self._client
+
+    def configure(self, base_url: str | None = None, geocoding_url: str | None = None,
+                  transport: httpx.AsyncBaseTransport | None = None) -> None:
+        """Point the client elsewhere (e.g. a fake upstream); takes effect on the next request."""
+        self.base_url = base_url or self.base_url
+        self.geocoding_url = geocoding_url or self.geocoding_url
+        self._transport = transport
+        self._client = None
+
+    async def forecast(self, forecast_type: str, lat: float, lon: float,
+                       temperature_unit: str = "celsius", wind_speed_unit: str = "kmh") -> dict:
+        params = {"latitude": lat, "longitude": lon, "temperature_unit": temperature_unit,
+                  "wind_speed_unit": wind_speed_unit, "timezone": "auto", **FORECAST_PARAMS[forecast_type]}
+        return await self._get("/forecast", params)
+
+    async def search(self, name: str, count: int = 10, language: str = "en") -> list[dict]:
+        """Places matching `name`, best match first."""
+        params = {"name": name, "count": count, "language": language, "format": "json"}
+        data = await self._get(f"{self.geocoding_url}/search", params)
+        return data.get("results") or []
+
+    async def _get(self, url: str, params: dict) -> dict:
+        self.requests += 1
+        try:
+            response = await self._get_client().get(url, params=params)
+        except httpx.HTTPError as e:
+            raise UpstreamError(f"Weather upstream unreachable: {e.__class__.__name__}") from e
+        if response.status_code != 200:
+            raise UpstreamError(f"Weather upstream returned HTTP {response.status_code}")
+        data = response.json()
+        if data.get("error"):
+            raise UpstreamError(data.get("reason") or "Weather upstream error")
+        return data
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+open_meteo_client = OpenMeteoClient()
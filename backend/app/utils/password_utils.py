@@ -2,6 +2,12 @@
 Secure password handling utilities
 """
 
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from decouple import config
 from passlib.context import CryptContext
 
 
@@ -12,6 +18,13 @@ pwd_context = CryptContext(
     bcrypt__rounds=12,  # Work factor - balance security vs performance
 )
 
+# bcrypt releases the GIL, so a small thread pool gives real parallelism
+PASSWORD_HASH_WORKERS = int(config("PASSWORD_HASH_WORKERS", default=min(4, os.cpu_count() or 1)))
+# How many requests may wait for a free worker before we start rejecting
+PASSWORD_HASH_MAX_PENDING = int(config("PASSWORD_HASH_MAX_PENDING", default=32))
+# Seconds a rejected client is told to wait (Retry-After header)
+PASSWORD_HASH_RETRY_AFTER = int(config("PASSWORD_HASH_RETRY_AFTER", default=1))
+
 
 def hash_password(password: str) -> str:
     """Hash a password with bcrypt and automatic salt generation."""
@@ -24,3 +37,91 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return pwd_context.verify(plain_password, hashed_password)
     except Exception:
         return False
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full and the caller should retry later."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    At most `max_workers` hashes run at once and at most `max_pending` more
+    may wait for a worker; anything beyond that raises PasswordHasherBusy.
+    """
+
+    def __init__(self, max_workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING,
+                 retry_after: int = PASSWORD_HASH_RETRY_AFTER):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self.retry_after = retry_after
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0  # running + waiting for a worker
+        self._peak = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # created lazily so importing this module does not spawn threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="password-hash")
+            return self._executor
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    async def _run(self, fn, *args):
+        executor = self._get_executor()
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_pending:
+                self._rejected += 1
+                raise PasswordHasherBusy(self.retry_after)
+            self._pending += 1
+            self._peak = max(self._peak, self._pending)
+        # the slot is released when the work itself finishes, even if the caller gave up
+        future = executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash_password(self, password: str) -> str:
+        """Hash a password on the worker pool."""
+        return await self._run(hash_password, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash on the worker pool."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        """Return a snapshot of the pool's queue depth and counters."""
+        with self._lock:
+            pending = self._pending
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": min(pending, self.max_workers),
+                "queued": max(0, pending - self.max_workers),
+                "peak": self._peak,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (waits for running hashes)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Shared instance used by the auth endpoints
+password_hasher = PasswordHasher()
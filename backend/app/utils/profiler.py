@@ -0,0 +1,287 @@
+# Sampling profiler for single requests or a whole worker, saved as flamegraph-ready collapsed stacks
+import asyncio.runners
+import hmac
+import os
+import queue
+import random
+import re
+import selectors
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from decouple import config
+from starlette.datastructures import MutableHeaders
+
+from app.utils.request_metrics import UNMATCHED_ROUTE
+
+
+# Shared secret for the profiler: sent as X-Profile-Token, it profiles that request and unlocks
+# /debug/profile. Empty (the default): no profiling on demand and /debug/profile answers 404.
+PROFILER_TOKEN = str(config("PROFILER_TOKEN", default=""))
+# Fraction of all requests profiled without asking (0.01 = 1 in 100); works without PROFILER_TOKEN
+PROFILE_SAMPLE_RATE = float(config("PROFILE_SAMPLE_RATE", default=0))
+# Where profiles are saved, shared by the worker processes of one server
+PROFILE_DIR = str(config("PROFILE_DIR", default=os.path.join(tempfile.gettempdir(), "weatherstation-profiles")))
+# Seconds between two stack samples
+PROFILE_INTERVAL = float(config("PROFILE_INTERVAL", default=0.002))
+# Upper bound of a worker profile's duration, whatever /debug/profile/start asked for
+PROFILE_MAX_SECONDS = float(config("PROFILE_MAX_SECONDS", default=300))
+# Saved profiles kept in PROFILE_DIR; the oldest are deleted once there are about 10% more
+PROFILE_KEEP = int(config("PROFILE_KEEP", default=500))
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+# Requests under this path (the profiler's own endpoints) are never profiled
+DEBUG_PROFILE_PATH = "/debug/profile"
+
+# A thread whose innermost Python frame is in one of these modules is blocked (on a lock, a queue,
+# the event loop's selector), not running: it is left out of the samples, as py-spy does by default
+_IDLE_FILES = frozenset(module.__file__ for module in (threading, queue, selectors, asyncio.runners))
+# Longest first, so frames are labelled relative to the most specific sys.path entry
+_PATH_PREFIXES = sorted({os.path.join(path, "") for path in sys.path if path}, key=len, reverse=True)
+_labels: dict = {}
+
+_PROFILE_NAME = re.compile(r"^[\w.-]+\.collapsed$")
+
+
+def _label(code) -> str:
+    """`function (module/path.py:line)` of a code object, cached per code object."""
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for prefix in _PATH_PREFIXES:
+            if filename.startswith(prefix):
+                filename = filename[len(prefix):]
+                break
+        label = _labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+    return label
+
+
+class StackSampler:
+    """Background thread recording the Python stack of every busy thread of the worker each
+    `interval` seconds, until stop() or `seconds` have passed, then saving them to `path` as
+    collapsed stacks: one `root;thread;outer;...;inner count` line per distinct stack, the input
+    of flamegraph.pl, inferno and speedscope. `root` (e.g. the request's route) may be set
+    until stop() is called; `on_saved` runs after the file is written.
+    """
+
+    def __init__(self, path: Path | None, interval: float, seconds: float, root: str | None = None,
+                 on_saved=None):
+        self.path = path
+        self.interval = interval
+        self.seconds = seconds
+        self.root = root
+        self.on_saved = on_saved
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.started = time.time()
+        self.stopped: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = False) -> None:
+        self._stop.set()
+        if wait:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        """The samples in the collapsed format, most frequent stacks first (once stopped)."""
+        prefix = f"{self.root};" if self.root else ""
+        return "".join(f"{prefix}{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names: dict[int, str] = {}
+        deadline = time.monotonic() + self.seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_filename in _IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_label(frame.f_code))
+                    frame = frame.f_back
+                name = names.get(ident)
+                if name is None:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                    name = names.get(ident, str(ident))
+                stack.append(name)
+                stack.reverse()
+                self.counts[";".join(stack)] += 1
+            self.samples += 1
+        self.stopped = time.time()
+        if self.path is not None:
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(self.collapsed())
+        os.replace(tmp, self.path)
+        if self.on_saved is not None:
+            self.on_saved()
+
+
+class Profiler:
+    """Profiling settings of this worker, its worker-wide profile and the saved profiles;
+    configure() changes the settings at runtime.
+    """
+
+    def __init__(self, token: str = PROFILER_TOKEN, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 directory: str = PROFILE_DIR, interval: float = PROFILE_INTERVAL,
+                 max_seconds: float = PROFILE_MAX_SECONDS, keep: int = PROFILE_KEEP):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.directory = Path(directory)
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.keep = keep
+        self.worker: StackSampler | None = None
+        self._lock = threading.Lock()
+        self._saved = 0
+
+    def configure(self, token: str | None = None, sample_rate: float | None = None, directory: str | None = None,
+                  interval: float | None = None, max_seconds: float | None = None, keep: int | None = None) -> None:
+        self.token = self.token if token is None else token
+        self.sample_rate = self.sample_rate if sample_rate is None else sample_rate
+        self.directory = self.directory if directory is None else Path(directory)
+        self.interval = self.interval if interval is None else interval
+        self.max_seconds = self.max_seconds if max_seconds is None else max_seconds
+        self.keep = self.keep if keep is None else keep
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def authorized(self, presented: str | None) -> bool:
+        return bool(self.token) and presented is not None and hmac.compare_digest(presented.encode(),
+                                                                                   self.token.encode())
+
+    def _path(self, kind: str) -> Path:
+        return self.directory / f"{kind}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}.collapsed"
+
+    def profile_request(self) -> StackSampler:
+        return StackSampler(self._path("request"), self.interval, self.max_seconds,
+                            on_saved=self._on_saved).start()
+
+    def start_worker(self, seconds: float) -> StackSampler | None:
+        """Start profiling the whole worker for `seconds` (capped at max_seconds); None when
+        a worker profile is already running.
+        """
+        with self._lock:
+            if self.worker is not None and self.worker.running:
+                return None
+            self.worker = StackSampler(self._path("worker"), self.interval, min(seconds, self.max_seconds),
+                                       on_saved=self._on_saved).start()
+            return self.worker
+
+    def stop_worker(self) -> StackSampler | None:
+        """Stop the worker profile (if still running) and return it once saved; None if there was none."""
+        worker = self.worker
+        if worker is not None:
+            worker.stop(wait=True)
+        return worker
+
+    def profiles(self) -> list[dict]:
+        """Saved profiles of every worker, newest first."""
+        try:
+            paths = [path for path in self.directory.iterdir() if _PROFILE_NAME.match(path.name)]
+        except FileNotFoundError:
+            return []
+        found = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # pruned meanwhile
+                continue
+            found.append({"name": path.name, "bytes": stat.st_size, "modified": stat.st_mtime})
+        found.sort(key=lambda profile: profile["modified"], reverse=True)
+        return found
+
+    def read(self, name: str) -> str | None:
+        if not _PROFILE_NAME.match(name):
+            return None
+        try:
+            return (self.directory / name).read_text()
+        except FileNotFoundError:
+            return None
+
+    def merged_requests(self, root: str | None = None) -> str:
+        """All saved request profiles added up, optionally only those of `root` (e.g. "GET /api/events")."""
+        counts: Counter = Counter()
+        prefix = None if root is None else root + ";"
+        for profile in self.profiles():
+            if not profile["name"].startswith("request-"):
+                continue
+            for line in (self.read(profile["name"]) or "").splitlines():
+                stack, _, count = line.rpartition(" ")
+                if stack and (prefix is None or stack.startswith(prefix)):
+                    counts[stack] += int(count)
+        return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+    def _on_saved(self) -> None:
+        # listing the directory costs milliseconds with hundreds of profiles: prune every keep/10 saves
+        self._saved += 1
+        if self._saved % max(1, self.keep // 10) == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        for profile in self.profiles()[self.keep:]:
+            try:
+                (self.directory / profile["name"]).unlink()
+            except FileNotFoundError:
+                pass
+
+
+profiler = Profiler()
+
+
+class ProfilerMiddleware:
+    """Profiles requests carrying a valid X-Profile-Token (answered with an X-Profile-Id header
+    naming the saved profile) and a random PROFILE_SAMPLE_RATE fraction of all others.
+    The sampler sees every busy thread of the worker, so requests running concurrently in the
+    same worker show up in each other's profiles; each stack is rooted at the request's route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        settings = profiler
+        if (scope["type"] != "http" or not (settings.token or settings.sample_rate)
+                or scope["path"].startswith(DEBUG_PROFILE_PATH)):
+            await self.app(scope, receive, send)
+            return
+
+        presented = next((value.decode("latin-1") for key, value in scope["headers"]
+                          if key == PROFILE_TOKEN_HEADER), None)
+        requested = settings.authorized(presented)
+        if not requested and not (settings.sample_rate and random.random() < settings.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = settings.profile_request()
+
+        async def send_wrapper(message):
+            if requested and message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", sampler.path.name)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            sampler.root = f"{scope['method']} {route.path if route is not None else UNMATCHED_ROUTE}"
+            sampler.stop()
@@ -0,0 +1,60 @@
+# ASGI middleware recording per-route request counts, status codes, latency and database use
+import time
+
+from app.db.query_metrics import QueryStats, current_query_stats
+from app.utils.metrics import metrics_registry
+
+# Upper bounds of the statements-per-request buckets
+QUERIES_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+http_requests = metrics_registry.counter("http_requests_total", "HTTP requests answered",
+                                         ("method", "route", "status"))
+http_request_duration = metrics_registry.histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last byte of its response",
+    ("method", "route"))
+http_request_db_queries = metrics_registry.histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("method", "route"),
+    QUERIES_PER_REQUEST_BUCKETS)
+http_request_db_seconds = metrics_registry.counter(
+    "http_request_db_seconds_total", "Time requests spent executing SQL statements", ("method", "route"))
+
+# route label of requests no route matched (404s, CORS preflights), so scans can't create new series
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """Times every HTTP request through the end of its response body (streamed exports
+    included) and labels it with the route's path template, e.g. /api/events/{event_id}.
+    Requests failing with an exception are counted as 500.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else UNMATCHED_ROUTE)
+            http_requests.inc(labels + (str(status_code),))
+            http_request_duration.observe(labels, time.perf_counter() - started)
+            http_request_db_queries.observe(labels, stats.queries)
+            if stats.seconds:
+                http_request_db_seconds.inc(labels, stats.seconds)
@@ -0,0 +1,222 @@
+# Per-request phase timings, sent as a Server-Timing header and optionally logged
+import asyncio
+import functools
+import logging
+import sys
+import time
+from contextvars import ContextVar
+
+import orjson
+from decouple import config
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+
+from app.db.query_metrics import current_query_stats
+
+
+# Add a Server-Timing header (auth, DB, serialization... per request) to every response
+SERVER_TIMING = config("SERVER_TIMING", default=False, cast=bool)
+# Log one JSON line with the same phases per request (logger "app.timing", to stderr)
+SERVER_TIMING_LOG = config("SERVER_TIMING_LOG", default=False, cast=bool)
+
+logger = logging.getLogger("app.timing")
+
+
+class Timings:
+    """Phase durations of one request, in seconds; a phase entered more than once adds up."""
+    __slots__ = ("started", "phases", "endpoint_started", "endpoint_ended")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.endpoint_started: float | None = None
+        self.endpoint_ended: float | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self, total: float, queries: int = 0, db_seconds: float = 0.0) -> str:
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases.items()]
+        if queries:
+            entries.append(f'db;dur={db_seconds * 1000:.3f};desc="{queries} queries"')
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+# Set by ServerTimingMiddleware for the duration of a request when timing is on; threadpool
+# routes and AsyncSession greenlets run in a copy of the request's context and share it
+current_timings: ContextVar[Timings | None] = ContextVar("current_timings", default=None)
+
+
+class _Span:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: Timings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """`with span("query"): ...` adds the block's duration to the current request's `name` phase.
+    Outside a timed request (timing off, background tasks) it is a shared no-op.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return _NO_SPAN
+    return _Span(timings, name)
+
+
+def _timed_endpoint(endpoint):
+    """Wrap a route function to note when it starts and ends (sync functions stay sync)."""
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            timings = current_timings.get()
+            if timings is None:
+                return await endpoint(*args, **kwargs)
+            timings.endpoint_started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings.endpoint_ended = time.perf_counter()
+                timings.add("endpoint", timings.endpoint_ended - timings.endpoint_started)
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            timings = current_timings.get()
+            if timings is None:
+                return endpoint(*args, **kwargs)
+            timings.endpoint_started = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                timings.endpoint_ended = time.perf_counter()
+                timings.add("endpoint", timings.endpoint_ended - timings.endpoint_started)
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """APIRoute splitting a request's handling into "parse" (reading the body, validating
+    parameters, solving dependencies), "endpoint" (the route function) and "serialize"
+    (response_model validation and rendering the body).
+    Use with APIRouter(route_class=TimedRoute).
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            timings = current_timings.get()
+            if timings is None:
+                return await handler(request)
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                ended = time.perf_counter()
+                if timings.endpoint_started is None:
+                    timings.add("parse", ended - started)  # rejected before the endpoint ran
+                else:
+                    timings.add("parse", timings.endpoint_started - started)
+                    timings.add("serialize", ended - (timings.endpoint_ended or ended))
+
+        return timed_handler
+
+
+class ServerTimingSettings:
+    """Whether requests are timed for the header and/or the log; configure() switches it at runtime."""
+
+    def __init__(self, enabled: bool = SERVER_TIMING, log: bool = SERVER_TIMING_LOG):
+        self.enabled = False
+        self.log = False
+        self.configure(enabled, log)
+
+    def configure(self, enabled: bool | None = None, log: bool | None = None) -> None:
+        self.enabled = self.enabled if enabled is None else enabled
+        self.log = self.log if log is None else log
+        if self.log and not logger.handlers:
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+
+server_timing = ServerTimingSettings()
+
+
+class ServerTimingMiddleware:
+    """Collects the spans of each request and sends them as Server-Timing, e.g.
+    `token;dur=0.021, user;dur=0.004, query;dur=1.203, rows;dur=0.310, endpoint;dur=1.601,
+    parse;dur=0.087, serialize;dur=0.412, db;dur=1.190;desc="2 queries", total;dur=2.310`.
+    The DB entry is the statement time recorded by the metrics middleware (when it runs
+    around this one). `total` ends when the response starts, as the header has to go out then.
+    Without SERVER_TIMING and SERVER_TIMING_LOG it only checks two flags per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        settings = server_timing
+        if scope["type"] != "http" or not (settings.enabled or settings.log):
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        token = current_timings.set(timings)
+        result = {"status": 500, "total": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                result["status"] = message["status"]
+                result["total"] = time.perf_counter() - timings.started
+                if settings.enabled:
+                    stats = current_query_stats.get()
+                    MutableHeaders(scope=message).append("Server-Timing", timings.header(
+                        result["total"], stats.queries if stats else 0, stats.seconds if stats else 0.0))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timings.reset(token)
+            if settings.log:
+                self._log(scope, timings, result)
+
+    @staticmethod
+    def _log(scope, timings: Timings, result: dict) -> None:
+        route = scope.get("route")
+        stats = current_query_stats.get()
+        total = result["total"] if result["total"] is not None else time.perf_counter() - timings.started
+        line = {"method": scope["method"], "path": scope["path"], "route": route.path if route else None,
+                "status": result["status"], "total_ms": round(total * 1000, 3),
+                "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in timings.phases.items()}}
+        if stats is not None:
+            line["db_queries"] = stats.queries
+            line["db_ms"] = round(stats.seconds * 1000, 3)
+        logger.info(orjson.dumps(line).decode())
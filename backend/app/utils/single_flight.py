@@ -0,0 +1,46 @@
+# Single-flight: concurrent calls for the same key share one in-flight coroutine
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """At most one call per key runs at a time; everyone asking for that key meanwhile
+    awaits the same task and gets its result or its exception.
+
+    The call runs as its own task, so a caller that times out or is cancelled stops
+    waiting without cancelling the call for the others (its result still lands in
+    whatever cache `fn` fills).
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def pending(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable]) -> asyncio.Task:
+        """The in-flight task for `key`, starting `fn()` if there is none."""
+        task = self._calls.get(key)
+        if task is not None:
+            self.shared += 1
+            return task
+        self.calls += 1
+        task = asyncio.get_running_loop().create_task(fn())
+        self._calls[key] = task
+        task.add_done_callback(lambda t: self._finished(key, t))
+        return task
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, a background call may have nobody awaiting it
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable], timeout: float | None = None):
+        """Result of the in-flight call for `key`, waiting at most `timeout` seconds
+        (asyncio.TimeoutError after that, the call itself keeps running).
+        """
+        task = self.start(key, fn)
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
@@ -1,9 +1,16 @@
 # Some helper functions for dealing with JWT tokens
 
 from app.db.models.users_ORM import UserORM
+from app.utils.user_cache import CachedUser, user_cache
+from app.utils.server_timing import span
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from decouple import config
 
@@ -11,6 +18,67 @@ from decouple import config
 SECRET_KEY = str(config("JWT_SECRET_KEY", default="not very secret"))
 ALGORITHM = str(config("JWT_ALGORITHM", default="HS256"))
 DAYS_LOGGED_IN = float(config("DAYS_LOGGED_IN", default=1))
+VERIFIED_TOKEN_CACHE_SIZE = int(config("VERIFIED_TOKEN_CACHE_SIZE", default=10000))  # 0 disables the cache
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of already-verified token payloads, each kept until its `exp`.
+
+    Keys are a digest of the signing key, algorithm and raw token, so raw tokens
+    are never stored and rotating the secret makes every entry miss. Revocation
+    is unaffected: token_version is still compared in validate_user_from_token.
+    """
+
+    def __init__(self, max_size: int = VERIFIED_TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(f"{SECRET_KEY}\0{ALGORITHM}\0{token}".encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> dict | None:
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, exp = entry
+                if exp > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(payload)  # callers may mutate their copy
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, payload: dict) -> None:
+        exp = payload.get("exp")
+        # tokens without an expiry are never cached, we could not bound their lifetime
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), float(exp))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size,
+                    "hits": self.hits, "misses": self.misses}
+
+
+verified_token_cache = VerifiedTokenCache()
 
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(days=DAYS_LOGGED_IN)):
@@ -25,12 +93,23 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(days=DA
 
 def validate_access_token(token: str) -> dict:
     """Validate a JWT access token and return the payload if valid."""
+    with span("token"):
+        return _validate_access_token(token)
+
+
+def _validate_access_token(token: str) -> dict:
     try:
         # Check if token has the basic JWT structure
         if not token or token.count('.') != 2:
             raise ValueError("Invalid token format")
-        
+
+        # the same bearer token is presented on every request, skip re-verifying it
+        payload = verified_token_cache.get(token)
+        if payload is not None:
+            return payload
+
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        verified_token_cache.put(token, payload)
         return payload
     except jwt.ExpiredSignatureError:
         raise ValueError("Token has expired")
@@ -40,22 +119,61 @@ def validate_access_token(token: str) -> dict:
         raise ValueError("Token validation failed")
 
 
-def validate_user_from_token(token: str, db: Session) -> UserORM | None:
-    """Validate a JWT access token and return the associated user if valid."""
+def _token_identity(token: str) -> tuple[str, int] | None:
+    """(email, token_version) claimed by a valid token, or None."""
     try:
         token_data: dict = validate_access_token(token)
-        email = token_data.get("email") if token_data else None
-        token_version = token_data.get("token_version") if token_data else None
-        user = db.execute(select(UserORM).where(UserORM.email == email)).scalar_one_or_none()
-        if user is None:
-            return None
-        # Ensure token_version matches user's current token_version
-        if token_version is None or getattr(user, "token_version", None) != token_version:
-            return None
-        return user
     except ValueError:
         # If token validation fails, return None
         return None
+    email = token_data.get("email") if token_data else None
+    token_version = token_data.get("token_version") if token_data else None
+    if email is None or token_version is None:
+        return None
+    return email, token_version
+
+
+def _check_token_version(user: UserORM | None, token_version: int, generation: int) -> CachedUser | None:
+    if user is None:
+        return None
+    snapshot = CachedUser.from_orm(user)
+    user_cache.put(snapshot, generation)
+    # Ensure token_version matches user's current token_version
+    if snapshot.token_version != token_version:
+        return None
+    return snapshot
+
+
+def validate_user_from_token(token: str, db: Session) -> CachedUser | None:
+    """Validate a JWT access token and return a snapshot of the associated user if valid.
+    The user is served from the in-process cache when its token_version is known to match.
+    """
+    identity = _token_identity(token)
+    if identity is None:
+        return None
+    email, token_version = identity
+    with span("user"):
+        cached = user_cache.get(email, token_version)
+        if cached is not None:
+            return cached
+        generation = user_cache.generation()
+        user = db.execute(select(UserORM).where(UserORM.email == email)).scalar_one_or_none()
+        return _check_token_version(user, token_version, generation)
+
+
+async def validate_user_from_token_async(token: str, db: AsyncSession) -> CachedUser | None:
+    """validate_user_from_token for an AsyncSession."""
+    identity = _token_identity(token)
+    if identity is None:
+        return None
+    email, token_version = identity
+    with span("user"):
+        cached = user_cache.get(email, token_version)
+        if cached is not None:
+            return cached
+        generation = user_cache.generation()
+        user = (await db.execute(select(UserORM).where(UserORM.email == email))).scalar_one_or_none()
+        return _check_token_version(user, token_version, generation)
 
 
 def extract_bearer_token(authorization: str | None) -> str | None:
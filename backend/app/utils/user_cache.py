@@ -0,0 +1,223 @@
+# In-process cache of authenticated users so token validation can skip the users query
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from decouple import config
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.db.models.users_ORM import UserORM
+
+
+USER_CACHE_SIZE = int(config("USER_CACHE_SIZE", default=10000))  # 0 disables the cache
+USER_CACHE_TTL = float(config("USER_CACHE_TTL", default=60))  # seconds
+# SQLite file through which the workers on this host tell each other about logouts (by default in
+# backend/, wherever the process starts). Empty means process-local invalidation only, safe with a
+# single worker: with more the cache is turned off
+USER_CACHE_INVALIDATION_DB = str(config(
+    "USER_CACHE_INVALIDATION_DB", default=str(Path(__file__).resolve().parents[2] / "user_cache_invalidations.db")))
+USER_CACHE_POLL_INTERVAL = float(config("USER_CACHE_POLL_INTERVAL", default=1))
+# uvicorn's worker count, to tell whether process-local invalidation is enough
+WEB_CONCURRENCY = int(config("WEB_CONCURRENCY", default=1))
+
+
+@dataclass(frozen=True, slots=True)
+class CachedUser:
+    """Lightweight, session-independent snapshot of the user fields auth needs."""
+    email: str
+    first_name: str | None
+    last_name: str | None
+    token_version: int
+
+    @classmethod
+    def from_orm(cls, user: UserORM) -> "CachedUser":
+        return cls(email=user.email, first_name=user.first_name, last_name=user.last_name,
+                   token_version=user.token_version or 0)
+
+
+class InvalidationChannel:
+    """Broadcasts "this user changed" to every worker. The base class is process-local."""
+
+    def publish(self, email: str) -> None:
+        pass
+
+    def poll(self) -> list[str]:
+        """Return emails invalidated by other workers since the last poll."""
+        return []
+
+
+class SQLiteInvalidationChannel(InvalidationChannel):
+    """Invalidation log in a SQLite file shared by all workers on the host.
+
+    Each worker remembers the last sequence number it has seen and reads newer
+    rows at most once per poll_interval, so staleness across workers is bounded
+    by that interval while steady-state requests do no extra queries.
+    """
+
+    RETENTION_SECONDS = 3600
+
+    def __init__(self, path: str, poll_interval: float = USER_CACHE_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        # readers (every worker's poll) then never wait for a publishing writer
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_cache_invalidations ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        row = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM user_cache_invalidations").fetchone()
+        self._last_seq = row[0]
+        self._next_poll = 0.0
+
+    def publish(self, email: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT INTO user_cache_invalidations (email, created_at) VALUES (?, ?)", (email, now))
+            self._conn.execute("DELETE FROM user_cache_invalidations WHERE created_at < ?",
+                               (now - self.RETENTION_SECONDS,))
+
+    def poll(self) -> list[str]:
+        now = time.monotonic()
+        if now < self._next_poll:
+            return []
+        with self._lock:
+            self._next_poll = now + self.poll_interval
+            rows = self._conn.execute(
+                "SELECT seq, email FROM user_cache_invalidations WHERE seq > ? ORDER BY seq", (self._last_seq,)
+            ).fetchall()
+            if rows:
+                self._last_seq = rows[-1][0]
+        return [email for _, email in rows]
+
+
+class UserCache:
+    """TTL + LRU cache of CachedUser snapshots.
+
+    Entries are looked up by email and only count as a hit when the cached
+    token_version equals the one in the token, so a token issued after a
+    logout elsewhere simply misses and reloads the user.
+    """
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL,
+                 channel: InvalidationChannel | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.channel = channel or InvalidationChannel()
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[CachedUser, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._generation = 0  # bumped by every invalidation
+
+    def _drain_channel(self) -> None:
+        for email in self.channel.poll():
+            self._drop(email)
+
+    def _drop(self, email: str) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(email, None) is not None:
+                self.invalidations += 1
+
+    def get(self, email: str, token_version: int) -> CachedUser | None:
+        """Return the cached user if present, fresh and at the given token_version."""
+        if self.max_size <= 0:
+            return None
+        self._drain_channel()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None:
+                user, expires_at = entry
+                if expires_at > now and user.token_version == token_version:
+                    self._entries.move_to_end(email)
+                    self.hits += 1
+                    return user
+                if expires_at <= now:
+                    del self._entries[email]
+            self.misses += 1
+            return None
+
+    def generation(self) -> int:
+        """Take before loading a user from the DB and hand back to put()."""
+        return self._generation
+
+    def put(self, user: CachedUser, generation: int | None = None) -> None:
+        """Cache a user loaded from the DB.
+        If an invalidation happened since `generation` was taken the snapshot may
+        predate it (e.g. a concurrent logout), so it is not cached.
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[user.email] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, email: str) -> None:
+        """Drop a user locally and tell the other workers to do the same."""
+        self._drop(email)
+        self.channel.publish(email)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def _build_cache() -> UserCache:
+    if USER_CACHE_INVALIDATION_DB:
+        return UserCache(channel=SQLiteInvalidationChannel(USER_CACHE_INVALIDATION_DB))
+    # a logout would only reach its own worker and the others would accept the revoked
+    # token until the entry expires, so without a shared channel several workers don't cache
+    return UserCache(max_size=USER_CACHE_SIZE if WEB_CONCURRENCY <= 1 else 0)
+
+
+user_cache = _build_cache()
+
+
+# Session.info key of the emails of users changed in the session's current transaction
+_CHANGED_USERS = "user_cache.changed_users"
+
+
+@event.listens_for(UserORM, "after_update")
+@event.listens_for(UserORM, "after_delete")
+def _collect_changed_user(mapper, connection, target) -> None:
+    # any ORM change to a user (token_version bump, rename, delete) drops its snapshot, but only
+    # once committed: dropped at flush, a concurrent miss could reload and cache the old row
+    emails = object_session(target).info.setdefault(_CHANGED_USERS, set())
+    emails.add(target.email)
+    emails.update(inspect(target).attrs.email.history.deleted)  # the old email of a rename
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session) -> None:
+    for email in session.info.pop(_CHANGED_USERS, ()):
+        user_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
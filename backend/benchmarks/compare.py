@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark reports (python -m benchmarks.run) and fail on regressions.
+Usage (from backend/):
+  python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json --threshold 0.15
+
+Behavior:
+- Prints, per scenario and per route, requests/sec, p50/p95/p99 latency and SQL statements per
+  request of both runs and the relative change.
+- Exits with status 1 if any of them is more than --threshold worse in the second report.
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.report import compare
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare two benchmark reports")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown (0.15 = 15%%)")
+    args = p.parse_args()
+
+    regressions = compare(json.loads(Path(args.baseline).read_text()), json.loads(Path(args.current).read_text()),
+                          args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
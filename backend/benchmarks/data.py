@@ -0,0 +1,120 @@
+# Deterministic users and events for the benchmark suite: the same seed gives the same rows
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+
+from app.db.models import EventORM, UserORM
+from app.utils.password_utils import hash_password
+
+# "Now" of the generated calendars, a Monday; fixed so runs on different days see the same data
+ANCHOR = datetime(2025, 6, 2)
+# Every benchmark user logs in with this password
+PASSWORD = "benchmark-password"
+
+FIRST_NAMES = ("Ada", "Ben", "Chloe", "Daniel", "Emma", "Farid", "Greta", "Hugo", "Ines", "Jonas",
+               "Karin", "Luca", "Mia", "Noah", "Olga", "Pavel", "Rosa", "Sami", "Tara", "Yusuf")
+LAST_NAMES = ("Berg", "Costa", "Dubois", "Eriksen", "Fischer", "Garcia", "Horvat", "Ivanova", "Jensen",
+              "Kowalski", "Lind", "Moreau", "Novak", "Rossi", "Schmidt", "Virtanen")
+WORK_TITLES = ("Standup", "Sprint planning", "1:1", "Design review", "Customer call", "Retro",
+               "Interview", "Budget meeting", "Team lunch", "Release")
+PRIVATE_TITLES = ("Dentist", "Football practice", "Yoga", "Dinner with friends", "Piano lesson",
+                  "Parents' evening", "Haircut", "Cinema", "Birthday party", "Hiking")
+DESCRIPTIONS = ("Bring the slides", "Room 4.12", "Call in if late", "Don't forget the umbrella",
+                "Meet at the entrance", "Book a table first")
+# Where located events take place (latitude, longitude)
+CITIES = ((52.52, 13.405), (48.137, 11.575), (51.507, -0.128), (48.857, 2.352), (40.416, -3.704),
+          (41.902, 12.496), (59.329, 18.069), (52.370, 4.895), (50.075, 14.438), (47.498, 19.040))
+
+
+@dataclass
+class Dataset:
+    """Generated users and events, in insertion order."""
+    seed: int
+    users: list[dict]
+    events: list[dict]
+    # user email -> ids of that user's events, once seeded
+    event_ids: dict[str, list[int]] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        return {"seed": self.seed, "users": len(self.users), "events": len(self.events),
+                "anchor": ANCHOR.isoformat()}
+
+
+def _time_of_day(rng: random.Random, day: datetime, work: bool) -> datetime:
+    """Work events on weekdays between 8:00 and 17:45, private ones in the evening or at weekends,
+    all on the quarter hour."""
+    if work:
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        hour = rng.choices(range(8, 18), weights=(4, 9, 9, 8, 5, 6, 8, 8, 6, 3))[0]
+    elif day.weekday() >= 5:
+        hour = rng.randint(9, 20)
+    else:
+        hour = rng.randint(17, 21)
+    return day.replace(hour=hour, minute=rng.choice((0, 15, 30, 45)))
+
+
+def _event(rng: random.Random, email: str, date_time: datetime, work: bool, title: str | None = None) -> dict:
+    located = rng.random() < 0.3
+    latitude, longitude = rng.choice(CITIES) if located else (None, None)
+    return {"title": title or rng.choice(WORK_TITLES if work else PRIVATE_TITLES),
+            "description": rng.choice(DESCRIPTIONS) if rng.random() < 0.4 else None,
+            "date_time": date_time, "user_email": email, "latitude": latitude, "longitude": longitude}
+
+
+def _user_events(rng: random.Random, email: str, count: int) -> list[dict]:
+    events = []
+    while len(events) < count:
+        kind = rng.random()
+        work = rng.random() < 0.65
+        if kind < 0.25:
+            # a weekly series, from a few weeks back to a few months ahead
+            first = ANCHOR + timedelta(weeks=-rng.randint(0, 8), days=rng.randint(0, 6))
+            start = _time_of_day(rng, first, work)
+            title = rng.choice(WORK_TITLES if work else PRIVATE_TITLES)
+            for week in range(rng.randint(4, 20)):
+                events.append(_event(rng, email, start + timedelta(weeks=week), work, title))
+        elif kind < 0.6:
+            # past one-off events, fewer the further back
+            day = ANCHOR - timedelta(days=math.ceil(rng.expovariate(1 / 45)))
+            events.append(_event(rng, email, _time_of_day(rng, day, work), work))
+        else:
+            # upcoming one-off events, mostly within the next few weeks
+            day = ANCHOR + timedelta(days=int(rng.expovariate(1 / 21)))
+            events.append(_event(rng, email, _time_of_day(rng, day, work), work))
+    return events[:count]
+
+
+def generate(seed: int = 42, users: int = 200, events_per_user: int = 100) -> Dataset:
+    """`users` users with about `events_per_user` events each on average: a few heavy calendars
+    and many light ones (log-normal counts)."""
+    rng = random.Random(seed)
+    # mean of a log-normal is exp(mu + sigma^2 / 2)
+    sigma = 0.8
+    mu = math.log(max(events_per_user, 1)) - sigma ** 2 / 2
+    user_rows, event_rows = [], []
+    for i in range(users):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{first.lower()}.{last.lower()}.{i}@bench.example.com"
+        user_rows.append({"email": email, "first_name": first, "last_name": last})
+        count = max(1, round(rng.lognormvariate(mu, sigma))) if events_per_user else 0
+        event_rows.extend(_user_events(rng, email, count))
+    return Dataset(seed, user_rows, event_rows)
+
+
+def seed_database(engine: Engine, dataset: Dataset, batch_size: int = 10000) -> None:
+    """Insert the dataset into an empty database through `engine` and fill dataset.event_ids."""
+    # one bcrypt hash for everybody: hashing each user's password would take minutes
+    password = hash_password(PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(insert(UserORM), [{**user, "password": password, "token_version": 0}
+                                       for user in dataset.users])
+        for start in range(0, len(dataset.events), batch_size):
+            conn.execute(insert(EventORM), dataset.events[start:start + batch_size])
+        dataset.event_ids = {user["email"]: [] for user in dataset.users}
+        for event_id, email in conn.execute(select(EventORM.id, EventORM.user_email).order_by(EventORM.id)):
+            dataset.event_ids[email].append(event_id)
@@ -0,0 +1,119 @@
+# Benchmark results as JSON (one file per run) and their comparison with a baseline run
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from benchmarks.scenarios import Recorder
+
+# (report key, True if higher is better) of the numbers compared between runs
+COMPARED = (("rps", True), ("p50", False), ("p95", False), ("p99", False), ("db_queries_per_request", False))
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def latency_ms(samples: list[float]) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    return {"p50": round(percentile(samples, 50) * 1000, 3), "p95": round(percentile(samples, 95) * 1000, 3),
+            "p99": round(percentile(samples, 99) * 1000, 3),
+            "mean": round(sum(samples) / len(samples) * 1000, 3), "max": round(max(samples) * 1000, 3)}
+
+
+def _db_queries(before: dict, after: dict, route: str) -> tuple[int, float]:
+    """(requests, SQL statements) of `route` ("GET /api/events") between two metrics snapshots,
+    from the request metrics middleware's per-route histogram."""
+    method, path = route.split(" ", 1)
+    key = ("http_request_db_queries", (method, path))
+    new, old = after.get(key), before.get(key)
+    if new is None:
+        return 0, 0
+    # bucket counts, then the sum
+    requests = sum(new[:-1]) - (sum(old[:-1]) if old else 0)
+    return requests, new[-1] - (old[-1] if old else 0)
+
+
+def scenario_report(recorder: "Recorder", seconds: float, before: dict, after: dict) -> dict:
+    routes, all_samples, statuses = {}, [], {}
+    total_queries = total_counted = 0
+    for route in sorted(recorder.latencies):
+        samples = recorder.latencies[route]
+        all_samples.extend(samples)
+        counted, queries = _db_queries(before, after, route)
+        total_queries += queries
+        total_counted += counted
+        routes[route] = {"requests": len(samples), **latency_ms(samples),
+                         "statuses": {str(code): n for code, n in sorted(recorder.statuses[route].items())},
+                         "db_queries_per_request": round(queries / counted, 3) if counted else None}
+        for code, n in recorder.statuses[route].items():
+            statuses[str(code)] = statuses.get(str(code), 0) + n
+    requests = len(all_samples)
+    return {"requests": requests, "seconds": round(seconds, 3), "rps": round(requests / seconds, 1) if seconds else None,
+            **latency_ms(all_samples), "statuses": dict(sorted(statuses.items())),
+            "server_errors": sum(n for code, n in statuses.items() if code.startswith("5")),
+            "failures": dict(recorder.failures),
+            "db_queries": int(total_queries),
+            "db_queries_per_request": round(total_queries / total_counted, 3) if total_counted else None,
+            "routes": routes}
+
+
+def git_revision() -> dict:
+    root = Path(__file__).resolve().parents[1]
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def run_metadata(**settings) -> dict:
+    return {**git_revision(), "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(), **settings}
+
+
+def print_summary(report: dict, out=sys.stdout) -> None:
+    print(f"{'scenario':<20} {'requests':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'queries/req':>11} {'5xx':>5}", file=out)
+    for name, result in report["scenarios"].items():
+        queries = result["db_queries_per_request"]
+        print(f"{name:<20} {result['requests']:>8} {result['rps'] or 0:>9.1f} {result['p50'] or 0:>9.2f} "
+              f"{result['p95'] or 0:>9.2f} {result['p99'] or 0:>9.2f} "
+              f"{queries if queries is not None else '-':>11} {result['server_errors']:>5}", file=out)
+
+
+def compare(baseline: dict, current: dict, threshold: float, out=sys.stdout) -> list[str]:
+    """Print how each scenario (and route) moved against the baseline; returns the regressions,
+    i.e. numbers more than `threshold` (0.1 = 10%) worse."""
+    regressions = []
+    print(f"baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')}", file=out)
+    for name, result in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            print(f"{name}: not in the baseline", file=out)
+            continue
+        entries = [(name, base, result)] + [(f"{name} {route}", base["routes"][route], numbers)
+                                            for route, numbers in result["routes"].items() if route in base["routes"]]
+        for label, old, new in entries:
+            changes = []
+            for key, higher_is_better in COMPARED:
+                if old.get(key) is None or new.get(key) is None or not old[key]:
+                    continue
+                change = (new[key] - old[key]) / old[key]
+                worse = -change if higher_is_better else change
+                flag = ""
+                if worse > threshold:
+                    flag = " REGRESSION"
+                    regressions.append(f"{label} {key}: {old[key]} -> {new[key]} ({change:+.1%})")
+                changes.append(f"{key} {old[key]} -> {new[key]} ({change:+.1%}){flag}")
+            print(f"{label}: " + ", ".join(changes), file=out)
+    return regressions
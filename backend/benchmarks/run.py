@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Load test of the whole API: throughput, latency percentiles and SQL statements per request for
+a few user scenarios, saved as JSON so runs on different commits can be compared.
+Usage (from backend/):
+  python -m benchmarks.run
+  python -m benchmarks.run --scenarios calendar_browsing,event_crud --concurrency 32 --steps 5000
+  python -m benchmarks.run --baseline benchmarks/results/<commit>.json --threshold 0.15
+
+Behavior:
+- Generates --users users and their events from --seed (benchmarks/data.py: the same seed gives
+  the same rows) into a fresh SQLite file, then imports the real app (app.main, with its engines,
+  middleware and DB_MODE=--db-mode) pointed at that file.
+- Drives the app in-process through httpx's ASGI transport with --concurrency virtual users per
+  scenario: token_validation, login_storm, calendar_browsing, event_crud (benchmarks/scenarios.py).
+  --warmup steps run first and are not counted.
+- Reports requests/sec, p50/p95/p99 latency, status codes and SQL statements per request (from
+  the request metrics middleware) per scenario and per route; writes them to --out (default
+  benchmarks/results/<commit>.json).
+- With --baseline, compares with an earlier report and exits with status 1 if a number got more
+  than --threshold worse (see also python -m benchmarks.compare).
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND))
+
+
+async def run_scenario(client, scenario, dataset, concurrency: int, steps: int, warmup: int, seed: int):
+    # imported here, after main() has pointed the app at the benchmark database
+    from app.utils.metrics import metrics_registry
+    from benchmarks.report import scenario_report
+    from benchmarks.scenarios import Recorder, VirtualUser
+
+    async def drive(recorder, count):
+        users = [VirtualUser(client, recorder, dataset, random.Random(f"{seed}-{scenario.name}-{i}"))
+                 for i in range(concurrency)]
+        remaining = count
+
+        async def worker(user):
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await scenario.step(user)
+
+        await asyncio.gather(*(worker(user) for user in users))
+
+    await drive(Recorder(), warmup)
+    recorder = Recorder()
+    before = metrics_registry.snapshot()
+    started = time.perf_counter()
+    await drive(recorder, steps)
+    seconds = time.perf_counter() - started
+    return scenario_report(recorder, seconds, before, metrics_registry.snapshot())
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load test the API and save the results as JSON")
+    p.add_argument("--scenarios", default="all", help="Comma-separated scenario names, or all")
+    p.add_argument("--users", type=int, default=200)
+    p.add_argument("--events-per-user", type=int, default=100, help="Average; counts are log-normal")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--concurrency", type=int, default=16, help="Virtual users per scenario")
+    p.add_argument("--steps", type=int, default=None, help="Steps per scenario (default: the scenario's own)")
+    p.add_argument("--warmup", type=int, default=50, help="Uncounted steps before each scenario")
+    p.add_argument("--db-mode", choices=("sync", "async"), default=os.environ.get("DB_MODE", "sync"))
+    p.add_argument("--out", default=None, help="Report path (default benchmarks/results/<commit>.json)")
+    p.add_argument("--baseline", default=None, help="Earlier report to compare with")
+    p.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown vs. the baseline (0.15 = 15%%)")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # decouple reads the environment first: the app's engines open this file
+        os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+        os.environ["DB_MODE"] = args.db_mode
+
+        import httpx
+        from app.db.session import engine
+        from app.main import app
+        from benchmarks.data import generate, seed_database
+        from benchmarks.report import compare, print_summary, run_metadata
+        from benchmarks.scenarios import SCENARIOS
+
+        names = list(SCENARIOS) if args.scenarios == "all" else args.scenarios.split(",")
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            p.error(f"unknown scenarios {unknown}, expected some of {list(SCENARIOS)}")
+
+        dataset = generate(args.seed, args.users, args.events_per_user)
+        seed_database(engine, dataset)
+
+        async def run_all():
+            results = {}
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                for name in SCENARIOS:
+                    if name in names:
+                        scenario = SCENARIOS[name]
+                        print(f"running {name}...", file=sys.stderr)
+                        results[name] = await run_scenario(client, scenario, dataset, args.concurrency,
+                                                           args.steps or scenario.steps, args.warmup, args.seed)
+            return results
+
+        report = {"meta": run_metadata(db_mode=args.db_mode, concurrency=args.concurrency, warmup=args.warmup,
+                                       dataset=dataset.summary()),
+                  "scenarios": asyncio.run(run_all())}
+        engine.dispose()
+
+    print_summary(report)
+    commit = report["meta"]["commit"]
+    out = Path(args.out) if args.out else (BACKEND / "benchmarks" / "results" /
+                                           f"{commit[:12] if commit else 'unknown'}{'-dirty' if report['meta']['dirty'] else ''}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"report written to {out}")
+
+    if args.baseline:
+        regressions = compare(json.loads(Path(args.baseline).read_text()), report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# What the benchmark's virtual users do: one step of a scenario is one user action (one or more requests)
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+import httpx
+
+from app.utils.token_utils import create_access_token
+from benchmarks.data import ANCHOR, PASSWORD, Dataset
+
+
+class Recorder:
+    """Latency (seconds) and status code of every request of a scenario, by route,
+    e.g. "GET /api/events/{event_id}"."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+        self.failures: Counter = Counter()
+
+
+class VirtualUser:
+    """One concurrent client: a benchmark user with their own token, random stream and created events."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, dataset: Dataset, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.dataset = dataset
+        self.rng = rng
+        self.user = rng.choice(dataset.users)
+        self.token = bearer_token(self.user["email"])
+        self.headers = {"Authorization": f"Bearer {self.token}"}
+        self.event_ids = list(dataset.event_ids.get(self.user["email"], ()))
+        self.created: list[int] = []
+        self.etags: dict[str, str] = {}
+
+    async def request(self, route: str, url: str, **kwargs) -> httpx.Response | None:
+        """Send `route`'s method to `url` and record it under `route`; None if the request
+        raised instead of answering (recorded as a failure)."""
+        method = route.split(" ", 1)[0]
+        kwargs.setdefault("headers", self.headers)
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as exc:
+            self.recorder.failures[f"{route}: {type(exc).__name__}"] += 1
+            return None
+        self.recorder.latencies[route].append(time.perf_counter() - started)
+        self.recorder.statuses[route][response.status_code] += 1
+        return response
+
+
+def bearer_token(email: str, **claims) -> str:
+    return create_access_token({"email": email, "token_version": 0, **claims})
+
+
+def month_start(day: datetime, offset: int) -> datetime:
+    month = day.month - 1 + offset
+    return datetime(day.year + month // 12, month % 12 + 1, 1)
+
+
+async def login_storm(user: VirtualUser) -> None:
+    """Log in as any user; 1 in 20 with a wrong password. Logins beyond the password hasher's
+    queue are answered 503, which is part of what this measures."""
+    account = user.rng.choice(user.dataset.users)
+    password = PASSWORD if user.rng.random() >= 0.05 else "wrong-password"
+    await user.request("POST /api/auth/login", "/api/auth/login", headers={},
+                       json={"email": account["email"], "password": password})
+
+
+async def token_validation(user: VirtualUser) -> None:
+    """Validate the user's token: mostly the same one again (as a logged-in client does),
+    sometimes a token never seen before, sometimes garbage."""
+    pick = user.rng.random()
+    if pick < 0.8:
+        headers = user.headers
+    elif pick < 0.95:
+        headers = {"Authorization": f"Bearer {bearer_token(user.user['email'], nonce=user.rng.getrandbits(32))}"}
+    else:
+        headers = {"Authorization": "Bearer not.a.token"}
+    await user.request("POST /api/auth/validate", "/api/auth/validate", headers=headers)
+
+
+async def calendar_browsing(user: VirtualUser) -> None:
+    """Open a month of the calendar (this month most often), page through it, revalidate it if seen
+    before (If-None-Match), and open one of its events now and then."""
+    month = month_start(ANCHOR, user.rng.choices((-2, -1, 0, 1, 2), weights=(1, 2, 6, 3, 1))[0])
+    params = {"from": month.isoformat(), "to": month_start(month, 1).isoformat(), "limit": 50}
+    seen = []
+    while True:
+        headers = dict(user.headers)
+        key = str(sorted(params.items()))
+        if key in user.etags and user.rng.random() < 0.5:
+            headers["If-None-Match"] = user.etags[key]
+        response = await user.request("GET /api/events", "/api/events", params=params, headers=headers)
+        if response is None or response.status_code != 200:
+            break
+        if "etag" in response.headers:
+            user.etags[key] = response.headers["etag"]
+        data = response.json()["data"]
+        seen.extend(event["id"] for event in data["events"])
+        if not data.get("next_cursor"):
+            break
+        params = {**params, "cursor": data["next_cursor"]}
+    if seen and user.rng.random() < 0.3:
+        event_id = user.rng.choice(seen)
+        await user.request("GET /api/events/{event_id}", f"/api/events/{event_id}")
+
+
+async def event_crud(user: VirtualUser) -> None:
+    """The mix of a busy calendar: 45% list the next page of upcoming events, 15% open an event,
+    20% create one, 12% update one, 8% delete one the user created."""
+    pick = user.rng.random()
+    if pick < 0.45:
+        since = ANCHOR + timedelta(days=user.rng.randint(-7, 7))
+        await user.request("GET /api/events", "/api/events", params={"from": since.isoformat(), "limit": 50})
+    elif pick < 0.6 and user.event_ids:
+        event_id = user.rng.choice(user.event_ids)
+        await user.request("GET /api/events/{event_id}", f"/api/events/{event_id}")
+    elif pick < 0.8 or not user.event_ids:
+        when = ANCHOR + timedelta(days=user.rng.randint(0, 60), hours=user.rng.randint(8, 20))
+        response = await user.request("POST /api/events", "/api/events",
+                                      json={"title": "Benchmark event", "date_time": when.isoformat()})
+        if response is not None and response.status_code == 200:
+            event_id = response.json()["data"]["id"]
+            user.event_ids.append(event_id)
+            user.created.append(event_id)
+    elif pick < 0.92 or not user.created:
+        event_id = user.rng.choice(user.event_ids)
+        await user.request("PUT /api/events/{event_id}", f"/api/events/{event_id}",
+                           json={"title": f"Moved {user.rng.randint(1, 999)}"})
+    else:
+        event_id = user.created.pop(user.rng.randrange(len(user.created)))
+        user.event_ids.remove(event_id)
+        await user.request("DELETE /api/events/{event_id}", f"/api/events/{event_id}")
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    name: str
+    step: Callable[[VirtualUser], Awaitable[None]]
+    # steps per run unless --steps says otherwise
+    steps: int
+
+
+# Run in this order: event_crud changes the data, so it goes last
+SCENARIOS = {scenario.name: scenario for scenario in (
+    Scenario("token_validation", token_validation, 4000),
+    Scenario("login_storm", login_storm, 100),
+    Scenario("calendar_browsing", calendar_browsing, 2000),
+    Scenario("event_crud", event_crud, 2000),
+)}
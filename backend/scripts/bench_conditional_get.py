@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full 200 responses vs. 304 revalidations for the events list and the hourly forecast.
+Usage:
+  python scripts/bench_conditional_get.py --events 500 --requests 500
+
+Behavior:
+- Seeds a temporary SQLite file with one user owning --events events and serves the app
+  in-process through httpx's ASGI transport (forecasts from app/tests/fake_open_meteo.py).
+- For GET /api/events (one page of --limit) and GET /api/weather/hourly, times --requests
+  plain GETs and --requests GETs sending the ETag of the first response in If-None-Match.
+- Reports p50/p99 latency and bytes received per request for both.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import UserORM, EventORM
+from app.db.session import get_db
+from app.main import app
+from app.tests import fake_open_meteo
+from app.utils.forecast_cache import forecast_cache
+from app.utils.open_meteo import open_meteo_client
+from app.utils.token_utils import create_access_token
+
+EMAIL = "bench@example.com"
+
+
+def seed(path, events):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(UserORM), [{"email": EMAIL, "password": "x", "token_version": 0}])
+        start = datetime(2025, 1, 1)
+        conn.execute(insert(EventORM), [
+            {"title": f"Event {i}", "description": "x" * 100, "date_time": start + timedelta(hours=i),
+             "user_email": EMAIL} for i in range(events)
+        ])
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+async def run(label, client, url, requests, **kwargs):
+    first = await client.get(url, **kwargs)
+    first.raise_for_status()
+    etag = first.headers["etag"]
+    for conditional in (False, True):
+        headers = dict(kwargs.get("headers", {}))
+        if conditional:
+            headers["If-None-Match"] = etag
+        latencies, size = [], 0
+        for _ in range(requests):
+            start = time.perf_counter()
+            r = await client.get(url, params=kwargs.get("params"), headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert r.status_code == (304 if conditional else 200), r.status_code
+            size += len(r.content)
+        latencies.sort()
+        print(f"{label:<8} {r.status_code}  p50={statistics.median(latencies) * 1000:6.2f}ms  "
+              f"p99={latencies[int(0.99 * (len(latencies) - 1))] * 1000:6.2f}ms  "
+              f"bytes/request={size // requests}")
+
+
+async def bench(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        SessionLocal = seed(f"{tmp}/events.db", args.events)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        open_meteo_client.configure(base_url="http://fake-open-meteo/v1",
+                                    transport=httpx.ASGITransport(app=fake_open_meteo.app))
+        fake_open_meteo.reset()
+        forecast_cache.clear()
+        token = create_access_token({"email": EMAIL, "token_version": 0})
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await run("events", client, "/api/events", args.requests,
+                      params={"limit": args.limit}, headers={"Authorization": f"Bearer {token}"})
+            await run("hourly", client, "/api/weather/hourly", args.requests,
+                      params={"lat": 32.08, "lon": 34.78})
+        await open_meteo_client.aclose()
+        app.dependency_overrides.pop(get_db, None)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark conditional GETs (ETag / 304)")
+    p.add_argument("--events", type=int, default=500)
+    p.add_argument("--limit", type=int, default=100, help="events per page")
+    p.add_argument("--requests", type=int, default=500)
+    args = p.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark: requests/sec and tail latency of the sync (Session) and async (AsyncSession) stacks.
+Usage:
+  python scripts/bench_db_stack.py --concurrency 64 --requests 4000
+
+Behavior:
+- Seeds a temporary SQLite file (SQLITE_PROFILE PRAGMAs applied) with users and events.
+- For each stack, mounts its routers on a fresh FastAPI app (what DB_MODE=sync/async selects)
+  and drives it in-process through httpx's ASGI transport with --concurrency clients.
+- The mix is --write-ratio POST /api/events, the rest GET /api/events (one page of 50).
+- Reports requests/sec, failed requests and p50/p95/p99 latency (overall, reads, writes) per stack.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import UserORM, EventORM
+from app.db.session import get_db, apply_sqlite_pragmas, sqlite_pragmas
+from app.db.async_session import get_async_db
+from app.utils.token_utils import create_access_token
+from app.api.auth import auth_routes, auth_routes_async
+from app.api.events import event_routes, event_routes_async
+
+
+def seed(db_path: str, users: int, events_per_user: int) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    apply_sqlite_pragmas(engine, sqlite_pragmas())
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(UserORM), [{"email": f"user{i}@example.com", "password": "x", "token_version": 0}
+                                       for i in range(users)])
+        start = datetime(2025, 1, 1)
+        conn.execute(insert(EventORM), [
+            {"title": f"Event {j}", "date_time": start + timedelta(hours=j), "user_email": f"user{i}@example.com"}
+            for i in range(users) for j in range(events_per_user)
+        ])
+    engine.dispose()
+
+
+def build_app(stack: str, db_path: str, pool_size: int, pool_timeout: float):
+    app = FastAPI()
+    if stack == "sync":
+        engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False},
+                               pool_size=pool_size, pool_timeout=pool_timeout)
+        apply_sqlite_pragmas(engine, sqlite_pragmas())
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.include_router(auth_routes.router, prefix="/api")
+        app.include_router(event_routes.router, prefix="/api")
+        app.dependency_overrides[get_db] = override_get_db
+        return app, engine
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", pool_size=pool_size, pool_timeout=pool_timeout)
+    apply_sqlite_pragmas(engine.sync_engine, sqlite_pragmas())
+    AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.include_router(auth_routes_async.router, prefix="/api")
+    app.include_router(event_routes_async.router, prefix="/api")
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app, engine
+
+
+async def run_load(app, args, requests: int) -> tuple[float, dict, int]:
+    tokens = [create_access_token({"email": f"user{i}@example.com", "token_version": 0}) for i in range(args.users)]
+    latencies: dict[str, list[float]] = {"read": [], "write": []}
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def client_loop(client: httpx.AsyncClient, rng: random.Random):
+        nonlocal errors
+        for n in remaining:
+            headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+            kind = "write" if rng.random() < args.write_ratio else "read"
+            start = time.perf_counter()
+            try:
+                if kind == "write":
+                    r = await client.post("/api/events", headers=headers,
+                                          json={"title": f"Load {n}", "date_time": "2025-06-01T12:00:00"})
+                else:
+                    r = await client.get("/api/events", headers=headers, params={"limit": 50})
+                ok = r.status_code == 200
+            except Exception:
+                ok = False  # e.g. QueuePool timeout raised through the ASGI transport
+            latencies[kind].append(time.perf_counter() - start)
+            errors += not ok
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, random.Random(i)) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, errors
+
+
+async def bench_stack(stack: str, db_path: str, args) -> tuple[float, dict, int]:
+    app, engine = build_app(stack, db_path, args.pool_size, args.pool_timeout)
+    try:
+        # warm-up opens the pool's connections and fills the user cache before measuring
+        await run_load(app, args, args.concurrency * 4)
+        return await run_load(app, args, args.requests)
+    finally:
+        # the async pool is bound to this event loop, dispose of it before the loop closes
+        if stack == "sync":
+            engine.dispose()
+        else:
+            await engine.dispose()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare the sync and async data-access stacks under load")
+    p.add_argument("--concurrency", type=int, default=64)
+    p.add_argument("--requests", type=int, default=4000)
+    p.add_argument("--users", type=int, default=200)
+    p.add_argument("--events-per-user", type=int, default=200)
+    p.add_argument("--write-ratio", type=float, default=0.2)
+    p.add_argument("--pool-size", type=int, default=64,
+                   help="Connection pool size of both stacks (SQLAlchemy default: 5, where the sync stack stalls)")
+    p.add_argument("--pool-timeout", type=float, default=5,
+                   help="Seconds to wait for a pooled connection before the request fails (SQLAlchemy default: 30)")
+    p.add_argument("--stacks", nargs="*", default=["sync", "async"], choices=["sync", "async"])
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for stack in args.stacks:
+            db_path = f"{tmp}/{stack}.db"
+            seed(db_path, args.users, args.events_per_user)
+            elapsed, latencies, errors = asyncio.run(bench_stack(stack, db_path, args))
+            total = sum(len(values) for values in latencies.values())
+            print(f"{stack:<6} {total / elapsed:8,.0f} req/s   errors={errors}")
+            for kind, values in [("all", latencies["read"] + latencies["write"]), *latencies.items()]:
+                if len(values) < 2:
+                    continue
+                q = statistics.quantiles(values, n=100)
+                print(f"  {kind:<6} p50={q[49] * 1000:7.1f} ms   p95={q[94] * 1000:7.1f} ms   p99={q[98] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
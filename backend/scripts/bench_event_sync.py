@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: refreshing a client's copy of the events by re-downloading the list vs. delta sync.
+Usage:
+  python scripts/bench_event_sync.py --events 10000 --changes 10 --rounds 20
+
+Behavior:
+- Seeds a temporary SQLite file with one user owning --events events and serves the app
+  in-process through httpx's ASGI transport.
+- "full list" fetches every page of GET /api/events, what the home page did on each load.
+- "delta sync" applies --changes writes (updates, creates and a delete) and then fetches
+  GET /api/events/changes from the cursor of the previous sync.
+- Reports the mean latency and bytes received per refresh for both, over --rounds rounds.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import UserORM, EventORM
+from app.db.session import get_db
+from app.main import app
+from app.crud.events_crud import EVENTS_MAX_PAGE_SIZE
+from app.utils.token_utils import create_access_token
+
+EMAIL = "bench@example.com"
+
+
+def seed(path, events):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(UserORM), [{"email": EMAIL, "password": "x", "token_version": 0}])
+        start = datetime(2025, 1, 1)
+        conn.execute(insert(EventORM), [
+            {"title": f"Event {i}", "description": "x" * 100, "date_time": start + timedelta(hours=i),
+             "user_email": EMAIL} for i in range(events)
+        ])
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+async def full_list(client, headers):
+    size, cursor = 0, None
+    while True:
+        params = {"limit": EVENTS_MAX_PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+        r = await client.get("/api/events", headers=headers, params=params)
+        r.raise_for_status()
+        size += len(r.content)
+        cursor = r.json()["data"]["next_cursor"]
+        if cursor is None:
+            return size
+
+
+async def delta_sync(client, headers, since):
+    size, more = 0, True
+    while more:
+        r = await client.get("/api/events/changes", headers=headers, params={"since": since} if since else {})
+        r.raise_for_status()
+        size += len(r.content)
+        data = r.json()["data"]
+        since, more = data["cursor"], data["has_more"]
+    return size, since
+
+
+async def write_changes(client, headers, changes, round_no):
+    operations = [{"op": "update", "id": round_no * changes + i + 1, "title": f"Edited {round_no}"}
+                  for i in range(changes - 2)]
+    operations += [{"op": "create", "title": f"New {round_no}", "date_time": "2026-01-01T10:00:00"},
+                   {"op": "delete", "id": round_no * changes + changes}]
+    r = await client.post("/api/events/batch", headers=headers, json={"operations": operations})
+    r.raise_for_status()
+
+
+def report(label, latencies, sizes):
+    print(f"{label:<11} mean={statistics.mean(latencies) * 1000:8.2f}ms  bytes/refresh={statistics.mean(sizes):10.0f}")
+
+
+async def bench(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        SessionLocal = seed(f"{tmp}/events.db", args.events)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        headers = {"Authorization": f"Bearer {create_access_token({'email': EMAIL, 'token_version': 0})}"}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            start = time.perf_counter()
+            _, cursor = await delta_sync(client, headers, None)
+            print(f"initial full sync of {args.events} events: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+            results = {"full list": ([], []), "delta sync": ([], [])}
+            for round_no in range(args.rounds):
+                await write_changes(client, headers, args.changes, round_no)
+                start = time.perf_counter()
+                results["full list"][1].append(await full_list(client, headers))
+                results["full list"][0].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                size, cursor = await delta_sync(client, headers, cursor)
+                results["delta sync"][0].append(time.perf_counter() - start)
+                results["delta sync"][1].append(size)
+            for label, (latencies, sizes) in results.items():
+                report(label, latencies, sizes)
+        app.dependency_overrides.pop(get_db, None)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark delta sync of events against full list downloads")
+    p.add_argument("--events", type=int, default=10000)
+    p.add_argument("--changes", type=int, default=10, help="writes between refreshes (at least 3)")
+    p.add_argument("--rounds", type=int, default=20)
+    args = p.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
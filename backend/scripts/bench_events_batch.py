@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: importing events one POST /api/events at a time vs. one POST /api/events/batch.
+Usage:
+  python scripts/bench_events_batch.py --events 2000
+
+Behavior:
+- Runs the real FastAPI app in-process through httpx's ASGI transport against a temporary SQLite file.
+- Creates --events events with the per-request loop, then the same number with one batch call,
+  and reports events/sec for both.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.db.base import Base
+from app.db.session import get_db
+
+
+def make_events(count: int) -> list[dict]:
+    start = datetime(2025, 1, 1, 9, 0)
+    return [{"title": f"Imported {i}", "description": "bench", "date_time": (start + timedelta(hours=i)).isoformat()}
+            for i in range(count)]
+
+
+async def run(args):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        user = {"first_name": "Bench", "last_name": "User", "email": "batch.bench@example.com", "password": "benchpass"}
+        r = await client.post("/api/auth/register", json=user)
+        headers = {"Authorization": f"Bearer {r.json()['data']['access_token']}"}
+        events = make_events(args.events)
+
+        start = time.perf_counter()
+        for event in events:
+            r = await client.post("/api/events", json=event, headers=headers)
+            assert r.status_code == 200, r.text
+        loop_elapsed = time.perf_counter() - start
+        print(f"per-request loop: {args.events / loop_elapsed:10,.0f} events/s ({loop_elapsed:.2f}s)")
+
+        start = time.perf_counter()
+        r = await client.post("/api/events/batch", headers=headers,
+                              json={"operations": [{"op": "create", **event} for event in events]})
+        batch_elapsed = time.perf_counter() - start
+        assert r.status_code == 200 and r.json()["data"]["created"] == args.events, r.text
+        print(f"batch endpoint:   {args.events / batch_elapsed:10,.0f} events/s ({batch_elapsed:.2f}s)")
+        print(f"speedup: {loop_elapsed / batch_elapsed:.1f}x")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare per-request event creation with the batch endpoint")
+    p.add_argument("--events", type=int, default=2000, help="Events created by each method")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        asyncio.run(run(args))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
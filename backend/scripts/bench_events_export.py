@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory used by GET /api/events/export for a large history.
+Usage:
+  python scripts/bench_events_export.py --events 500000 --format ndjson
+
+Behavior:
+- Seeds one user with --events events in a temporary SQLite file (streamed through raw sqlite3).
+- Calls the ASGI app directly and discards body chunks as they arrive (httpx's ASGI
+  transport would buffer the whole body), then reports bytes, throughput, peak Python
+  allocations (tracemalloc) and the process peak RSS before and after the export.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.db.base import Base
+from app.db.session import get_db
+from app.utils.token_utils import create_access_token
+
+EMAIL = "export.bench@example.com"
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def seed(db_path: str, events: int) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO users (email, password, token_version) VALUES (?, 'x', 0)", (EMAIL,))
+    start = datetime(2015, 1, 1, 9, 0)
+    conn.executemany(
+        "INSERT INTO events (title, description, date_time, user_email) VALUES (?, ?, ?, ?)",
+        ((f"Event {i}", "exported by the benchmark", (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M:%S.%f"), EMAIL)
+         for i in range(events)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def export(export_format: str) -> tuple[int, int]:
+    token = create_access_token({"email": EMAIL, "token_version": 0})
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/events/export", "raw_path": b"/api/events/export",
+        "query_string": f"format={export_format}".encode(), "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    received = {"bytes": 0, "status": 0}
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # the streaming response listens for a disconnect until the body is done
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            received["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            received["bytes"] += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return received["status"], received["bytes"]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure memory of the streaming events export")
+    p.add_argument("--events", type=int, default=500000)
+    p.add_argument("--format", default="ndjson", choices=["ndjson", "csv", "ics"])
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = f"{tmp}/bench.db"
+        engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        print(f"Seeding {args.events} events...")
+        seed(db_path, args.events)
+        rss_before = peak_rss_mb()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        status, size = asyncio.run(export(args.format))
+        elapsed = time.perf_counter() - start
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"status={status} format={args.format} bytes={size:,} in {elapsed:.1f}s "
+              f"({args.events / elapsed:,.0f} events/s)")
+        print(f"peak Python allocations during export: {traced_peak / 1024 / 1024:.1f} MB")
+        print(f"peak RSS: {rss_before:.1f} MB before export, {peak_rss_mb():.1f} MB after")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and throughput of POST /api/events/import for a large .ics file.
+Usage:
+  python scripts/bench_events_import.py --events 100000
+
+Behavior:
+- Writes an .ics file with --events VEVENTs (every 20th UID repeated) to a temporary directory.
+- Uploads it as multipart/form-data straight into the ASGI app in 64 KB chunks, so the
+  benchmark itself never holds the file in memory.
+- Reports the import summary, events/sec and peak Python allocations (tracemalloc).
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.db.base import Base
+from app.db.models import UserORM
+from app.db.session import get_db
+from app.utils.ical_utils import calendar_header, calendar_footer, format_vevent
+from app.utils.token_utils import create_access_token
+
+EMAIL = "import.bench@example.com"
+BOUNDARY = "benchboundary7MA4YWxkTrZu0gW"
+CHUNK = 64 * 1024
+
+
+def write_ics(path: Path, events: int) -> None:
+    start = datetime(2020, 1, 1, 9, 0)
+    stamp = datetime(2025, 1, 1)
+    with path.open("w", newline="") as f:
+        f.write(calendar_header())
+        for i in range(events):
+            uid = f"bench-{i - 1 if i % 20 == 19 else i}@example.com"  # every 20th event repeats a UID
+            f.write(format_vevent(uid, f"Imported event {i}", "Migrated from another calendar",
+                                  start + timedelta(hours=i), stamp))
+        f.write(calendar_footer())
+
+
+async def upload(path: Path) -> dict:
+    token = create_access_token({"email": EMAIL, "token_version": 0})
+    head = (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{path.name}\"\r\n"
+            f"Content-Type: text/calendar\r\n\r\n").encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+    length = len(head) + path.stat().st_size + len(tail)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/events/import", "raw_path": b"/api/events/import",
+        "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode()),
+                    (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+                    (b"content-length", str(length).encode())],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    f = path.open("rb")
+    pending = [head]
+    body = []
+
+    async def receive():
+        if pending:
+            return {"type": "http.request", "body": pending.pop(), "more_body": True}
+        chunk = f.read(CHUNK)
+        if chunk:
+            return {"type": "http.request", "body": chunk, "more_body": True}
+        return {"type": "http.request", "body": tail, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        f.close()
+    return json.loads(b"".join(body))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure the iCalendar import pipeline")
+    p.add_argument("--events", type=int, default=100000)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = SessionLocal()
+        db.add(UserORM(email=EMAIL, password="x", token_version=0))
+        db.commit()
+        db.close()
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        ics_path = Path(tmp) / "calendar.ics"
+        write_ics(ics_path, args.events)
+        print(f"Wrote {args.events} events ({ics_path.stat().st_size / 1024 / 1024:.1f} MB)")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = asyncio.run(upload(ics_path))
+        elapsed = time.perf_counter() - start
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(result["message"], result["data"])
+        print(f"{args.events / elapsed:,.0f} events/s ({elapsed:.1f}s)")
+        print(f"peak Python allocations during import: {traced_peak / 1024 / 1024:.1f} MB")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: events lookups before and after the (user_email, date_time) index.
+Usage:
+  python scripts/bench_events_index.py --users 10000 --events 1000000
+
+Behavior:
+- Creates the schema from the ORM models in a temporary SQLite file and seeds it with raw sqlite3.
+- Drops the composite index, prints EXPLAIN QUERY PLAN and latency for the CRUD queries,
+  then applies migration 2 from sqlite_migrate.py and measures again.
+"""
+
+from pathlib import Path
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine
+
+from app.db.base import Base
+from app.db.models import *  # noqa: F401,F403 - registers the tables
+from sqlite_migrate import MIGRATIONS
+
+# The statements issued by events_crud.py, in sqlite3 parameter style
+QUERIES = {
+    "get_user_events": ("SELECT * FROM events WHERE user_email = ?", lambda u, e: (u,)),
+    "get_event_by_id": ("SELECT * FROM events WHERE id = ? AND user_email = ?", lambda u, e: (e, u)),
+    "month_range": ("SELECT * FROM events WHERE user_email = ? AND date_time >= ? AND date_time < ? "
+                    "ORDER BY date_time", lambda u, e: (u, "2025-03-01 00:00:00.000000", "2025-04-01 00:00:00.000000")),
+}
+
+
+def seed(conn: sqlite3.Connection, users: int, events: int) -> None:
+    rng = random.Random(42)
+    conn.executemany("INSERT INTO users (email, password, token_version) VALUES (?, 'x', 0)",
+                     ((f"user{i}@example.com",) for i in range(users)))
+    start = datetime(2023, 1, 1)
+    span_minutes = 3 * 365 * 24 * 60
+
+    def rows():
+        for i in range(events):
+            when = start + timedelta(minutes=rng.randrange(span_minutes))
+            yield (f"Event {i}", when.strftime("%Y-%m-%d %H:%M:%S.%f"), f"user{rng.randrange(users)}@example.com")
+
+    conn.executemany("INSERT INTO events (title, date_time, user_email) VALUES (?, ?, ?)", rows())
+    conn.commit()
+
+
+def measure(conn: sqlite3.Connection, label: str, users: int, events: int, samples: int) -> None:
+    rng = random.Random(7)
+    print(f"--- {label}")
+    for name, (sql, params) in QUERIES.items():
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params("user0@example.com", 1)).fetchall()
+        print(f"{name}: {' | '.join(row[-1] for row in plan)}")
+        start = time.perf_counter()
+        for _ in range(samples):
+            conn.execute(sql, params(f"user{rng.randrange(users)}@example.com", rng.randrange(1, events + 1))).fetchall()
+        print(f"  {(time.perf_counter() - start) / samples * 1000:.3f} ms/query over {samples} queries")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the events composite index")
+    p.add_argument("--users", type=int, default=10000)
+    p.add_argument("--events", type=int, default=1000000)
+    p.add_argument("--samples", type=int, default=200, help="Queries timed per statement")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = f"{tmp}/bench.db"
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("DROP INDEX ix_events_user_email_date_time")
+        print(f"Seeding {args.events} events across {args.users} users...")
+        t = time.perf_counter()
+        seed(conn, args.users, args.events)
+        print(f"Seeded in {time.perf_counter() - t:.1f}s")
+
+        measure(conn, "without index", args.users, args.events, args.samples)
+        t = time.perf_counter()
+        for sql in MIGRATIONS[2]:
+            conn.execute(sql)
+        conn.execute("ANALYZE")
+        print(f"Migration 2 built the index in {time.perf_counter() - t:.1f}s")
+        measure(conn, "with index", args.users, args.events, args.samples)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
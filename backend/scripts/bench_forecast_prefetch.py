@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: first home page load of users with upcoming events, with and without the forecast prefetcher.
+Usage:
+  python scripts/bench_forecast_prefetch.py --users 300 --cities 100 --latency 0.2
+
+Behavior:
+- Fills a temporary SQLite file with one upcoming event per user, in one of --cities places.
+- "cold" has every user load current, daily and hourly weather for their event's place
+  from an empty forecast cache (app/tests/fake_open_meteo.py answering after --latency seconds).
+- "prefetched" first runs one forecast_prefetcher scan (at --rate upstream calls per second),
+  then replays the same loads.
+- Reports p50/p99 latency per load, upstream calls made during the loads, the warm-hit ratio
+  and how long the scan took.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.events_ORM import EventORM
+from app.main import app
+from app.crud.weather_crud import forecast_prefetcher
+from app.tests import fake_open_meteo
+from app.utils.forecast_cache import forecast_cache
+from app.utils.open_meteo import open_meteo_client
+
+FORECAST_TYPES = ("current", "daily", "hourly")
+
+
+def seed(path, users, cities, rng):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    places = [(round(rng.uniform(-50, 50), 2), round(rng.uniform(-150, 150), 2)) for _ in range(cities)]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    locations = []
+    with sessionmaker(bind=engine)() as db:
+        for i in range(users):
+            lat, lon = rng.choice(places)
+            db.add(EventORM(title=f"event {i}", date_time=now + timedelta(hours=rng.uniform(1, 72)),
+                            user_email=f"user{i}@example.com", latitude=lat, longitude=lon))
+            locations.append((lat, lon))
+        db.commit()
+    return sessionmaker(bind=engine), locations
+
+
+async def load(client, lat, lon):
+    for forecast_type in FORECAST_TYPES:
+        r = await client.get(f"/api/weather/{forecast_type}", params={"lat": lat, "lon": lon})
+        r.raise_for_status()
+
+
+async def run_phase(label, client, locations, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def user(lat, lon):
+        async with semaphore:
+            start = time.perf_counter()
+            await load(client, lat, lon)
+            latencies.append(time.perf_counter() - start)
+
+    calls = fake_open_meteo.app.state.requests
+    await asyncio.gather(*(user(lat, lon) for lat, lon in locations))
+    latencies.sort()
+    stats = forecast_cache.stats()
+    print(f"{label:<11} p50={statistics.median(latencies) * 1000:7.1f}ms  "
+          f"p99={latencies[int(0.99 * (len(latencies) - 1))] * 1000:7.1f}ms  "
+          f"upstream calls during loads={fake_open_meteo.app.state.requests - calls:<5} "
+          f"warm hit ratio={stats['warm_hit_ratio']:.2f}")
+
+
+async def bench(args):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        SessionLocal, locations = seed(f"{tmp}/events.db", args.users, args.cities, rng)
+        open_meteo_client.configure(base_url="http://fake-open-meteo/v1",
+                                    transport=httpx.ASGITransport(app=fake_open_meteo.app))
+        forecast_prefetcher.configure(session_factory=SessionLocal, rate=args.rate)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            fake_open_meteo.reset(latency=args.latency)
+            forecast_cache.clear()
+            await run_phase("cold", client, locations, args.concurrency)
+
+            fake_open_meteo.reset(latency=args.latency)
+            forecast_cache.clear()
+            start = time.perf_counter()
+            run = await forecast_prefetcher.run_once()
+            print(f"prefetch scan: {run} in {time.perf_counter() - start:.1f}s")
+            await run_phase("prefetched", client, locations, args.concurrency)
+        await open_meteo_client.aclose()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the forecast prefetcher")
+    p.add_argument("--users", type=int, default=300)
+    p.add_argument("--cities", type=int, default=100)
+    p.add_argument("--concurrency", type=int, default=50)
+    p.add_argument("--latency", type=float, default=0.2, help="fake upstream latency in seconds")
+    p.add_argument("--rate", type=float, default=50, help="prefetch upstream calls per second")
+    args = p.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
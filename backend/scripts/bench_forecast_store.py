@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hourly forecasts kept as parsed JSON vs. as columnar HourlyForecast arrays.
+Usage:
+  python scripts/bench_forecast_store.py --locations 2000 --lookups 100000
+
+Behavior:
+- Builds --locations 14-day hourly payloads shaped like the upstream's (values from
+  app/tests/fake_open_meteo.py) and measures the memory each representation holds
+  per location with tracemalloc.
+- Times nearest-hour lookups (bisect over the ISO time strings vs. np.searchsorted)
+  and per-day min/max/mean/sum aggregation (Python loops over the JSON lists vs.
+  HourlyForecast.daily_summary()).
+- Times the JSON round trip (to_payload) that GET /api/weather/hourly pays per request.
+"""
+
+from pathlib import Path
+import argparse
+import bisect
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.tests import fake_open_meteo
+from app.utils.forecast_store import DAILY_SUMMARY, HourlyForecast
+from app.utils.open_meteo import FORECAST_PARAMS
+
+VARIABLES = FORECAST_PARAMS["hourly"]["hourly"].split(",")
+HOURS = 14 * 24
+
+
+def make_payload(lat, lon):
+    start = fake_open_meteo.today()
+    hourly = {"time": [(start + timedelta(hours=i)).isoformat(timespec="minutes") for i in range(HOURS)]}
+    for name in VARIABLES:
+        hourly[name] = [fake_open_meteo.value(name, lat, lon, i) for i in range(HOURS)]
+    return {"latitude": lat, "longitude": lon, "timezone": "GMT", "utc_offset_seconds": 0, "hourly": hourly}
+
+
+def measure(label, build, n):
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(i) for i in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14} {size / n / 1024:8.1f} KiB/location  ({size / 2**20:.1f} MiB for {n})")
+    return kept
+
+
+def json_nearest(payload, when):
+    times = payload["hourly"]["time"]
+    i = bisect.bisect_left(times, when.isoformat(timespec="minutes"))
+    j = min((j for j in (i - 1, i) if 0 <= j < len(times)),
+            key=lambda j: abs(datetime.fromisoformat(times[j]) - when))
+    return {name: payload["hourly"][name][j] for name in ("temperature_2m", "weather_code")}
+
+
+def json_daily_summary(payload):
+    hourly = payload["hourly"]
+    summary = {"time": sorted({t[:10] for t in hourly["time"]})}
+    for output, (name, reduction) in DAILY_SUMMARY.items():
+        if name not in hourly:
+            continue
+        out = []
+        for day in range(len(summary["time"])):
+            values = [v for v in hourly[name][day * 24:(day + 1) * 24] if v is not None]
+            if reduction == "min":
+                out.append(min(values))
+            elif reduction == "max":
+                out.append(max(values))
+            elif reduction == "sum":
+                out.append(round(sum(values), 2))
+            else:
+                out.append(round(sum(values) / len(values), 2))
+        summary[output] = out
+    return summary
+
+
+def timed(label, fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {elapsed / len(items) * 1e6:9.1f} us/op")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the columnar hourly forecast store")
+    p.add_argument("--locations", type=int, default=2000)
+    p.add_argument("--lookups", type=int, default=100000)
+    args = p.parse_args()
+
+    rng = random.Random(0)
+    coords = [(round(rng.uniform(-60, 60), 1), round(rng.uniform(-180, 180), 1)) for _ in range(args.locations)]
+    payloads = [make_payload(*c) for c in coords]
+
+    measure("parsed JSON", lambda i: make_payload(*coords[i]), args.locations)
+    stores = measure("HourlyForecast", lambda i: HourlyForecast.from_payload(payloads[i]), args.locations)
+    print(f"array bytes per location: {stores[0].nbytes / 1024:.1f} KiB")
+
+    start = fake_open_meteo.today()
+    lookups = [(rng.randrange(args.locations), start + timedelta(minutes=rng.randrange(HOURS * 60)))
+               for _ in range(args.lookups)]
+    timed("nearest hour (JSON bisect)", lambda q: json_nearest(payloads[q[0]], q[1]), lookups)
+    timed("nearest hour (searchsorted)",
+          lambda q: stores[q[0]].hour(stores[q[0]].nearest(q[1])[0], ("temperature_2m", "weather_code")), lookups)
+
+    sample = range(min(args.locations, 500))
+    timed("daily summary (JSON loops)", lambda i: json_daily_summary(payloads[i]), sample)
+    timed("daily summary (reduceat)", lambda i: stores[i].daily_summary(), sample)
+    timed("from_payload", lambda i: HourlyForecast.from_payload(payloads[i]), sample)
+    timed("to_payload", lambda i: stores[i].to_payload(), sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: place searches answered by the geocoding cache vs. the (fake) upstream.
+Usage:
+  python scripts/bench_geocoding_cache.py --places 50000 --lookups 100000
+
+Behavior:
+- Fills a GeocodingCache in a temporary SQLite file with --places made-up places
+  stored by 3-result searches (one per place name).
+- Times repeated exact searches and search-as-you-type prefixes of cached names,
+  then the full GET /api/geocode round trip for cache hits and for upstream misses
+  (app/tests/fake_open_meteo.py answering after --latency seconds).
+- Reports per-lookup latency, the cache hit rate and the warm start time of a new worker.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from app.main import app
+from app.tests import fake_open_meteo
+from app.utils.geocoding_cache import GeocodingCache, geocoding_cache
+from app.utils.open_meteo import open_meteo_client
+
+
+def place_names(n, rng):
+    names = set()
+    while len(names) < n:
+        names.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))).title())
+    return sorted(names)
+
+
+def time_lookups(label, cache, queries, count):
+    start = time.perf_counter()
+    answered = sum(cache.search(q, count) is not None for q in queries)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18} {elapsed / len(queries) * 1e6:8.1f} us/lookup  answered={answered}/{len(queries)}")
+
+
+async def time_endpoint(label, client, names, repeat):
+    start = time.perf_counter()
+    for name in names * repeat:
+        r = await client.get("/api/geocode", params={"name": name, "count": 1})
+        r.raise_for_status()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18} {elapsed / (len(names) * repeat) * 1000:8.2f} ms/request")
+
+
+async def bench_endpoint(path, latency):
+    fake_open_meteo.reset(latency=latency)
+    geocoding_cache.configure(path=path)
+    open_meteo_client.configure(base_url="http://fake-open-meteo/v1", geocoding_url="http://fake-open-meteo/v1",
+                                transport=httpx.ASGITransport(app=fake_open_meteo.app))
+    names = [f"Town {i}" for i in range(50)]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await time_endpoint("endpoint miss", client, names, 1)
+        await time_endpoint("endpoint hit", client, names, 20)
+    await open_meteo_client.aclose()
+    print(f"upstream calls={fake_open_meteo.app.state.requests}  cache={geocoding_cache.stats()}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the geocoding cache")
+    p.add_argument("--places", type=int, default=50000)
+    p.add_argument("--lookups", type=int, default=100000)
+    p.add_argument("--latency", type=float, default=0.1, help="fake upstream latency in seconds")
+    args = p.parse_args()
+
+    rng = random.Random(0)
+    names = place_names(args.places, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/geocoding.db"
+        cache = GeocodingCache(path=path, max_size=args.places)
+        start = time.perf_counter()
+        for i, name in enumerate(names):
+            cache.put(name, 3, "en", [{"id": i, "name": name, "population": rng.randint(0, 10**6)}])
+        print(f"filled {args.places} places in {time.perf_counter() - start:.1f}s")
+
+        sample = rng.choices(names, k=args.lookups)
+        time_lookups("exact", cache, sample, 1)
+        time_lookups("prefix (4 chars)", cache, [name[:4] for name in sample], 1)
+        time_lookups("prefix (3 chars)", cache, [name[:3] for name in sample], 1)
+        print(f"cache={cache.stats()}")
+
+        start = time.perf_counter()
+        GeocodingCache(path=path, max_size=args.places).search(names[0], 1)
+        print(f"warm start of a new worker: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        asyncio.run(bench_endpoint(f"{tmp}/endpoint.db", args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of GET /api/events while a storm of logins is running.
+Usage:
+  python scripts/bench_login_storm.py --logins 200 --reads 400
+
+Behavior:
+- Runs the real FastAPI app in-process through httpx's ASGI transport against a temporary SQLite file.
+- Measures GET /api/events latency alone, then again while --logins concurrent logins hash passwords.
+- With --inline-hashing bcrypt runs on the event loop (the old behavior) for a before/after comparison.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.db.base import Base
+from app.db.session import get_db
+from app.utils import password_utils
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarize(label, samples):
+    print(f"{label:<22} n={len(samples):<5} p50={percentile(samples, 50):7.1f}ms "
+          f"p95={percentile(samples, 95):7.1f}ms p99={percentile(samples, 99):7.1f}ms "
+          f"mean={statistics.mean(samples):7.1f}ms")
+
+
+async def timed_reads(client, headers, count, concurrency=8):
+    samples = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            r = await client.get("/api/events", headers=headers)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert r.status_code == 200, r.text
+
+    await asyncio.gather(*(one() for _ in range(count)))
+    return samples
+
+
+async def run(args):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        user = {"first_name": "Bench", "last_name": "User", "email": "bench@example.com", "password": "benchpass"}
+        r = await client.post("/api/auth/register", json=user)
+        token = r.json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for i in range(20):
+            await client.post("/api/events", headers=headers,
+                              json={"title": f"Event {i}", "date_time": "2025-01-01T10:00:00"})
+
+        summarize("events (idle)", await timed_reads(client, headers, args.reads))
+
+        statuses = {}
+
+        async def login():
+            r = await client.post("/api/auth/login", json={"email": user["email"], "password": user["password"]})
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        # reads and logins are interleaved on the same loop, like concurrent users on one worker
+        samples, _ = await asyncio.gather(timed_reads(client, headers, args.reads),
+                                          asyncio.gather(*(login() for _ in range(args.logins))))
+        summarize("events (login storm)", samples)
+        print("login statuses:", statuses)
+        print("hasher stats:", password_utils.password_hasher.stats())
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure /api/events latency during a login storm")
+    p.add_argument("--logins", type=int, default=200, help="Concurrent logins in the storm")
+    p.add_argument("--reads", type=int, default=400, help="GET /api/events requests per phase")
+    p.add_argument("--inline-hashing", action="store_true", help="Run bcrypt on the event loop (old behavior)")
+    args = p.parse_args()
+
+    if args.inline_hashing:
+        async def inline_verify(plain, hashed):
+            return password_utils.verify_password(plain, hashed)
+        password_utils.password_hasher.verify_password = inline_verify
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override_get_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        asyncio.run(run(args))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
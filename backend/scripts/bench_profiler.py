@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of the request profiler when off, when profiling every request, and per sample.
+Usage:
+  python scripts/bench_profiler.py --requests 5000
+
+Behavior:
+- Builds a small app with ProfilerMiddleware (one route answering from memory, one running
+  a SQL statement on an in-memory SQLite engine) and drives it in-process through httpx's
+  ASGI transport with profiling off, with a token configured but not sent, and with
+  PROFILE_SAMPLE_RATE=1 (every request sampled and saved to a temporary PROFILE_DIR).
+- Reports microseconds per request for each mode and the overhead against "off".
+- Times one sample of every thread's stack (what the sampler thread does each PROFILE_INTERVAL)
+  with --threads busy threads running.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.utils.profiler import ProfilerMiddleware, StackSampler, profiler
+
+
+def build_app():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    app = FastAPI()
+    app.add_middleware(ProfilerMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/query")
+    def query():
+        with engine.connect() as conn:
+            return {"value": conn.execute(text("SELECT 1")).scalar()}
+
+    return app
+
+
+async def drive(app, path: str, requests: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for _ in range(100):  # warm up
+            await client.get(path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def time_sample(threads: int, seconds: float = 1.0) -> float:
+    """Microseconds per sampling pass, sampling back to back for `seconds` while `threads`
+    threads spin (competing for the GIL, as a loaded worker's threads would)."""
+    stop = threading.Event()
+
+    def spin():
+        while not stop.is_set():
+            sum(range(100))
+
+    workers = [threading.Thread(target=spin) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    sampler = StackSampler(None, 0, seconds).start()
+    sampler._thread.join()
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return seconds / max(sampler.samples, 1) * 1e6
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the request profiler")
+    p.add_argument("--requests", type=int, default=5000)
+    p.add_argument("--threads", type=int, default=4, help="busy threads while timing a sample")
+    args = p.parse_args()
+
+    app = build_app()
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = (("off", "", 0), ("token set", "secret", 0), ("every request", "", 1))
+        for path in ("/items/1", "/query"):
+            base = None
+            for name, token, sample_rate in modes:
+                profiler.configure(token=token, sample_rate=sample_rate, directory=tmp)
+                measured = asyncio.run(drive(app, path, args.requests))
+                base = measured if base is None else base
+                print(f"{path:<10} {name:<14} {measured:7.1f}us/request  overhead={measured - base:7.1f}us")
+        profiler.configure(token="", sample_rate=0)
+        time.sleep(0.1)  # let the last samplers save before the directory goes
+
+    print(f"one sample of all threads, {args.threads} busy: {time_sample(args.threads):.1f}us")
+
+
+if __name__ == "__main__":
+    main()
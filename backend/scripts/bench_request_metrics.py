@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of the request metrics middleware and of serving GET /metrics.
+Usage:
+  python scripts/bench_request_metrics.py --requests 20000 --workers 8
+
+Behavior:
+- Builds two copies of a small app (one route answering from memory, one running a SQL
+  statement on an in-memory SQLite engine), one with RequestMetricsMiddleware and
+  instrument_queries and one without, and drives each in-process through httpx's ASGI
+  transport. Reports microseconds per request and the difference.
+- Times recording alone (a counter increment plus two histogram observations, what the
+  middleware adds per request) from 1 and from 8 threads at once.
+- Writes --workers snapshot files for 50 routes into a temporary METRICS_DIR and times
+  collect() + render(), i.e. a scrape of a server with that many worker processes.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.db.query_metrics import instrument_queries
+from app.utils.metrics import MetricsExporter, MetricsRegistry, metrics_registry, render
+from app.utils.request_metrics import RequestMetricsMiddleware, http_request_db_queries, http_request_duration, http_requests
+
+
+def build_app(instrumented: bool):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    if instrumented:
+        instrument_queries(engine, "bench")
+    app = FastAPI()
+    if instrumented:
+        app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/query")
+    def query():
+        with engine.connect() as conn:
+            return {"value": conn.execute(text("SELECT 1")).scalar()}
+
+    return app
+
+
+async def drive(app, path: str, requests: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for _ in range(200):  # warm up
+            await client.get(path)
+        start = time.perf_counter()
+        for i in range(requests):
+            await client.get(path)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def record(n: int) -> None:
+    labels = ("GET", "/api/events/{event_id}")
+    for _ in range(n):
+        http_requests.inc(labels + ("200",))
+        http_request_duration.observe(labels, 0.003)
+        http_request_db_queries.observe(labels, 2)
+
+
+def time_recording(threads: int, n: int) -> float:
+    workers = [threading.Thread(target=record, args=(n,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (threads * n) * 1e6
+
+
+def time_scrape(workers: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        registries = []
+        for w in range(workers):
+            registry = MetricsRegistry()
+            requests = registry.counter("http_requests_total", "Requests", ("method", "route", "status"))
+            latency = registry.histogram("http_request_duration_seconds", "Latency", ("method", "route"))
+            for route in range(50):
+                for status in ("200", "400", "404"):
+                    requests.inc(("GET", f"/api/route/{route}", status), 100)
+                latency.observe(("GET", f"/api/route/{route}"), 0.01 * route)
+            MetricsExporter(registry, tmp).write()
+            registries.append(registry)
+        exporter = MetricsExporter(registries[0], tmp)
+        start = time.perf_counter()
+        for _ in range(20):
+            render(registries[0], exporter.collect())
+        return (time.perf_counter() - start) / 20 * 1000
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the request metrics middleware")
+    p.add_argument("--requests", type=int, default=20000)
+    p.add_argument("--workers", type=int, default=8, help="worker snapshot files for the scrape timing")
+    args = p.parse_args()
+
+    plain, instrumented = build_app(False), build_app(True)
+    for path in ("/items/1", "/query"):
+        base = asyncio.run(drive(plain, path, args.requests))
+        measured = asyncio.run(drive(instrumented, path, args.requests))
+        print(f"{path:<10} without={base:7.1f}us/request  with={measured:7.1f}us/request  "
+              f"overhead={measured - base:6.1f}us")
+
+    for threads in (1, 8):
+        print(f"recording only, {threads} thread(s): {time_recording(threads, 100000):.2f}us/request")
+    print(f"scrape of {args.workers} workers x 50 routes: {time_scrape(args.workers):.1f}ms")
+    metrics_registry.clear()
+
+
+if __name__ == "__main__":
+    main()
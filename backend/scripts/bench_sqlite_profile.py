@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent reads and writes against SQLite under each tuning profile.
+Usage:
+  python scripts/bench_sqlite_profile.py --readers 8 --writers 2 --seconds 10
+
+Behavior:
+- For each profile in app.db.session.SQLITE_PROFILES, creates a fresh SQLite file with
+  the app's schema and --seed events, then runs reader threads (get_user_events-style
+  queries) and writer threads (insert + commit, like create_event) for --seconds.
+- Reports reads/sec, writes/sec and the rate of "database is locked" errors.
+"""
+
+from pathlib import Path
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import UserORM, EventORM
+from app.db.session import SQLITE_PROFILES, apply_sqlite_pragmas, sqlite_pragmas
+
+USERS = 50
+
+
+def seed(SessionLocal, events: int) -> None:
+    db = SessionLocal()
+    db.add_all(UserORM(email=f"user{i}@example.com", password="x", token_version=0) for i in range(USERS))
+    start = datetime(2025, 1, 1)
+    db.execute(insert(EventORM), [
+        {"title": f"Event {i}", "date_time": start + timedelta(hours=i), "user_email": f"user{i % USERS}@example.com"}
+        for i in range(events)
+    ])
+    db.commit()
+    db.close()
+
+
+def worker(SessionLocal, kind: str, stop: threading.Event, counts: dict, lock: threading.Lock) -> None:
+    rng = random.Random()
+    ok = errors = 0
+    while not stop.is_set():
+        db = SessionLocal()
+        email = f"user{rng.randrange(USERS)}@example.com"
+        try:
+            if kind == "read":
+                db.execute(select(EventORM.id, EventORM.title, EventORM.date_time)
+                           .where(EventORM.user_email == email)).all()
+            else:
+                db.add(EventORM(title="Load", date_time=datetime.now(), user_email=email))
+                db.commit()
+            ok += 1
+        except OperationalError as e:
+            db.rollback()
+            if "locked" not in str(e):
+                raise
+            errors += 1
+        finally:
+            db.close()
+    with lock:
+        counts[kind] += ok
+        counts[f"{kind}_errors"] += errors
+
+
+def run_profile(profile: str, args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        # timeout=0.1 so the baseline reports lock errors instead of hiding them behind
+        # Python's default 5 s wait; profiles with busy_timeout override it
+        engine = create_engine(f"sqlite:///{tmp}/bench.db",
+                               connect_args={"check_same_thread": False, "timeout": 0.1},
+                               pool_size=args.readers + args.writers)
+        apply_sqlite_pragmas(engine, sqlite_pragmas(profile))
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        seed(SessionLocal, args.seed)
+
+        counts = {"read": 0, "write": 0, "read_errors": 0, "write_errors": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+        threads = [threading.Thread(target=worker, args=(SessionLocal, "read", stop, counts, lock))
+                   for _ in range(args.readers)]
+        threads += [threading.Thread(target=worker, args=(SessionLocal, "write", stop, counts, lock))
+                    for _ in range(args.writers)]
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    attempts = sum(counts.values())
+    errors = counts["read_errors"] + counts["write_errors"]
+    print(f"{profile:<12} reads/s={counts['read'] / args.seconds:9,.0f}  writes/s={counts['write'] / args.seconds:8,.0f}  "
+          f"lock errors={errors} ({errors / max(attempts, 1):.2%})")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare SQLite tuning profiles under concurrent load")
+    p.add_argument("--readers", type=int, default=8)
+    p.add_argument("--writers", type=int, default=2)
+    p.add_argument("--seconds", type=float, default=10)
+    p.add_argument("--seed", type=int, default=20000, help="Events inserted before the run")
+    p.add_argument("--profiles", nargs="*", default=list(SQLITE_PROFILES))
+    args = p.parse_args()
+    for profile in args.profiles:
+        run_profile(profile, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: validate_user_from_token with and without the authenticated-user cache.
+Usage:
+  python scripts/bench_user_cache.py --users 1000 --validations 50000
+
+Behavior:
+- Seeds --users users into a temporary SQLite file and issues one token per user.
+- Validates tokens round-robin, first with the cache disabled (old behavior) then enabled.
+- Reports validations/sec, users-table queries and cache hit/miss counters.
+"""
+
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import UserORM
+from app.utils.token_utils import create_access_token, validate_user_from_token
+from app.utils.user_cache import user_cache
+
+
+def run_phase(label, SessionLocal, tokens, validations, counter):
+    user_cache.clear()
+    counter["users"] = 0
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        for i in range(validations):
+            assert validate_user_from_token(tokens[i % len(tokens)], db) is not None
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"{label:<10} {validations / elapsed:10.0f} validations/s  "
+          f"user queries={counter['users']:<7} cache={user_cache.stats()}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the authenticated-user cache")
+    p.add_argument("--users", type=int, default=1000)
+    p.add_argument("--validations", type=int, default=50000)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        counter = {"users": 0}
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if "FROM users" in statement:
+                counter["users"] += 1
+
+        db = SessionLocal()
+        db.add_all(UserORM(email=f"user{i}@example.com", password="x", token_version=0) for i in range(args.users))
+        db.commit()
+        db.close()
+        tokens = [create_access_token({"email": f"user{i}@example.com", "token_version": 0})
+                  for i in range(args.users)]
+
+        max_size = user_cache.max_size
+        user_cache.max_size = 0
+        run_phase("no cache", SessionLocal, tokens, args.validations, counter)
+        user_cache.max_size = max_size
+        run_phase("cache", SessionLocal, tokens, args.validations, counter)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: browsers calling Open-Meteo directly vs. through /api/weather and its shared cache.
+Usage:
+  python scripts/bench_weather_proxy.py --users 500 --concurrency 50 --latency 0.2
+
+Behavior:
+- Simulates --users users in one city (coordinates jittered by up to --spread degrees), each
+  loading the dashboard: current conditions, daily and hourly forecast.
+- "direct" sends every load to the fake upstream (app/tests/fake_open_meteo.py, --latency seconds
+  per answer) as the frontend used to; "proxy" sends them through the app's /api/weather.
+- Reports upstream calls, loads/sec and p50/p99 latency per load for both.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from app.main import app
+from app.tests import fake_open_meteo
+from app.utils.forecast_cache import forecast_cache
+from app.utils.open_meteo import FORECAST_PARAMS, open_meteo_client
+
+FORECAST_TYPES = ("current", "daily", "hourly")
+
+
+async def load_direct(client, lat, lon):
+    for forecast_type in FORECAST_TYPES:
+        params = {"latitude": lat, "longitude": lon, "timezone": "auto", **FORECAST_PARAMS[forecast_type]}
+        r = await client.get("/v1/forecast", params=params)
+        r.raise_for_status()
+
+
+async def load_proxy(client, lat, lon):
+    for forecast_type in FORECAST_TYPES:
+        r = await client.get(f"/api/weather/{forecast_type}", params={"lat": lat, "lon": lon})
+        r.raise_for_status()
+
+
+async def run_phase(label, load, client, users, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def user(lat, lon):
+        async with semaphore:
+            start = time.perf_counter()
+            await load(client, lat, lon)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(lat, lon) for lat, lon in users))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{label:<8} upstream calls={fake_open_meteo.app.state.requests:<6} {len(users) / elapsed:8.1f} loads/s  "
+          f"p50={statistics.median(latencies) * 1000:7.1f}ms  "
+          f"p99={latencies[int(0.99 * (len(latencies) - 1))] * 1000:7.1f}ms")
+
+
+async def bench(args):
+    rng = random.Random(0)
+    users = [(round(args.lat + rng.uniform(-args.spread, args.spread), 4),
+              round(args.lon + rng.uniform(-args.spread, args.spread), 4)) for _ in range(args.users)]
+    upstream = httpx.ASGITransport(app=fake_open_meteo.app)
+
+    fake_open_meteo.reset(latency=args.latency)
+    async with httpx.AsyncClient(transport=upstream, base_url="http://fake-open-meteo") as client:
+        await run_phase("direct", load_direct, client, users, args.concurrency)
+
+    fake_open_meteo.reset(latency=args.latency)
+    forecast_cache.clear()
+    open_meteo_client.configure(base_url="http://fake-open-meteo/v1", transport=upstream)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await run_phase("proxy", load_proxy, client, users, args.concurrency)
+    await open_meteo_client.aclose()
+    print(f"cache: {forecast_cache.stats()}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the /api/weather proxy cache")
+    p.add_argument("--users", type=int, default=500)
+    p.add_argument("--concurrency", type=int, default=50)
+    p.add_argument("--latency", type=float, default=0.2, help="fake upstream latency in seconds")
+    p.add_argument("--lat", type=float, default=32.0853)
+    p.add_argument("--lon", type=float, default=34.7818)
+    p.add_argument("--spread", type=float, default=0.04, help="max coordinate jitter in degrees")
+    args = p.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -28,8 +28,41 @@ MIGRATIONS = {
         # Add token_version to users (idempotent-ish: ADD COLUMN will fail if column exists, but we'll continue)
         "ALTER TABLE users ADD COLUMN token_version INTEGER DEFAULT 0 NOT NULL;"
     ],
+    2: [
+        # Composite index for per-user event listing / date ranges (matches EventORM.__table_args__)
+        "CREATE INDEX IF NOT EXISTS ix_events_user_email_date_time ON events (user_email, date_time);"
+    ],
+    3: [
+        # UID of imported iCalendar events, unique per user so re-imports skip duplicates
+        "ALTER TABLE events ADD COLUMN ical_uid VARCHAR;",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_events_user_email_ical_uid ON events (user_email, ical_uid);"
+    ],
+    4: [
+        # Optional event location, used to attach its forecast in GET /api/events?weather=true
+        "ALTER TABLE events ADD COLUMN latitude FLOAT;",
+        "ALTER TABLE events ADD COLUMN longitude FLOAT;"
+    ],
+    5: [
+        # Per-user events version for the ETag / Last-Modified of GET /api/events
+        "ALTER TABLE users ADD COLUMN events_version INTEGER DEFAULT 0 NOT NULL;",
+        "ALTER TABLE users ADD COLUMN events_modified_at DATETIME;"
+    ],
+    6: [
+        # Change sequence of events and tombstones of deleted ones, for GET /api/events/changes
+        "ALTER TABLE events ADD COLUMN change_seq INTEGER DEFAULT 0 NOT NULL;",
+        "ALTER TABLE events ADD COLUMN updated_at DATETIME;",
+        "CREATE INDEX IF NOT EXISTS ix_events_user_email_change_seq ON events (user_email, change_seq);",
+        """CREATE TABLE IF NOT EXISTS event_tombstones (
+            id INTEGER NOT NULL PRIMARY KEY,
+            event_id INTEGER NOT NULL,
+            user_email VARCHAR NOT NULL REFERENCES users (email),
+            change_seq INTEGER NOT NULL,
+            deleted_at DATETIME NOT NULL
+        );""",
+        "CREATE INDEX IF NOT EXISTS ix_event_tombstones_user_email_change_seq ON event_tombstones (user_email, change_seq);"
+    ],
     # Example future migration:
-    # 2: [
+    # 7: [
     #     "CREATE TABLE new_table (id INTEGER PRIMARY KEY, name TEXT NOT NULL);",
     # ],
 }
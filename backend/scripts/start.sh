@@ -7,6 +7,22 @@ DB_PATH="test.db"
 echo "Running lightweight SQLite migrations against ${DB_PATH}..."
 python scripts/sqlite_migrate.py --db "${DB_PATH}"
 
+# Workers (uvicorn reads $WEB_CONCURRENCY) add up their request metrics in this directory;
+# start every server from zero so counters of a previous run aren't summed in
+export METRICS_DIR="${METRICS_DIR:-/tmp/weatherstation-metrics}"
+rm -rf "${METRICS_DIR}"
+mkdir -p "${METRICS_DIR}"
+# /metrics and /api/metrics/* are only served with METRICS_TOKEN set (a secret, so not defaulted here);
+# scrape with "Authorization: Bearer $METRICS_TOKEN"
+if [ -z "${METRICS_TOKEN:-}" ]; then
+  echo "METRICS_TOKEN is not set: the metrics endpoints are disabled"
+fi
+
+# Workers tell each other about logouts through this file, so a revoked token isn't accepted
+# from another worker's user cache; it is next to the DB and only needs to live as long as the server
+export USER_CACHE_INVALIDATION_DB="${USER_CACHE_INVALIDATION_DB:-$(dirname "${DB_PATH}")/user_cache_invalidations.db}"
+rm -f "${USER_CACHE_INVALIDATION_DB}" "${USER_CACHE_INVALIDATION_DB}-wal" "${USER_CACHE_INVALIDATION_DB}-shm"
+
 # Start uvicorn; Render sets $PORT
 PORT=${PORT:-8000}
 echo "Starting uvicorn on 0.0.0.0:${PORT}..."
@@ -18,9 +18,11 @@ const EVENTS_PATH = `${config.baseURL}/api/events`;
  * @param {string} title - Event title
  * @param {string} description - Event description (optional)
  * @param {string} dateTime - Event date/time in ISO format
+ * @param {Object} location - Where the event takes place: { lat, lon } (optional); the backend
+ *                            keeps the forecast for upcoming events' locations warm
  * @returns {Promise<Object>} Response object with success/error data
  */
-const createEvent = async (title, description, dateTime) => {
+const createEvent = async (title, description, dateTime, location = null) => {
     try {
         if (!hasValidToken()) {
             return {
@@ -34,7 +36,9 @@ const createEvent = async (title, description, dateTime) => {
             body: JSON.stringify({
                 title,
                 description: description || null,
-                date_time: dateTime
+                date_time: dateTime,
+                latitude: location?.lat ?? null,
+                longitude: location?.lon ?? null
             })
         });
 
@@ -61,10 +65,18 @@ const createEvent = async (title, description, dateTime) => {
 };
 
 /**
- * Get all events for the authenticated user
- * @returns {Promise<Object>} Response object with events array
+ * Get events for the authenticated user.
+ * The backend returns events in pages; all pages are fetched unless a cursor is given.
+ * @param {Object} options - Optional filters
+ * @param {string} options.from - Only events at or after this ISO date/time
+ * @param {string} options.to - Only events before this ISO date/time
+ * @param {number} options.limit - Page size
+ * @param {string} options.cursor - Fetch only the page after this cursor
+ * @param {Object} options.weather - Attach each event's forecast: { lat, lon, temperatureUnit, windSpeedUnit }
+ *                                   (lat/lon is used for events without a location of their own)
+ * @returns {Promise<Object>} Response object with events array and next_cursor
  */
-const getUserEvents = async () => {
+const getUserEvents = async (options = {}) => {
     try {
         if (!hasValidToken()) {
             return {
@@ -73,22 +85,99 @@ const getUserEvents = async () => {
             };
         }
 
-        const response = await authenticatedFetch(EVENTS_PATH, {
-            method: "GET"
-        });
+        const events = [];
+        let cursor = options.cursor || null;
+        let data;
+        do {
+            const params = new URLSearchParams();
+            if (options.from) params.set("from", options.from);
+            if (options.to) params.set("to", options.to);
+            if (options.limit) params.set("limit", options.limit);
+            if (cursor) params.set("cursor", cursor);
+            if (options.weather) {
+                params.set("weather", "true");
+                const { lat, lon, temperatureUnit, windSpeedUnit } = options.weather;
+                if (lat != null && lon != null) {
+                    params.set("lat", lat);
+                    params.set("lon", lon);
+                }
+                if (temperatureUnit) params.set("temperature_unit", temperatureUnit);
+                if (windSpeedUnit) params.set("wind_speed_unit", windSpeedUnit);
+            }
+            const query = params.toString();
 
-        const data = await response.json();
+            const response = await authenticatedFetch(query ? `${EVENTS_PATH}?${query}` : EVENTS_PATH, {
+                method: "GET"
+            });
 
-        if (!response.ok) {
+            data = await response.json();
+
+            if (!response.ok) {
+                return {
+                    success: false,
+                    message: data.detail || data.message || data.error || "Failed to get events"
+                };
+            }
+
+            events.push(...(data.data?.events || []));
+            cursor = data.data?.next_cursor || null;
+        } while (cursor && !options.cursor);
+
+        return {
+            success: true,
+            data: { events, next_cursor: cursor },
+            message: data.message
+        };
+    } catch (err) {
+        return {
+            success: false,
+            message: err.message || "Network error - Could not connect to server"
+        };
+    }
+};
+
+/**
+ * Get the events created, updated or deleted since the last sync.
+ * All pages of changes are fetched; pass the returned cursor next time.
+ * @param {string} since - Cursor from the previous sync (omit for a full sync)
+ * @returns {Promise<Object>} Response object with changed events, deleted event ids and the new cursor
+ */
+const getEventChanges = async (since = null) => {
+    try {
+        if (!hasValidToken()) {
             return {
                 success: false,
-                message: data.detail || data.message || data.error || "Failed to get events"
+                message: "Not authenticated - please login first"
             };
         }
 
+        const events = [];
+        const deleted = [];
+        let cursor = since;
+        let data;
+        do {
+            const query = cursor ? `?since=${encodeURIComponent(cursor)}` : "";
+            const response = await authenticatedFetch(`${EVENTS_PATH}/changes${query}`, {
+                method: "GET"
+            });
+
+            data = await response.json();
+
+            if (!response.ok) {
+                return {
+                    success: false,
+                    message: data.detail || data.message || data.error || "Failed to get event changes"
+                };
+            }
+
+            events.push(...(data.data?.events || []));
+            deleted.push(...(data.data?.deleted || []));
+            cursor = data.data?.cursor || cursor;
+        } while (data.data?.has_more);
+
         return {
             success: true,
-            data: data.data || [],
+            data: { events, deleted, cursor },
             message: data.message
         };
     } catch (err) {
@@ -142,7 +231,7 @@ const getEventById = async (eventId) => {
 /**
  * Update an existing event
  * @param {number} eventId - Event ID
- * @param {Object} updates - Object with fields to update (title, description, dateTime)
+ * @param {Object} updates - Object with fields to update (title, description, dateTime, location: { lat, lon })
  * @returns {Promise<Object>} Response object with updated event data
  */
 const updateEvent = async (eventId, updates) => {
@@ -159,6 +248,10 @@ const updateEvent = async (eventId, updates) => {
         if (updates.title !== undefined) updateData.title = updates.title;
         if (updates.description !== undefined) updateData.description = updates.description;
         if (updates.dateTime !== undefined) updateData.date_time = updates.dateTime;
+        if (updates.location) {
+            updateData.latitude = updates.location.lat;
+            updateData.longitude = updates.location.lon;
+        }
 
         const response = await authenticatedFetch(`${EVENTS_PATH}/${eventId}`, {
             method: "PUT",
@@ -238,6 +331,7 @@ const updateConfig = (newConfig) => {
 export {
     createEvent,
     getUserEvents,
+    getEventChanges,
     getEventById,
     updateEvent,
     deleteEvent,
@@ -1,10 +1,13 @@
 // Open-Meteo Weather API integration
 // Free weather API with no API key required
 // Documentation: https://open-meteo.com/en/docs
+// Forecasts (/api/weather) and place search (/api/geocode) go through the backend, which caches them
+
+import { API_BASE_URL } from '../config/api.js';
 
 const config = {
-    weatherBaseURL: "https://api.open-meteo.com/v1",
-    geocodingBaseURL: "https://geocoding-api.open-meteo.com/v1",
+    weatherBaseURL: `${API_BASE_URL}/api/weather`,
+    geocodingBaseURL: `${API_BASE_URL}/api/geocode`,
     fetchOptions: {
         method: 'GET',
         mode: 'cors',
@@ -66,7 +69,7 @@ function getWeatherInfo(code, isDay = true) {
 }
 
 /**
- * Search for locations using Open-Meteo Geocoding API
+ * Search for locations using Open-Meteo Geocoding API (through the backend's geocoding cache)
  * @param {string} query - Search query (city name, postal code, etc.)
  * @param {number} count - Number of results to return (max 100)
  * @param {string} language - Language code (e.g., 'en', 'de', 'fr')
@@ -81,7 +84,7 @@ const searchLocations = async (query, count = 10, language = "en") => {
             };
         }
 
-        const url = `${config.geocodingBaseURL}/search?name=${encodeURIComponent(query)}&count=${count}&language=${language}&format=json`;
+        const url = `${config.geocodingBaseURL}?name=${encodeURIComponent(query)}&count=${count}&language=${language}`;
         
         const response = await fetch(url, config.fetchOptions);
 
@@ -92,12 +95,13 @@ const searchLocations = async (query, count = 10, language = "en") => {
             };
         }
 
-        const data = await response.json();
+        const body = await response.json();
+        const data = body.data;
         
-        if (data.error) {
+        if (body.error || !data) {
             return {
                 success: false,
-                message: data.reason || "Search failed"
+                message: body.error || "Search failed"
             };
         }
 
@@ -113,6 +117,20 @@ const searchLocations = async (query, count = 10, language = "en") => {
     }
 };
 
+/**
+ * Fetch a forecast from the backend weather proxy
+ * @param {string} forecastType - 'current', 'daily' or 'hourly'
+ * @param {number} latitude - Latitude
+ * @param {number} longitude - Longitude
+ * @param {string} temperatureUnit - Temperature unit ('celsius' or 'fahrenheit')
+ * @param {string} windSpeedUnit - Wind speed unit ('kmh', 'ms', 'mph', 'kn')
+ * @returns {Promise<Response>} Fetch response; its JSON "data" field holds the Open-Meteo payload
+ */
+const fetchForecast = (forecastType, latitude, longitude, temperatureUnit, windSpeedUnit) => {
+    const url = `${config.weatherBaseURL}/${forecastType}?lat=${latitude}&lon=${longitude}&temperature_unit=${temperatureUnit}&wind_speed_unit=${windSpeedUnit}`;
+    return fetch(url, config.fetchOptions);
+};
+
 /**
  * Get current weather by coordinates using Open-Meteo
  * @param {number} latitude - Latitude
@@ -123,27 +141,7 @@ const searchLocations = async (query, count = 10, language = "en") => {
  */
 const getCurrentWeatherByCoords = async (latitude, longitude, temperatureUnit = "celsius", windSpeedUnit = "kmh") => {
     try {
-        const currentParams = [
-            "temperature_2m",
-            "relative_humidity_2m", 
-            "apparent_temperature",
-            "is_day",
-            "precipitation",
-            "rain",
-            "showers", 
-            "snowfall",
-            "weather_code",
-            "cloud_cover",
-            "pressure_msl",
-            "surface_pressure",
-            "wind_speed_10m",
-            "wind_direction_10m",
-            "wind_gusts_10m"
-        ].join(",");
-
-        const url = `${config.weatherBaseURL}/forecast?latitude=${latitude}&longitude=${longitude}&current=${currentParams}&temperature_unit=${temperatureUnit}&wind_speed_unit=${windSpeedUnit}&timezone=auto`;
-        
-        const response = await fetch(url, config.fetchOptions);
+        const response = await fetchForecast("current", latitude, longitude, temperatureUnit, windSpeedUnit);
 
         if (!response.ok) {
             return {
@@ -152,12 +150,13 @@ const getCurrentWeatherByCoords = async (latitude, longitude, temperatureUnit =
             };
         }
 
-        const data = await response.json();
+        const body = await response.json();
+        const data = body.data;
         
-        if (data.error) {
+        if (body.error || !data) {
             return {
                 success: false,
-                message: data.reason || "Weather data fetch failed"
+                message: body.error || "Weather data fetch failed"
             };
         }
 
@@ -267,27 +266,7 @@ const getCurrentWeatherByCity = async (city, temperatureUnit = "celsius", windSp
  */
 const getForecastByCoords = async (latitude, longitude, temperatureUnit = "celsius", windSpeedUnit = "kmh") => {
     try {
-        const dailyParams = [
-            "weather_code",
-            "temperature_2m_max",
-            "temperature_2m_min", 
-            "apparent_temperature_max",
-            "apparent_temperature_min",
-            "precipitation_sum",
-            "rain_sum",
-            "showers_sum",
-            "snowfall_sum",
-            "precipitation_probability_max",
-            "wind_speed_10m_max",
-            "wind_gusts_10m_max",
-            "wind_direction_10m_dominant",
-            "sunrise",
-            "sunset"
-        ].join(",");
-
-        const url = `${config.weatherBaseURL}/forecast?latitude=${latitude}&longitude=${longitude}&daily=${dailyParams}&temperature_unit=${temperatureUnit}&wind_speed_unit=${windSpeedUnit}&timezone=auto&forecast_days=14`;
-        
-        const response = await fetch(url, config.fetchOptions);
+        const response = await fetchForecast("daily", latitude, longitude, temperatureUnit, windSpeedUnit);
 
         if (!response.ok) {
             return {
@@ -296,12 +275,13 @@ const getForecastByCoords = async (latitude, longitude, temperatureUnit = "celsi
             };
         }
 
-        const data = await response.json();
+        const body = await response.json();
+        const data = body.data;
         
-        if (data.error) {
+        if (body.error || !data) {
             return {
                 success: false,
-                message: data.reason || "Forecast data fetch failed"
+                message: body.error || "Forecast data fetch failed"
             };
         }
 
@@ -446,27 +426,7 @@ function getWeatherIconUrl(iconCode, size = '') {
  */
 const getHourlyForecastByCoords = async (latitude, longitude, temperatureUnit = "celsius", windSpeedUnit = "kmh") => {
     try {
-        const hourlyParams = [
-            "temperature_2m",
-            "relative_humidity_2m",
-            "apparent_temperature",
-            "precipitation_probability",
-            "precipitation",
-            "rain",
-            "showers",
-            "snowfall",
-            "weather_code",
-            "cloud_cover",
-            "wind_speed_10m",
-            "wind_direction_10m",
-            "wind_gusts_10m",
-            "uv_index",
-            "is_day"
-        ].join(",");
-
-        const url = `${config.weatherBaseURL}/forecast?latitude=${latitude}&longitude=${longitude}&hourly=${hourlyParams}&temperature_unit=${temperatureUnit}&wind_speed_unit=${windSpeedUnit}&timezone=auto&forecast_days=14`;
-        
-        const response = await fetch(url, config.fetchOptions);
+        const response = await fetchForecast("hourly", latitude, longitude, temperatureUnit, windSpeedUnit);
 
         if (!response.ok) {
             return {
@@ -475,12 +435,13 @@ const getHourlyForecastByCoords = async (latitude, longitude, temperatureUnit =
             };
         }
 
-        const data = await response.json();
+        const body = await response.json();
+        const data = body.data;
         
-        if (data.error) {
+        if (body.error || !data) {
             return {
                 success: false,
-                message: data.reason || "Hourly forecast data fetch failed"
+                message: body.error || "Hourly forecast data fetch failed"
             };
         }
 
@@ -9,7 +9,7 @@ import {
 } from "../API/weatherAPI.js";
 import {
 	createEvent,
-	getUserEvents,
+	getEventChanges,
 	getEventById,
 	updateEvent,
 	deleteEvent
@@ -21,6 +21,8 @@ import {
 	clearUserData,
 	saveUserEvents as saveEventsToStorage,
 	loadUserEvents,
+	saveSyncedEvents,
+	loadSyncedEvents,
 } from "../utils/storage.js";
 import {
 	formatDateToString,
@@ -38,6 +40,7 @@ let currentUser = null;
 let userEvents = [];
 let currentLocation = "Kiryat Shmona";
 let currentCoordinates = null; // Store coordinates when using current location
+let weatherCoordinates = null; // Coordinates of the place the weather is shown for, saved with new events
 let cachedForecastData = null; // Cache forecast data to avoid repeated API calls
 let cachedHourlyForecastData = null; // Cache hourly forecast data
 let lastForecastUpdate = null; // Track when forecast was last updated
@@ -134,45 +137,57 @@ function showEventsLoadError(message) {
 async function loadUserEventsData() {
 	if (!currentUser) return;
 
+	// Local copy of the server events; only what changed since it was saved is downloaded
+	const synced = loadSyncedEvents(currentUser.email);
+
 	try {
-		const response = await getUserEvents();
+		const response = await getEventChanges(synced.cursor);
 		
 		if (response.success) {
-			// Convert backend events to frontend format
-			userEvents = response.data.events.map(event => ({
-				id: event.id,
-				userId: currentUser.email, // For frontend compatibility
-				title: event.title,
-				description: event.description,
-				date: event.date_time.split('T')[0], // Extract date part (YYYY-MM-DD)
-				time: event.date_time.split('T')[1]?.substring(0, 5), // Extract time part (HH:MM)
-				dateTime: event.date_time, // Keep full datetime for backend calls
-				isBackend: true // Mark as backend event
-			}));
-			
-			console.log(`Loaded ${userEvents.length} events from backend`);
+			const eventsById = new Map(synced.events.map(event => [event.id, event]));
+			response.data.deleted.forEach(id => eventsById.delete(id));
+			response.data.events.forEach(event => eventsById.set(event.id, event));
+			const events = [...eventsById.values()].sort(
+				(a, b) => a.date_time.localeCompare(b.date_time) || a.id - b.id
+			);
+			saveSyncedEvents(currentUser.email, events, response.data.cursor);
+
+			userEvents = events.map(toFrontendEvent);
+			console.log(`Loaded ${userEvents.length} events (${response.data.events.length} changed, ${response.data.deleted.length} deleted since last sync)`);
 		} else {
 			console.error("Failed to load events:", response.message);
 			// Show error message to user
 			showEventsLoadError("Unable to load events from server. Please try refreshing the page.");
-			userEvents = [];
 			
-			// Load any local events created by the user as fallback
+			// Fall back to the last synced copy and any local events created by the user
 			const localEvents = loadUserEvents(currentUser.id);
-			userEvents = [...localEvents];
+			userEvents = [...synced.events.map(toFrontendEvent), ...localEvents];
 		}
 	} catch (error) {
 		console.error("Error loading events:", error);
 		// Show error message to user
 		showEventsLoadError("Network error while loading events. Please check your connection and try again.");
-		userEvents = [];
 		
-		// Load any local events created by the user as fallback
+		// Fall back to the last synced copy and any local events created by the user
 		const localEvents = loadUserEvents(currentUser.id);
-		userEvents = [...localEvents];
+		userEvents = [...synced.events.map(toFrontendEvent), ...localEvents];
 	}
 }
 
+// Convert a backend event to the frontend format
+function toFrontendEvent(event) {
+	return {
+		id: event.id,
+		userId: currentUser.email, // For frontend compatibility
+		title: event.title,
+		description: event.description,
+		date: event.date_time.split('T')[0], // Extract date part (YYYY-MM-DD)
+		time: event.date_time.split('T')[1]?.substring(0, 5), // Extract time part (HH:MM)
+		dateTime: event.date_time, // Keep full datetime for backend calls
+		isBackend: true // Mark as backend event
+	};
+}
+
 // Save user events
 function saveUserEventsData() {
 	if (!currentUser) return;
@@ -404,7 +419,7 @@ async function saveNewEvent() {
 		saveBtn.textContent = "Saving...";
 		saveBtn.disabled = true;
 
-		const response = await createEvent(title, description, dateTime);
+		const response = await createEvent(title, description, dateTime, weatherCoordinates);
 		
 		if (response.success) {
 			console.log("Event created successfully:", response.data);
@@ -510,6 +525,7 @@ async function getWeatherForLocation(location) {
 			// Update location tracking (clear coordinates since we're using city name)
 			currentCoordinates = null;
 			currentLocation = location;
+			weatherCoordinates = response.data.coord;
 			
 			displayCurrentWeather(response.data);
 			document.getElementById("locationInput").value = location;
@@ -532,6 +548,7 @@ async function getWeatherByCoordinates(lat, lon) {
 			// Update location tracking
 			currentCoordinates = { lat, lon };
 			currentLocation = response.data.name;
+			weatherCoordinates = currentCoordinates;
 			
 			displayCurrentWeather(response.data, lat, lon);
 			document.getElementById("locationInput").value = response.data.name;
@@ -56,6 +56,11 @@ function clearUserData() {
     localStorage.removeItem('userData');
     sessionStorage.removeItem('userToken');
     sessionStorage.removeItem('userData');
+
+    // Synced copies of server events belong to the signed-out user
+    Object.keys(localStorage)
+        .filter(key => key.startsWith('syncedEvents_'))
+        .forEach(key => localStorage.removeItem(key));
 }
 
 /**
@@ -91,6 +96,45 @@ function loadUserEvents(userId) {
     return [];
 }
 
+/**
+ * Save the local copy of the user's server events and the sync cursor it is current to
+ * @param {string} userEmail - User email
+ * @param {Array} events - Server events, as returned by the API
+ * @param {string} cursor - Cursor of the last sync
+ */
+function saveSyncedEvents(userEmail, events, cursor) {
+    if (!userEmail) return;
+
+    try {
+        localStorage.setItem(`syncedEvents_${userEmail}`, JSON.stringify({ events, cursor }));
+    } catch (error) {
+        // e.g. over quota: the next sync starts from scratch
+        console.error("Error saving synced events:", error);
+        localStorage.removeItem(`syncedEvents_${userEmail}`);
+    }
+}
+
+/**
+ * Load the local copy of the user's server events
+ * @param {string} userEmail - User email
+ * @returns {Object} { events, cursor }; cursor is null when there is no copy yet
+ */
+function loadSyncedEvents(userEmail) {
+    const empty = { events: [], cursor: null };
+    if (!userEmail) return empty;
+
+    const data = localStorage.getItem(`syncedEvents_${userEmail}`);
+    if (data) {
+        try {
+            return { ...empty, ...JSON.parse(data) };
+        } catch (error) {
+            console.error("Error parsing synced events:", error);
+            return empty;
+        }
+    }
+    return empty;
+}
+
 /**
  * Save application settings
  * @param {Object} settings - Settings object
@@ -171,6 +215,8 @@ export {
     clearUserData,
     saveUserEvents,
     loadUserEvents,
+    saveSyncedEvents,
+    loadSyncedEvents,
     saveAppSettings,
     loadAppSettings,
     saveToStorage,